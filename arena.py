@@ -0,0 +1,380 @@
+"""Many snakes on one board.
+
+`Arena` is an `Engine` in which hundreds of snakes share a single
+occupancy index: every segment of every snake is counted in one
+`counts` grid, so a head running into any body (or another head) is found
+with one lookup and a step costs O(number of snakes), not O(segments).
+Snake 0 is `arena.snake` and can be steered like the single-player snake;
+the others are driven by `step(actions)` or by the built-in bot.
+
+Usage:
+    python arena.py --snakes 200 --board 200 --moves 5000 --respawn
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+from collections import deque
+
+from engine import (
+    DIFFICULTIES,
+    DIRECTIONS,
+    GRID_COUNT,
+    MOVES,
+    POWER_UPS,
+    SCORE,
+    TICKS,
+    Engine,
+    FreeCells,
+    Snake,
+    Timeline,
+    clear_power_up,
+)
+
+
+class Arena(Engine):
+    """`snake_count` snakes and `food_count` pieces of food (one per two
+    snakes by default) on a shared wrapping board.
+
+    Every `step()` moves each living snake once, in lockstep; speed
+    power-ups are recorded on the snake but do not change that. Each snake
+    keeps its own power-up effects, on its own `Timeline`, lasting as the
+    `POWER_UPS` entry says; SCORE durations count that snake's score. A snake
+    dies when its head lands on a cell holding another segment, its own
+    or any other snake's, and head-on collisions kill both. Dead snakes
+    are taken off the board, and come back at a random free cell when
+    `respawn` is set.
+    """
+
+    def __init__(
+        self,
+        snake_count,
+        difficulty="Recommended",
+        rng=None,
+        grid_count=GRID_COUNT,
+        food_count=None,
+        respawn=False,
+    ):
+        self.snake_count = snake_count
+        self.food_count = food_count or max(1, snake_count // 2)
+        self.respawn = respawn
+        super().__init__(difficulty, rng, grid_count)
+
+    def reset(self):
+        cells = self.grid_count * self.grid_count
+        # The occupancy index all snakes share
+        self.counts = bytearray(cells)
+        self.free = FreeCells(cells)
+        self.food = []  # Packed food cells
+        self.food_slots = {}  # Food cell -> index in `food`
+        self.power_up = None
+        self.power_up_pos = None
+        self.food_pos = None
+        # Clocks, timeline and turn queue as in a single-player game
+        self.reset_state()
+        self.snakes = []
+        self.alive = []
+        self.scores = []
+        self.active = []  # Power-up each snake is under, or None
+        # Each snake's effects as (name, unit, due), and their expiries
+        self.snake_effects = []
+        self.timelines = []
+        self.deaths = 0
+        for index in range(self.snake_count):
+            self.snakes.append(Snake(self.grid_count, (self.counts, self.free)))
+            self.alive.append(False)
+            self.scores.append(0)
+            self.active.append(None)
+            self.snake_effects.append([])
+            self.timelines.append(Timeline())
+            self.place(index)
+        self.snake = self.snakes[0]
+        for _ in range(self.food_count):
+            self.add_food()
+        self.score = 0  # Food eaten by all snakes
+        self.game_over = False  # Set when no snake is left
+
+    def fork(self, rng=None):
+        """An independent copy of the arena, as `Engine.fork` makes of a
+        game."""
+        if rng is None:
+            rng = random.Random()
+            rng.setstate(self.rng.getstate())
+        arena = Arena.__new__(Arena)
+        arena.__dict__.update(self.__dict__)
+        arena.rng = rng
+        arena.counts = bytearray(self.counts)
+        arena.free = self.free.copy()
+        board = (arena.counts, arena.free)
+        arena.snakes = [snake.copy(board) for snake in self.snakes]
+        arena.snake = arena.snakes[0]
+        arena.food = list(self.food)
+        arena.food_slots = dict(self.food_slots)
+        arena.alive = list(self.alive)
+        arena.scores = list(self.scores)
+        arena.active = list(self.active)
+        arena.snake_effects = [list(effects) for effects in self.snake_effects]
+        arena.timelines = [timeline.copy() for timeline in self.timelines]
+        arena.effects = list(self.effects)
+        arena.timeline = self.timeline.copy()
+        arena.changed_cells = None
+        arena.input_log = None
+        arena.autopilot = None
+        arena.power_up_log = None
+        arena.turns = deque()
+        arena.applied_turn_stamp = None
+        return arena
+
+    def place(self, index):
+        """Put snake `index` back on the board as a single segment on a
+        random free cell, heading in a random direction."""
+        pos = self.get_random_position()
+        if pos is None:
+            return
+        snake = self.snakes[index]
+        snake.positions = [pos]
+        snake.direction = snake.next_direction = self.rng.choice(DIRECTIONS)
+        snake.grow = False
+        clear_power_up(snake)
+        self.alive[index] = True
+        self.active[index] = None
+        self.snake_effects[index] = []
+        self.timelines[index] = Timeline()
+
+    def get_random_position(self):
+        """A uniformly chosen cell free of snakes, food and the power-up, or
+        None when there is none."""
+        free = self.free
+        blocked = len(self.food) + (self.power_up_pos is not None)
+        if len(free) <= blocked:
+            return None
+        power_up = self.power_up_pos
+        while True:
+            cell = free.choice(self.rng)
+            y, x = divmod(cell, self.grid_count)
+            if cell not in self.food_slots and (x, y) != power_up:
+                return (x, y)
+
+    def add_food(self):
+        pos = self.get_random_position()
+        if pos is not None:
+            cell = pos[1] * self.grid_count + pos[0]
+            self.food_slots[cell] = len(self.food)
+            self.food.append(cell)
+
+    def remove_food(self, cell):
+        slot = self.food_slots.pop(cell)
+        last = self.food.pop()
+        if last != cell:
+            self.food[slot] = last
+            self.food_slots[last] = slot
+
+    def turn_snake(self, index, direction):
+        """Steer snake `index` like `Engine.turn` steers the player."""
+        snake = self.snakes[index]
+        if snake.confused:
+            direction = (-direction[0], -direction[1])
+        current = snake.direction
+        if (-current[0], -current[1]) != direction:
+            snake.next_direction = direction
+
+    def step(self, actions=None):
+        """Move every living snake once.
+
+        `actions` maps snake indexes to a `Direction` (a list, one per
+        snake, or a dict); a missing or None action keeps the snake going.
+        Returns True once every snake is dead.
+        """
+        if actions is not None:
+            items = actions.items() if isinstance(actions, dict) else enumerate(actions)
+            for index, direction in items:
+                if direction is not None and self.alive[index]:
+                    self.turn_snake(index, direction)
+        self.tick(True)
+        return self.game_over
+
+    def tick(self, move):
+        """One frame: spawn a power-up when one is due and, if `move`, move
+        every living snake. Turns queued with `queue_turn` steer snake 0."""
+        self.ticks += 1
+        if self.timeline.due(SCORE, self.score):
+            self.run_timeline(SCORE, self.score)
+        for index, effects in enumerate(self.snake_effects):
+            if effects:
+                self.run_effects(index, (SCORE, TICKS))
+        if not move:
+            return
+        if self.turns and self.alive[0]:
+            self.consume_turn()
+
+        snakes = self.snakes
+        alive = [i for i in range(self.snake_count) if self.alive[i]]
+        for index in alive:
+            snakes[index].update()
+        self.moves += 1
+
+        # A head on a cell holding two segments hit a body or another head
+        counts = self.counts
+        dead = [i for i in alive if counts[snakes[i].body[0]] > 1]
+        for index in dead:
+            self.alive[index] = False
+            self.deaths += 1
+        for index in dead:
+            snakes[index].lift()
+
+        grid_count = self.grid_count
+        power_up = None
+        if self.power_up:
+            power_up = self.power_up_pos[1] * grid_count + self.power_up_pos[0]
+        for index in alive:
+            if not self.alive[index]:
+                continue
+            snake = snakes[index]
+            head = snake.body[0]
+            if head in self.food_slots:
+                self.eat(index, head)
+            if head == power_up:
+                if self.power_up_log is not None:
+                    self.power_up_log.on_pickup(self, self.power_up)
+                self.start_effect_on(index, self.power_up)
+                self.power_up = None
+                self.power_up_pos = None
+                power_up = None
+            if self.snake_effects[index]:
+                self.run_effects(index, (MOVES,))
+
+        if self.respawn:
+            for index in dead:
+                self.place(index)
+        self.game_over = not any(self.alive)
+
+    def eat(self, index, cell):
+        snake = self.snakes[index]
+        self.scores[index] += 2 if snake.double_growth else 1
+        self.score += 1
+        snake.grow = True
+        snake.double_growth = False
+        self.remove_food(cell)
+        self.add_food()
+
+    def start_effect_on(self, index, name):
+        """`Engine.start_effect` for snake `index`."""
+        power_up = POWER_UPS[name]
+        effects = self.snake_effects[index]
+        if not power_up.stacks:
+            effects[:] = [effect for effect in effects if effect[0] != name]
+        due = self.clock(index, power_up.unit) + power_up.duration
+        effect = (name, power_up.unit, due)
+        effects.append(effect)
+        self.timelines[index].schedule(power_up.unit, effect[2], effect)
+        power_up.apply(self.snakes[index])
+        self.active[index] = name
+
+    def clock(self, index, unit):
+        """Reading of clock `unit` for snake `index`: SCORE is its own."""
+        return self.scores[index] if unit == SCORE else getattr(self, unit)
+
+    def run_effects(self, index, units):
+        """End the effects of snake `index` that are due on clocks `units`."""
+        timeline = self.timelines[index]
+        effects = self.snake_effects[index]
+        for unit in units:
+            now = self.clock(index, unit)
+            while timeline.due(unit, now):
+                effect = timeline.pop(unit)
+                if effect in effects:  # Not restarted since
+                    effects.remove(effect)
+                    self.end_effect_on(index, effect)
+
+    def end_effect_on(self, index, effect):
+        """`Engine.end_effect` for snake `index`."""
+        snake = self.snakes[index]
+        effects = self.snake_effects[index]
+        clear_power_up(snake)
+        for name, _, _ in effects:
+            POWER_UPS[name].apply(snake)
+        revert = POWER_UPS[effect[0]].revert
+        if revert is not None:
+            revert(self)
+        self.active[index] = effects[-1][0] if effects else None
+
+    def bot_action(self, index):
+        """Greedy bot: head for one of the food cells, never straight into a
+        cell that is occupied now."""
+        snake = self.snakes[index]
+        grid_count = self.grid_count
+        y, x = divmod(snake.body[0], grid_count)
+        if self.food:
+            target_y, target_x = divmod(self.food[index % len(self.food)], grid_count)
+        else:
+            target_x, target_y = x, y
+        best = None
+        for direction in DIRECTIONS:
+            if direction == (-snake.direction[0], -snake.direction[1]):
+                continue
+            nx = (x + direction[0]) % grid_count
+            ny = (y + direction[1]) % grid_count
+            dx = abs(nx - target_x)
+            dy = abs(ny - target_y)
+            distance = min(dx, grid_count - dx) + min(dy, grid_count - dy)
+            key = (self.counts[ny * grid_count + nx] > 0, distance)
+            if best is None or key < best[0]:
+                best = (key, direction)
+        direction = best[1]
+        if snake.confused:
+            direction = (-direction[0], -direction[1])  # turn_snake inverts it
+        return direction
+
+    def bot_actions(self):
+        return [
+            self.bot_action(i) if self.alive[i] else None
+            for i in range(self.snake_count)
+        ]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run a headless bot battle")
+    parser.add_argument("--snakes", type=int, default=200)
+    parser.add_argument("--board", type=int, default=200, metavar="N")
+    parser.add_argument("--moves", type=int, default=2000)
+    parser.add_argument("--food", type=int, default=None)
+    parser.add_argument(
+        "--difficulty",
+        default="Recommended",
+        choices=DIFFICULTIES,
+    )
+    parser.add_argument("--respawn", action="store_true")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    arena = Arena(
+        args.snakes,
+        args.difficulty,
+        random.Random(args.seed),
+        args.board,
+        args.food,
+        args.respawn,
+    )
+    started = time.perf_counter()
+    while arena.moves < args.moves and not arena.game_over:
+        arena.step(arena.bot_actions())
+    elapsed = time.perf_counter() - started
+    json.dump(
+        {
+            "moves": arena.moves,
+            "alive": sum(arena.alive),
+            "deaths": arena.deaths,
+            "food_eaten": arena.score,
+            "top_scores": sorted(arena.scores, reverse=True)[:10],
+            "steps_per_second": arena.moves / elapsed if elapsed else 0.0,
+        },
+        sys.stdout,
+        indent=2,
+    )
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,379 @@
+"""Built-in autopilot that plays the snake by itself.
+
+Attach an `Autopilot` as `engine.autopilot` and it sets
+`snake.next_direction` right before every move, in the windowed game
+(`python main.py --autopilot`) or on a headless `Engine`. It is also a
+`simulate.py` policy, and `python autopilot.py --board 20` plays one long
+game headless and reports how it went.
+
+The snake follows a Hamiltonian cycle of the (wrapping) board, cutting
+across it towards the food while the board is sparse. Its body is kept in
+cycle order, so every cut is an O(1) check and every game it plays from the
+start ends with the board filled.
+
+A snake whose body is not in cycle order (taken over mid-game, or steered
+off course by a person or a policy's random moves) is played by A* instead:
+each plan is a path to the food that is only taken if the tail can still be
+reached from its end, reused move after move until the food moves or the
+path is blocked; with no safe path the snake stalls by chasing its tail.
+"""
+
+import argparse
+import heapq
+import json
+import random
+import sys
+import time
+from collections import deque
+
+from engine import DIFFICULTIES, DIRECTIONS, GRID_COUNT, Direction, Engine
+from profiler import percentile
+
+# Free cells a cut across the cycle leaves ahead of the head beyond the
+# snake's length
+CUT_MARGIN = 3
+
+
+class Autopilot:
+    """Plans a move for an engine's snake before each move.
+
+    Planning times of the last `capacity` moves are kept for `summary()`.
+    """
+
+    def __init__(self, capacity=10_000, clock=time.perf_counter):
+        self.clock = clock
+        self.times = deque(maxlen=capacity)  # Seconds spent per move
+        self.moves = 0
+        self.replans = 0
+        self.snake = None  # Snake the cached plan belongs to
+        self.path = deque()  # Cells still to visit on the way to `target`
+        self.target = None
+        self.wait = 0  # Moves before retrying after a failed plan
+        self.backoff = 1
+        self.food = None
+        self.hungry = 0  # Moves since the food last moved
+        self.rng = random.Random(0)  # Breaks tail-chasing loops
+        self.ordered = False  # Whether the body is in cycle order
+        self.expected = None  # Head cell the last chosen move leads to
+        self.recheck = 0  # Moves before checking an out-of-order body again
+
+    def on_move(self, engine):
+        """Engine hook: steer `engine.snake` for the move about to be made."""
+        engine.snake.next_direction = self.plan(engine)
+
+    def policy(self, engine, rng=None):
+        """The same choice as a `simulate.py` policy, which goes through
+        `Engine.turn` and so has to undo confusion."""
+        direction = self.plan(engine)
+        if engine.snake.confused:
+            direction = (-direction[0], -direction[1])
+        return direction
+
+    def summary(self):
+        """Planning time per move in microseconds over the kept moves."""
+        times = [t * 1e6 for t in self.times]
+        return {
+            "moves": self.moves,
+            "replans": self.replans,
+            "plan_mean_us": sum(times) / len(times) if times else 0.0,
+            "plan_p50_us": percentile(times, 0.5),
+            "plan_p99_us": percentile(times, 0.99),
+            "plan_max_us": max(times, default=0.0),
+        }
+
+    def plan(self, engine):
+        """The direction for the next move, timed."""
+        start = self.clock()
+        direction = self.choose(engine)
+        self.times.append(self.clock() - start)
+        self.moves += 1
+        return direction
+
+    def choose(self, engine):
+        snake = engine.snake
+        if snake is not self.snake:
+            # New game: forget the old plan
+            self.snake = snake
+            self.path.clear()
+            self.target = None
+            self.wait = 0
+            self.backoff = 1
+            self.hungry = 0
+            self.rng.seed(0)  # Same game, same moves
+            self.expected = None
+        self.grid_count = snake.grid_count
+        head = snake.body[0]
+        food = engine.food_pos
+        food = None if food is None else food[1] * self.grid_count + food[0]
+        self.hungry = self.hungry + 1 if food == self.food else 0
+        self.food = food
+
+        if head != self.expected:
+            # Someone else moved the snake: see where that left the body
+            self.ordered = self.in_cycle_order(snake.body)
+            self.recheck = len(snake.body)
+        elif not self.ordered:
+            self.recheck -= 1
+            if self.recheck <= 0:
+                self.ordered = self.in_cycle_order(snake.body)
+                self.recheck = len(snake.body)
+        direction = None
+        if self.ordered:
+            direction = self.follow_cycle(snake, head, food)
+        if direction is None:
+            direction = self.search_move(snake, head, food)
+        cell = self.step(head, direction)
+        self.ordered = self.ordered and self.keeps_order(snake, head, cell)
+        self.expected = cell
+        return direction
+
+    def search_move(self, snake, head, food):
+        """A* move for a body that is not in cycle order."""
+        # Keep following the last plan while it leads to the same food
+        if self.path and self.target == food:
+            cell = self.path[0]
+            if cell in self.neighbours(head) and not self.blocked(snake, cell):
+                self.path.popleft()
+                return self.direction(head, cell)
+        self.path.clear()
+
+        if food is not None:
+            if self.wait:
+                self.wait -= 1
+            else:
+                self.replans += 1
+                reverse = self.step(head, (-snake.direction[0], -snake.direction[1]))
+                path = self.search(
+                    head, food, lambda cell: self.blocked(snake, cell), skip=reverse
+                )
+                if path is not None and self.safe_after(snake, path, food):
+                    self.backoff = 1
+                    self.target = food
+                    self.path.extend(path[1:])
+                    return self.direction(head, path[0])
+                # No safe path: only the tail moving away can open one up, so
+                # wait a few moves before searching again
+                self.wait = self.backoff
+                self.backoff = min(self.backoff * 2, 16)
+        return self.fallback(snake, head, food)
+
+    def fallback(self, snake, head, food):
+        """A move that keeps the tail reachable, following the Hamiltonian
+        cycle when it can. After a whole board's worth of moves without
+        eating, the other moves are tried in random order so that chasing
+        the tail does not settle into a loop that never opens a path."""
+        options = [snake.direction] + DIRECTIONS
+        if self.hungry > len(snake.counts):
+            self.rng.shuffle(options)
+        options.insert(0, self.cycle_direction(head))
+        reverse = (-snake.direction[0], -snake.direction[1])
+        unsafe = None
+        for direction in options:
+            if direction == reverse:
+                continue
+            cell = self.step(head, direction)
+            if self.blocked(snake, cell):
+                continue
+            if self.safe_after(snake, [cell], food):
+                return direction
+            unsafe = unsafe or direction
+        return unsafe or snake.direction
+
+    def follow_cycle(self, snake, head, food):
+        """The move along the Hamiltonian cycle for a body in cycle order,
+        or None if there is none.
+
+        The cells from the head up to the tail, going forwards along the
+        cycle, are then all free. A move may jump ahead along the cycle,
+        but never past the food, and only while the snake covers less than
+        half the board and the jump leaves more free cells ahead than the
+        snake is long; the cells it skips are only freed once the tail has
+        passed them. On a fuller board the snake follows the cycle exactly
+        and can never run into itself.
+        """
+        cells = len(snake.counts)
+        length = len(snake.body)
+        index = self.cycle_index
+        start = index(head)
+        room = (index(snake.body[-1]) - start) % cells - 1 if length > 1 else cells
+        limit = 1
+        if 2 * length < cells:
+            limit = max(1, room - length - snake.grow - CUT_MARGIN)
+        if food is not None:
+            limit = min(limit, (index(food) - start) % cells)
+        reverse = (-snake.direction[0], -snake.direction[1])
+        best = None
+        best_ahead = 0
+        for direction in DIRECTIONS:
+            if direction == reverse:
+                continue
+            cell = self.step(head, direction)
+            ahead = (index(cell) - start) % cells
+            if best_ahead < ahead <= limit and not self.blocked(snake, cell):
+                best = direction
+                best_ahead = ahead
+        return best
+
+    def cycle_index(self, cell):
+        """Position of `cell` along the cycle `cycle_direction` follows."""
+        grid_count = self.grid_count
+        y, x = divmod(cell, grid_count)
+        return y * grid_count + (x + y) % grid_count
+
+    def in_cycle_order(self, body):
+        """Whether `body`, head first, runs backwards along the cycle and
+        winds around it less than once."""
+        cells = self.grid_count * self.grid_count
+        if len(body) <= 2:
+            return True
+        index = self.cycle_index
+        positions = [index(cell) for cell in body]
+        span = sum((a - b) % cells for a, b in zip(positions, positions[1:]))
+        return span < cells
+
+    def keeps_order(self, snake, head, cell):
+        """Whether moving from `head` to `cell` keeps the body in cycle
+        order: the new head must not pass the tail."""
+        if len(snake.body) == 1:
+            return True
+        cells = len(snake.counts)
+        index = self.cycle_index
+        start = index(head)
+        return (index(cell) - start) % cells <= (index(snake.body[-1]) - start) % cells
+
+    def cycle_direction(self, cell):
+        """Direction of the next cell on a Hamiltonian cycle of the wrapping
+        board: each row is walked to the right, dropping one row down one
+        column earlier than the row before."""
+        y, x = divmod(cell, self.grid_count)
+        return Direction.DOWN if (x + y + 1) % self.grid_count == 0 else Direction.RIGHT
+
+    def neighbours(self, cell):
+        """Cells one move away, in `DIRECTIONS` order."""
+        grid_count = self.grid_count
+        y, x = divmod(cell, grid_count)
+        row = y * grid_count
+        return (
+            (y - 1) % grid_count * grid_count + x,
+            (y + 1) % grid_count * grid_count + x,
+            row + (x - 1) % grid_count,
+            row + (x + 1) % grid_count,
+        )
+
+    def step(self, cell, direction):
+        return self.neighbours(cell)[DIRECTIONS.index(direction)]
+
+    def direction(self, cell, to):
+        return DIRECTIONS[self.neighbours(cell).index(to)]
+
+    def distance(self, cell, other):
+        grid_count = self.grid_count
+        y, x = divmod(cell, grid_count)
+        oy, ox = divmod(other, grid_count)
+        dx = abs(x - ox)
+        dy = abs(y - oy)
+        return min(dx, grid_count - dx) + min(dy, grid_count - dy)
+
+    def blocked(self, snake, cell):
+        """Whether moving into `cell` now would hit the body. The tail is
+        free unless the snake is about to grow."""
+        if not snake.counts[cell]:
+            return False
+        return snake.grow or cell != snake.body[-1] or len(snake.body) == 1
+
+    def search(self, start, goal, blocked, skip=None):
+        """A* shortest path from `start` to `goal` as a list of cells
+        (without `start`) avoiding cells for which `blocked(cell)` is true,
+        or None. The first step never goes to `skip`."""
+        parents = {start: None}
+        heap = [(self.distance(start, goal), 0, start)]
+        while heap:
+            _, steps, cell = heapq.heappop(heap)
+            if cell == goal:
+                path = []
+                while cell != start:
+                    path.append(cell)
+                    cell = parents[cell]
+                return path[::-1]
+            steps = 1 - steps  # Stored negated so longer paths pop first on ties
+            for next_cell in self.neighbours(cell):
+                if next_cell in parents or (next_cell != goal and blocked(next_cell)):
+                    continue
+                if cell == start and next_cell == skip:
+                    continue
+                parents[next_cell] = cell
+                heapq.heappush(
+                    heap, (steps + self.distance(next_cell, goal), -steps, next_cell)
+                )
+        return None
+
+    def safe_after(self, snake, path, food):
+        """Whether the tail can still be reached from the end of `path` once
+        the snake has followed it, eating the food if the path ends on it."""
+        body = snake.body
+        length = len(body) + snake.grow
+        moves = len(path)
+        kept = length - moves  # Old segments still in the body at the end
+        if kept > 0:
+            tail = body[kept - 1]
+            vacated = {body[i] for i in range(kept, len(body))}
+            new_cells = set(path)
+        else:
+            tail = path[-kept]
+            vacated = set(body)
+            new_cells = set(path[-kept:])
+        end = path[-1]
+        if end == tail:
+            return True
+
+        counts = snake.counts
+
+        def blocked(cell):
+            if cell == tail:
+                return False
+            return cell in new_cells or (counts[cell] > 0 and cell not in vacated)
+
+        # Right after eating the tail stays put for a move, so it cannot be
+        # the very next cell
+        skip = tail if end == food else None
+        return self.search(end, tail, blocked, skip) is not None
+
+
+def play(autopilot, engine, max_moves):
+    engine.autopilot = autopilot
+    while not engine.game_over and engine.moves < max_moves:
+        engine.step()
+    return engine
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Play a headless autopilot game")
+    parser.add_argument("--board", type=int, default=GRID_COUNT, metavar="N")
+    parser.add_argument(
+        "--difficulty",
+        default="Recommended",
+        choices=DIFFICULTIES,
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-moves", type=int, default=1_000_000)
+    args = parser.parse_args(argv)
+
+    autopilot = Autopilot()
+    engine = Engine(args.difficulty, random.Random(args.seed), args.board)
+    started = time.perf_counter()
+    play(autopilot, engine, args.max_moves)
+    result = {
+        "score": engine.score,
+        "length": len(engine.snake.body),
+        "moves": engine.moves,
+        "won": engine.won,
+        "game_over": engine.game_over,
+        "seconds": time.perf_counter() - started,
+        "planning": autopilot.summary(),
+    }
+    json.dump(result, sys.stdout, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    main()
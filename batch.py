@@ -0,0 +1,244 @@
+import numpy as np
+
+from engine import DIRECTIONS, GRID_COUNT, Direction, PowerUpEffect
+
+# Direction codes used by `BatchEngine.step` index `DIRECTIONS`; -1 keeps the
+# current direction
+OPPOSITE = np.array([1, 0, 3, 2], dtype=np.int8)
+
+# Power-up codes; -1 means no power-up
+POWER_UPS = [
+    PowerUpEffect.HALF_SPEED,
+    PowerUpEffect.DOUBLE_SPEED,
+    PowerUpEffect.DOUBLE_GROWTH,
+    PowerUpEffect.CONFUSION,
+]
+HALF_SPEED, DOUBLE_SPEED, DOUBLE_GROWTH, CONFUSION = range(len(POWER_UPS))
+
+BASE_SPEED = {"Beginner": 5, "Recommended": 8, "Expert": 12}
+
+
+class BatchEngine:
+    """N independent games advanced in lockstep with vectorised NumPy ops.
+
+    Follows the same rules as `Engine.step`: one call to `step(actions)`
+    moves every snake one cell, applies food, power-ups, levels and power-up
+    expiry, and resets each game that ended. All state lives in arrays with
+    one row per game; bodies are ring buffers of packed cells
+    (`y * grid_count + x`) and `occupancy` counts segments per cell.
+    """
+
+    def __init__(self, n, difficulty="Recommended", grid_count=GRID_COUNT, seed=None):
+        self.n = n
+        self.difficulty = difficulty
+        self.grid_count = grid_count
+        self.cells = grid_count * grid_count
+        self.rng = np.random.default_rng(seed)
+        self.rows = np.arange(n)
+
+        if difficulty == "Beginner":
+            self.power_up_choices = np.array([HALF_SPEED, DOUBLE_GROWTH], np.int8)
+        else:
+            self.power_up_choices = np.arange(len(POWER_UPS), dtype=np.int8)
+
+        # neighbours[cell, direction] is the cell one move away, with wrap
+        ys, xs = np.divmod(np.arange(self.cells), grid_count)
+        self.neighbours = np.stack(
+            [
+                (ys + dy) % grid_count * grid_count + (xs + dx) % grid_count
+                for dx, dy in DIRECTIONS
+            ],
+            axis=1,
+        ).astype(np.int32)
+
+        self.capacity = self.cells + 1  # Room for a full board plus the new head
+        self.body = np.zeros((n, self.capacity), np.int32)
+        self.start = np.zeros(n, np.int32)  # Ring index of the head
+        self.length = np.zeros(n, np.int32)
+        self.occupancy = np.zeros((n, self.cells), np.uint8)
+        self.direction = np.zeros(n, np.int8)
+        self.food = np.zeros(n, np.int32)
+        self.power_up = np.zeros(n, np.int8)
+        self.power_up_pos = np.zeros(n, np.int32)
+        self.active_power_up = np.zeros(n, np.int8)
+        self.score = np.zeros(n, np.int32)
+        self.last_score = np.zeros(n, np.int32)
+        self.level = np.zeros(n, np.int32)
+        self.moves = np.zeros(n, np.int64)
+        self.time = np.zeros(n, np.float64)  # Simulated seconds of play
+        self.grow = np.zeros(n, bool)
+        self.double_growth = np.zeros(n, bool)
+        self.confused = np.zeros(n, bool)
+        self.speed_mult = np.ones(n, np.float64)
+
+        # Results of the games that ended in the last step, valid where done
+        self.final_score = np.zeros(n, np.int32)
+        self.final_moves = np.zeros(n, np.int64)
+        self.won = np.zeros(n, bool)
+
+        self.reset(self.rows)
+
+    def reset(self, rows):
+        self.occupancy[rows] = 0
+        center = self.grid_count // 2 * self.grid_count + self.grid_count // 2
+        self.body[rows, 0] = center
+        self.start[rows] = 0
+        self.length[rows] = 1
+        self.occupancy[rows, center] = 1
+        self.direction[rows] = DIRECTIONS.index(Direction.RIGHT)
+        self.power_up[rows] = -1
+        self.power_up_pos[rows] = -1
+        self.active_power_up[rows] = -1
+        self.food[rows] = -1
+        self.food[rows] = self.random_positions(rows)
+        self.score[rows] = 0
+        self.last_score[rows] = 0
+        self.level[rows] = 1
+        self.moves[rows] = 0
+        self.time[rows] = 0
+        self.grow[rows] = False
+        self.double_growth[rows] = False
+        self.confused[rows] = False
+        self.speed_mult[rows] = 1.0
+
+    def random_positions(self, rows):
+        """Pick a uniform free cell for each game in `rows`, avoiding the
+        snake, the food and the power-up; -1 where the board is full."""
+        result = np.full(len(rows), -1, np.int32)
+        pending = np.arange(len(rows))
+        # Rejection sampling is O(1) expected until a board is nearly full
+        for _ in range(8):
+            if not len(pending):
+                return result
+            games = rows[pending]
+            cells = self.rng.integers(0, self.cells, len(pending))
+            ok = (
+                (self.occupancy[games, cells] == 0)
+                & (cells != self.food[games])
+                & (cells != self.power_up_pos[games])
+            )
+            result[pending[ok]] = cells[ok]
+            pending = pending[~ok]
+
+        for i in pending:
+            game = rows[i]
+            free = self.occupancy[game] == 0
+            for item in (self.food[game], self.power_up_pos[game]):
+                if item >= 0:
+                    free[item] = False
+            free = np.flatnonzero(free)
+            if len(free):
+                result[i] = free[self.rng.integers(len(free))]
+        return result
+
+    def get_current_speed(self):
+        base_speed = BASE_SPEED[self.difficulty]
+        if self.difficulty == "Beginner":
+            level_speed = 0
+        else:
+            level_speed = np.minimum(self.level * 0.5, 8)
+        return np.maximum(1, (base_speed + level_speed) * self.speed_mult)
+
+    def spawn_power_up(self, rows):
+        kinds = self.rng.choice(self.power_up_choices, len(rows))
+        pos = self.random_positions(rows)
+        self.power_up_pos[rows] = pos
+        self.power_up[rows] = np.where(pos >= 0, kinds, -1)
+
+    def head(self):
+        return self.body[self.rows, self.start]
+
+    def positions(self, game):
+        """(x, y) body of one game, head first, like `Snake.positions`."""
+        index = (self.start[game] + np.arange(self.length[game])) % self.capacity
+        ys, xs = np.divmod(self.body[game, index], self.grid_count)
+        return list(zip(xs.tolist(), ys.tolist()))
+
+    def step(self, actions=None):
+        """Move every game one cell.
+
+        `actions` holds a direction code per game (an index into
+        `DIRECTIONS`, or -1 to keep going). Returns a boolean array of the
+        games that ended on this move; they have already been reset and
+        their results are in `final_score`, `final_moves` and `won`.
+        """
+        rows = self.rows
+
+        # Turn: confusion inverts, 180-degree turns are ignored
+        if actions is not None:
+            actions = np.asarray(actions, np.int8)
+            turn = actions >= 0
+            wanted = np.where(self.confused, OPPOSITE[actions], actions)
+            turn &= wanted != OPPOSITE[self.direction]
+            self.direction = np.where(turn, wanted, self.direction)
+
+        # Generate a new power-up every 5 rounds (5th, 10th, etc.)
+        spawn = (
+            (self.score % 5 == 0)
+            & (self.score > 0)
+            & (self.power_up < 0)
+            & (self.score != self.last_score)
+        )
+        if spawn.any():
+            self.spawn_power_up(np.flatnonzero(spawn))
+
+        # Reset all temporary effects after 1 score
+        expire = (self.score > self.last_score) & (self.active_power_up >= 0)
+        self.confused[expire] = False
+        self.speed_mult[expire] = 1.0
+        self.active_power_up[expire] = -1
+        self.double_growth[expire] = False
+        self.last_score[:] = self.score
+
+        # Move: push the new head, pop the tail unless growing
+        self.time += 1 / self.get_current_speed()
+        head = self.neighbours[self.body[rows, self.start], self.direction]
+        self.start = (self.start - 1) % self.capacity
+        self.body[rows, self.start] = head
+        self.occupancy[rows, head] += 1
+        keep = ~self.grow
+        tail = self.body[rows, (self.start + self.length) % self.capacity]
+        self.occupancy[rows[keep], tail[keep]] -= 1
+        self.length += self.grow
+        self.grow[:] = False
+        self.moves += 1
+
+        done = self.occupancy[rows, head] > 1
+        alive = ~done
+
+        # Food
+        ate = alive & (head == self.food)
+        if ate.any():
+            self.score += np.where(ate, np.where(self.double_growth, 2, 1), 0)
+            self.level = self.score // 5 + 1
+            self.grow |= ate
+            self.double_growth &= ~ate
+            eaters = np.flatnonzero(ate)
+            self.food[eaters] = self.random_positions(eaters)
+            # Where only the power-up's cell is left, the food takes it
+            cornered = ate & (self.food < 0) & (self.power_up_pos >= 0)
+            self.food[cornered] = self.power_up_pos[cornered]
+            self.power_up[cornered] = -1
+            self.power_up_pos[cornered] = -1
+            full = ate & (self.food < 0)
+            done |= full
+            alive &= ~full
+        self.won = done & (self.food < 0)
+
+        # Power-up pickup
+        picked = alive & (self.power_up >= 0) & (head == self.power_up_pos)
+        if picked.any():
+            kind = self.power_up
+            self.active_power_up = np.where(picked, kind, self.active_power_up)
+            self.speed_mult[picked & (kind == HALF_SPEED)] = 0.5
+            self.speed_mult[picked & (kind == DOUBLE_SPEED)] = 2.0
+            self.double_growth |= picked & (kind == DOUBLE_GROWTH)
+            self.confused |= picked & (kind == CONFUSION)
+            self.power_up[picked] = -1
+            self.power_up_pos[picked] = -1
+
+        if done.any():
+            self.final_score[done] = self.score[done]
+            self.final_moves[done] = self.moves[done]
+            self.reset(np.flatnonzero(done))
+        return done
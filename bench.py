@@ -0,0 +1,250 @@
+"""Benchmarks for the simulation and render hot paths.
+
+Usage:
+    python bench.py                     # Run and compare with the baseline
+    python bench.py --save-baseline     # Record a new baseline
+    python bench.py --sizes 40 4000 --quick
+
+Results are written as JSON. Every metric is compared with the stored
+baseline and the run fails (exit status 1) when one is slower by more than
+`--tolerance`.
+"""
+
+import argparse
+import gc
+import itertools
+import json
+import os
+import platform
+import sys
+import time
+
+from engine import Direction, Engine, Snake
+
+SIZES = [40, 400, 2000]
+LENGTHS = [0.0, 0.01, 0.5, 0.9]  # Fractions of the board; 0 is a single cell
+
+
+def measure(func, min_time):
+    """Call `func` in growing batches for at least `min_time` seconds and
+    return the best time per call, in seconds.
+
+    The batches that size the run are a warm-up and are not timed. Garbage
+    is collected first and the collector is paused while timing, as
+    `timeit` does, so objects left over by earlier benchmarks (e.g. on
+    larger boards) do not slow down the ones that follow.
+    """
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time / 5:
+            break
+        number *= 10
+    gc.collect()
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        best = None
+        deadline = time.perf_counter() + min_time
+        while best is None or time.perf_counter() < deadline:
+            start = time.perf_counter()
+            for _ in range(number):
+                func()
+            elapsed = (time.perf_counter() - start) / number
+            best = elapsed if best is None else min(best, elapsed)
+    finally:
+        if enabled:
+            gc.enable()
+    return best
+
+
+def make_snake(grid_count, fraction):
+    """A snake covering `fraction` of the board along a boustrophedon path,
+    with its head at the end of the path heading along its row."""
+    length = max(1, int(grid_count * grid_count * fraction))
+
+    def path():
+        for i in range(length - 1, -1, -1):
+            y, x = divmod(i, grid_count)
+            yield (x if y % 2 == 0 else grid_count - 1 - x, y)
+
+    snake = Snake(grid_count)
+    snake.positions = path()
+    row = (length - 1) // grid_count
+    snake.direction = snake.next_direction = (
+        Direction.RIGHT if row % 2 == 0 else Direction.LEFT
+    )
+    return snake
+
+
+def steer(snake):
+    """Point `snake` along the boustrophedon path of `make_snake`. On an
+    even board the path wraps around into a cycle, so a snake that keeps
+    following it never runs into itself, however long the run."""
+    x, y = snake.head
+    last = snake.grid_count - 1
+    if y % 2 == 0:
+        snake.next_direction = Direction.DOWN if x == last else Direction.RIGHT
+    else:
+        snake.next_direction = Direction.DOWN if x == 0 else Direction.LEFT
+
+
+class PathFollower:
+    """Engine hook that steers with `steer` before every move."""
+
+    def on_move(self, engine):
+        steer(engine.snake)
+
+
+def make_engine(grid_count, fraction):
+    engine = Engine("Expert", grid_count=grid_count)
+    engine.snake = make_snake(grid_count, fraction)
+    engine.autopilot = PathFollower()
+    engine.food_pos = engine.power_up_pos = None
+    engine.food_pos = engine.get_random_position()
+    return engine
+
+
+def bench_logic(results, sizes, lengths, min_time):
+    for grid_count in sizes:
+        for fraction in lengths:
+            engine = make_engine(grid_count, fraction)
+            snake = engine.snake
+            tag = f"[grid={grid_count},length={len(snake.positions)}]"
+            print(f"logic {tag}", file=sys.stderr)
+
+            def move():
+                steer(snake)
+                snake.update()
+
+            results[f"snake_update{tag}"] = (1 / measure(move, min_time), "moves/s")
+            results[f"check_collision{tag}"] = (
+                measure(snake.check_collision, min_time) * 1e9,
+                "ns",
+            )
+            results[f"get_random_position{tag}"] = (
+                measure(engine.get_random_position, min_time) * 1e9,
+                "ns",
+            )
+            results[f"engine_tick{tag}"] = (
+                1 / measure(lambda: engine.tick(True), min_time),
+                "ticks/s",
+            )
+
+
+def bench_game(results, sizes, lengths, min_time):
+    import pygame
+
+    from main import Game
+    from render import DirtyRectRenderer, FullRenderer, GridRenderer
+
+    renderers = [
+        ("full", FullRenderer),
+        ("dirty", DirtyRectRenderer),
+        ("grid", GridRenderer),
+    ]
+    for grid_count, fraction in itertools.product(sizes, lengths):
+        for name, renderer in renderers:
+            game = Game(renderer(), headless=True, grid_count=grid_count)
+            game.difficulty = "Expert"
+            game.snake = make_snake(grid_count, fraction)
+            game.food_pos = game.get_random_position()
+            game.autopilot = PathFollower()
+            game.camera.center(game.snake.head)
+            tag = f"[grid={grid_count},length={len(game.snake.positions)}]"
+            print(f"game {name} {tag}", file=sys.stderr)
+
+            if name == "full":
+
+                def update():
+                    game.accumulator = 1000 / game.get_current_speed()  # One move due
+                    game.game_over = False  # Keep moving through the body
+                    game.update()
+
+                results[f"game_update{tag}"] = (
+                    1 / measure(update, min_time),
+                    "ticks/s",
+                )
+
+            def frame():
+                game.tick(True)
+                game.game_over = False  # Time play frames, not game over
+                game.draw()
+
+            game.draw()
+            results[f"game_draw_{name}{tag}"] = (measure(frame, min_time) * 1e3, "ms")
+    pygame.quit()
+
+
+def compare(results, baseline, tolerance):
+    """Return the metrics that got worse than `baseline` by more than
+    `tolerance` (a fraction), as (name, baseline, result) tuples."""
+    regressions = []
+    for name, entry in results.items():
+        if name not in baseline:
+            continue
+        old = baseline[name]["value"]
+        new = entry["value"]
+        if entry["unit"].endswith("/s"):
+            worse = new < old * (1 - tolerance)
+        else:
+            worse = new > old * (1 + tolerance)
+        if worse:
+            regressions.append((name, old, new))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES)
+    parser.add_argument("--lengths", type=float, nargs="+", default=LENGTHS)
+    parser.add_argument("--min-time", type=float, default=0.2)
+    parser.add_argument("--quick", action="store_true", help="shorter runs")
+    parser.add_argument("--no-render", action="store_true")
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--baseline", default="bench_baseline.json")
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args(argv)
+    min_time = args.min_time / 4 if args.quick else args.min_time
+
+    raw = {}
+    bench_logic(raw, args.sizes, args.lengths, min_time)
+    if not args.no_render:
+        bench_game(raw, args.sizes, args.lengths, min_time)
+    results = {
+        name: {"value": value, "unit": unit} for name, (value, unit) in raw.items()
+    }
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "processor": platform.processor(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+    path = args.baseline if args.save_baseline else args.output
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+        f.write("\n")
+
+    for name, entry in results.items():
+        print(f"{name:60} {entry['value']:>14.1f} {entry['unit']}")
+    if args.save_baseline or not os.path.exists(args.baseline):
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)["results"]
+    regressions = compare(results, baseline, args.tolerance)
+    for name, old, new in regressions:
+        print(f"REGRESSION {name}: {old:.1f} -> {new:.1f}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,253 @@
+"""Offscreen frame capture: render a game to PNG frames or raw RGB video.
+
+The game runs headless on a virtual clock, one `1000 / fps` ms step per
+frame, so nothing waits for the 60 FPS `clock.tick` and a long game exports
+in a fraction of its real length. Only frames that differ from the one
+before are drawn and encoded; the rest repeat it. Encoding runs on a thread
+pool (zlib releases the GIL) through a bounded queue of in-flight frames,
+overlapping with the drawing of the next ones.
+
+Output formats:
+- `png`: one PNG per changed frame in a directory, named by frame number,
+  plus `frames.ffconcat` listing how long each one is shown
+  (`ffmpeg -i frames/frames.ffconcat out.mp4`).
+- `raw`: every frame as packed RGB24 to a file or `-` for stdout
+  (`... --format raw --out - | ffmpeg -f rawvideo -pix_fmt rgb24
+  -s 800x800 -r 60 -i - out.mp4`).
+
+Usage:
+    python capture.py --replay session.snkr --out frames
+    python capture.py --autopilot --seed 3 --board 20 --out frames
+"""
+
+import argparse
+import json
+import os
+import random
+import struct
+import sys
+import time
+import zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import pygame
+
+from engine import DIFFICULTIES, GRID_COUNT
+from main import RENDERERS, Game
+from replay import Replay
+
+FPS = 60
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+def _png_chunk(kind, data):
+    crc = zlib.crc32(data, zlib.crc32(kind))
+    return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", crc)
+
+
+def encode_png(surface, level=1):
+    """PNG bytes of an RGB `surface`. Compressing with zlib directly at a
+    low level is several times faster than `pygame.image.save`."""
+    width, height = surface.get_size()
+    pixels = pygame.image.tostring(surface, "RGB")
+    stride = width * 3
+    # Filter type 0 (none) at the start of every row
+    rows = b"".join(
+        b"\0" + pixels[start : start + stride]
+        for start in range(0, len(pixels), stride)
+    )
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return b"".join(
+        [
+            PNG_SIGNATURE,
+            _png_chunk(b"IHDR", header),
+            _png_chunk(b"IDAT", zlib.compress(rows, level)),
+            _png_chunk(b"IEND", b""),
+        ]
+    )
+
+
+class Capture:
+    """Plays `game` (a headless `Game`) and writes its frames to `out`: a
+    directory for `png`, a path or binary file object for `raw`.
+
+    At most `queue_size` frames are being encoded or waiting to be written
+    at once; drawing waits for the oldest when the queue is full.
+    """
+
+    def __init__(
+        self, game, out, format="png", fps=FPS, workers=None, queue_size=None, level=1
+    ):
+        self.game = game
+        self.format = format
+        self.fps = fps
+        self.level = level  # zlib level of the PNGs
+        workers = workers or os.cpu_count() or 1
+        self.queue_size = queue_size or 2 * workers
+        self.executor = ThreadPoolExecutor(workers)
+        self.pending = deque()  # Futures in frame order, None repeats the last
+        self.key = None  # State drawn in the last frame
+        self.frames = 0
+        self.encoded = 0
+        self.shown = []  # png: (frame, file name) of every encoded frame
+        self.last = None  # raw: bytes of the last frame written
+        self.owned = False
+        if format == "png":
+            self.out = out
+            os.makedirs(out, exist_ok=True)
+        elif isinstance(out, str):
+            self.out = sys.stdout.buffer if out == "-" else open(out, "wb")
+            self.owned = out != "-"
+        else:
+            self.out = out
+
+    def run(self, max_frames=None, hold=1.0):
+        """Play until game over (and `hold` seconds more) or `max_frames`
+        frames; return a summary of the export."""
+        game = self.game
+        started = time.perf_counter()
+        step = 1000 / self.fps
+        game.last_update_time = 0
+        try:
+            while not game.ended() and self.frames != max_frames:
+                game.update(self.frames * step)
+                self.capture()
+            if game.game_over:
+                for _ in range(round(hold * self.fps)):
+                    if self.frames == max_frames:
+                        break
+                    self.capture()
+        finally:
+            self.close()
+        seconds = time.perf_counter() - started
+        return {
+            "frames": self.frames,
+            "encoded": self.encoded,
+            "skipped": self.frames - self.encoded,
+            "seconds": seconds,
+            "speedup": self.frames / self.fps / seconds if seconds else 0.0,
+            "score": game.score,
+            "moves": game.moves,
+        }
+
+    def frame_key(self):
+        """Everything a frame's picture depends on."""
+        game = self.game
+        return (
+            game.moves,
+            game.food_pos,
+            game.power_up_pos if game.power_up else None,
+            game.active_power_up,
+            game.game_over,
+            game.paused,
+            game.alpha if game.interpolate else None,
+        )
+
+    def capture(self):
+        index = self.frames
+        self.frames += 1
+        key = self.frame_key()
+        if key == self.key:
+            self.queue(None)
+            return
+        self.key = key
+        game = self.game
+        game.render()
+        surface = game.screen.copy()  # The workers get their own copy
+        self.encoded += 1
+        if self.format == "png":
+            name = f"{index:06d}.png"
+            self.shown.append((index, name))
+            path = os.path.join(self.out, name)
+            self.queue(self.executor.submit(self.save_png, surface, path))
+        else:
+            self.queue(self.executor.submit(pygame.image.tostring, surface, "RGB"))
+
+    def save_png(self, surface, path):
+        data = encode_png(surface, self.level)
+        with open(path, "wb") as f:
+            f.write(data)
+
+    def queue(self, future):
+        if future is None and self.format == "png":
+            return  # Only the durations in frames.ffconcat change
+        self.pending.append(future)
+        while len(self.pending) > self.queue_size:
+            self.finish_oldest()
+
+    def finish_oldest(self):
+        future = self.pending.popleft()
+        if future is not None:
+            self.last = future.result()  # Raises if encoding failed
+        if self.format == "raw":
+            self.out.write(self.last)
+
+    def close(self):
+        while self.pending:
+            self.finish_oldest()
+        self.executor.shutdown()
+        if self.format == "png":
+            self.write_concat()
+        elif self.owned:
+            self.out.close()
+        else:
+            self.out.flush()
+
+    def write_concat(self):
+        """Write `frames.ffconcat`, showing each PNG until the next one."""
+        lines = ["ffconcat version 1.0"]
+        ends = [index for index, _ in self.shown[1:]] + [self.frames]
+        for (index, name), end in zip(self.shown, ends):
+            lines.append(f"file '{name}'")
+            lines.append(f"duration {(end - index) / self.fps:.6f}")
+        if self.shown:
+            lines.append(f"file '{self.shown[-1][1]}'")  # ffmpeg drops the last
+        with open(os.path.join(self.out, "frames.ffconcat"), "w") as f:
+            f.write("\n".join(lines) + "\n")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export a game as video frames")
+    parser.add_argument("--out", required=True, help="directory, or file for raw")
+    parser.add_argument("--format", choices=["png", "raw"], default="png")
+    parser.add_argument("--replay", metavar="FILE", help="capture a recorded game")
+    parser.add_argument(
+        "--autopilot", action="store_true", help="capture an autopilot game"
+    )
+    parser.add_argument(
+        "--difficulty",
+        default="Recommended",
+        choices=DIFFICULTIES,
+    )
+    parser.add_argument("--board", type=int, default=GRID_COUNT, metavar="N")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--fps", type=int, default=FPS)
+    parser.add_argument("--max-frames", type=int, default=None)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--renderer", choices=RENDERERS, default="dirty")
+    parser.add_argument("--smooth", action="store_true")
+    args = parser.parse_args(argv)
+
+    replay = Replay.open(args.replay) if args.replay else None
+    game = Game(
+        renderer=RENDERERS[args.renderer](),
+        replay=replay,
+        interpolate=args.smooth,
+        headless=True,
+        grid_count=args.board,
+        autopilot=args.autopilot,
+    )
+    if replay is None:
+        game.difficulty = args.difficulty
+        game.rng = random.Random(args.seed)
+        game.reset()
+    capture = Capture(game, args.out, args.format, args.fps, args.workers)
+    summary = capture.run(args.max_frames)
+    json.dump(summary, sys.stderr if args.out == "-" else sys.stdout, indent=2)
+    print(file=sys.stderr if args.out == "-" else sys.stdout)
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,749 @@
+import heapq
+import random
+from array import array
+from collections import deque
+
+# Constants
+GRID_COUNT = 40
+MAX_QUEUED_TURNS = 3  # Turns buffered ahead of the snake
+POWER_UP_EVERY = 5  # A power-up spawns at every multiple of this score
+MAX_STEPS_PER_FRAME = 20  # Moves made per advance() before dropping backlog
+# Difficulty levels by the index that stands for them in recordings,
+# snapshots and network messages
+DIFFICULTIES = ["Beginner", "Recommended", "Expert"]
+
+# Clocks that power-up durations and timeline events are measured on; each
+# is also the name of the Engine attribute holding its current reading
+MOVES, TICKS, SCORE = "moves", "ticks", "score"
+SPAWN = "spawn"  # Timeline event: spawn a power-up
+
+
+class Direction:
+    UP = (0, -1)
+    DOWN = (0, 1)
+    LEFT = (-1, 0)
+    RIGHT = (1, 0)
+
+
+# Directions by the index that stands for them in recordings, snapshots,
+# network messages and agent actions
+DIRECTIONS = [Direction.UP, Direction.DOWN, Direction.LEFT, Direction.RIGHT]
+
+
+class PowerUpEffect:
+    HALF_SPEED = "Half Speed"
+    DOUBLE_SPEED = "Double Speed"
+    DOUBLE_GROWTH = "x2"
+    CONFUSION = "Confusion"
+
+
+class CellRing:
+    """Growable ring buffer of packed cell indices, head first.
+
+    Pushing at the front and popping at the back are O(1) and each segment
+    costs four bytes instead of a tuple.
+    """
+
+    __slots__ = ("_buf", "_start", "_len")
+
+    def __init__(self, cells=(), capacity=16):
+        cells = array("i", cells)
+        self._buf = cells + array("i", bytes(4 * max(capacity - len(cells), 1)))
+        self._start = 0
+        self._len = len(cells)
+
+    def __len__(self):
+        return self._len
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self._len
+        if not 0 <= index < self._len:
+            raise IndexError("ring index out of range")
+        return self._buf[(self._start + index) % len(self._buf)]
+
+    def __iter__(self):
+        return iter(self.to_array())
+
+    def to_array(self):
+        """The cells, head first, as a new contiguous `array("i")`."""
+        end = self._start + self._len
+        if end <= len(self._buf):
+            return self._buf[self._start : end]
+        return self._buf[self._start :] + self._buf[: end - len(self._buf)]
+
+    def push_front(self, cell):
+        if self._len == len(self._buf):
+            # Unroll into a buffer twice the size
+            self._buf = array("i", self) + array("i", bytes(4 * self._len))
+            self._start = 0
+        self._start = (self._start - 1) % len(self._buf)
+        self._buf[self._start] = cell
+        self._len += 1
+
+    def pop_back(self):
+        self._len -= 1
+        return self._buf[(self._start + self._len) % len(self._buf)]
+
+    def copy(self):
+        ring = CellRing.__new__(CellRing)
+        ring._buf = self._buf[:]
+        ring._start = self._start
+        ring._len = self._len
+        return ring
+
+
+class FreeCells:
+    """Set of free cells supporting O(1) add, discard and uniform choice.
+
+    `cells[:size]` holds the free cells and `slots` maps every cell to its
+    index in `cells`; removing a cell swaps it with the last free one. Both
+    arrays store offsets from the identity permutation, so a fresh index is
+    all zeros and costs no Python-level work even on huge boards.
+    """
+
+    __slots__ = ("cells", "slots", "size")
+
+    def __init__(self, count):
+        self.cells = array("i", bytes(4 * count))
+        self.slots = array("i", bytes(4 * count))
+        self.size = count
+
+    def __len__(self):
+        return self.size
+
+    def __contains__(self, cell):
+        return cell + self.slots[cell] < self.size
+
+    def _swap(self, cell, slot, other_slot):
+        other = other_slot + self.cells[other_slot]
+        self.cells[slot] = other - slot
+        self.slots[other] = slot - other
+        self.cells[other_slot] = cell - other_slot
+        self.slots[cell] = other_slot - cell
+
+    def discard(self, cell):
+        slot = cell + self.slots[cell]
+        if slot < self.size:
+            self.size -= 1
+            self._swap(cell, slot, self.size)
+
+    def add(self, cell):
+        slot = cell + self.slots[cell]
+        if slot >= self.size:
+            self._swap(cell, slot, self.size)
+            self.size += 1
+
+    def choice(self, rng):
+        slot = rng.randrange(self.size)
+        return slot + self.cells[slot]
+
+    def copy(self):
+        free = FreeCells.__new__(FreeCells)
+        free.cells = self.cells[:]
+        free.slots = self.slots[:]
+        free.size = self.size
+        return free
+
+
+class BodyView:
+    """Read-only `(x, y)` view over a snake body, for code that still reads
+    `snake.positions`."""
+
+    __slots__ = ("_snake",)
+
+    def __init__(self, snake):
+        self._snake = snake
+
+    def __len__(self):
+        return len(self._snake.body)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        y, x = divmod(self._snake.body[index], self._snake.grid_count)
+        return (x, y)
+
+    def __iter__(self):
+        grid_count = self._snake.grid_count
+        for cell in self._snake.body:
+            y, x = divmod(cell, grid_count)
+            yield (x, y)
+
+    def __contains__(self, pos):
+        return self._snake.occupies(pos)
+
+    def __eq__(self, other):
+        return list(self) == list(other)
+
+    def __repr__(self):
+        return repr(list(self))
+
+
+class Snake:
+    __slots__ = (
+        "grid_count",
+        "body",
+        "counts",
+        "free",
+        "direction",
+        "next_direction",
+        "grow",
+        "double_growth",
+        "confused",
+        "speed_mult",
+        "shared",
+    )
+
+    def __init__(self, grid_count=GRID_COUNT, board=None):
+        # `board`, if given, is a `(counts, free)` occupancy index shared
+        # with other snakes: this snake's segments are counted in it instead
+        # of in a private one, so a head landing on any snake shows up in
+        # check_collision()
+        self.grid_count = grid_count
+        self.shared = board is not None
+        if self.shared:
+            self.counts, self.free = board
+            self.body = CellRing()
+        self.reset()
+
+    def reset(self):
+        self.positions = [(self.grid_count // 2, self.grid_count // 2)]
+        self.direction = Direction.RIGHT
+        self.next_direction = Direction.RIGHT
+        self.grow = False
+        self.double_growth = False
+        self.confused = False
+        self.speed_mult = 1.0
+
+    @property
+    def positions(self):
+        return BodyView(self)
+
+    @positions.setter
+    def positions(self, positions):
+        grid_count = self.grid_count
+        self.cells = [y * grid_count + x for x, y in positions]
+
+    @property
+    def cells(self):
+        return self.body
+
+    @cells.setter
+    def cells(self, cells):
+        # Body cells are packed as y * grid_count + x. `counts` is the
+        # occupancy index: how many segments sit on each cell, kept in step
+        # with the body so collision and free-cell queries are O(1). `free`
+        # holds every cell the body does not cover.
+        cells = array("i", cells)  # Read once: `cells` may be an iterator
+        grid_count = self.grid_count
+        if self.shared:
+            self.lift()
+        else:
+            self.counts = bytearray(grid_count * grid_count)
+            self.free = FreeCells(grid_count * grid_count)
+        self.body = CellRing(cells)
+        for cell in cells:
+            self.counts[cell] += 1
+            self.free.discard(cell)
+
+    def lift(self):
+        """Take the body off the board, leaving the snake empty."""
+        counts = self.counts
+        for cell in self.body:
+            counts[cell] -= 1
+            if not counts[cell]:
+                self.free.add(cell)
+        self.body = CellRing()
+
+    def copy(self, board=None):
+        """An independent copy with its own occupancy index, or counted in
+        `board`, a shared `(counts, free)` index that already holds it."""
+        snake = Snake.__new__(Snake)
+        for name in Snake.__slots__:
+            setattr(snake, name, getattr(self, name))
+        snake.body = self.body.copy()
+        if board is None:
+            snake.counts = bytearray(self.counts)
+            snake.free = self.free.copy()
+            snake.shared = False
+        else:
+            snake.counts, snake.free = board
+            snake.shared = True
+        return snake
+
+    @property
+    def head(self):
+        y, x = divmod(self.body[0], self.grid_count)
+        return (x, y)
+
+    def update(self):
+        """Move one cell; return the vacated tail cell, or -1 when growing."""
+        self.direction = dx, dy = self.next_direction
+        grid_count = self.grid_count
+        y, x = divmod(self.body[0], grid_count)
+        return self.move_to((y + dy) % grid_count * grid_count + (x + dx) % grid_count)
+
+    def move_to(self, new_head):
+        """Push `new_head` and, unless growing, drop the tail: the move that
+        update() makes, for callers that already know the new head cell
+        (e.g. a client applying server updates)."""
+        counts = self.counts
+        self.body.push_front(new_head)
+        counts[new_head] += 1
+        if counts[new_head] == 1:
+            self.free.discard(new_head)
+        tail = -1
+        if not self.grow:
+            tail = self.body.pop_back()
+            counts[tail] -= 1
+            if not counts[tail]:
+                self.free.add(tail)
+        self.grow = False
+        return tail
+
+    def occupies(self, pos):
+        return self.counts[pos[1] * self.grid_count + pos[0]] > 0
+
+    def check_collision(self):
+        return self.counts[self.body[0]] > 1
+
+
+class PowerUp:
+    """A kind of power-up: what it does and how long it lasts.
+
+    `apply(snake)` switches the effect on through the snake's modifiers
+    (`speed_mult`, `confused`, `double_growth`). When an effect ends the
+    modifiers are reset and the effects still active are applied again, so
+    the usual effect needs no revert; `revert(engine)`, if given, is called
+    on expiry to undo anything else it changed. An effect lasts `duration`
+    units of `unit` (MOVES, TICKS or SCORE) from its pickup. Picking up a
+    power-up that `stacks` while it is active adds a second copy; otherwise
+    the running one starts over. Only `good` power-ups spawn on Beginner.
+    """
+
+    def __init__(
+        self, name, apply, good=True, duration=1, unit=SCORE, stacks=False, revert=None
+    ):
+        self.name = name
+        self.apply = apply
+        self.good = good
+        self.duration = duration
+        self.unit = unit
+        self.stacks = stacks
+        self.revert = revert
+
+
+# Every power-up that can spawn, by name, in the order they are drawn from
+POWER_UPS = {}
+
+
+def register_power_up(power_up):
+    POWER_UPS[power_up.name] = power_up
+    return power_up
+
+
+def _set(name, value):
+    def apply(snake):
+        setattr(snake, name, value)
+
+    return apply
+
+
+# The built-in power-ups last until the next food is eaten
+register_power_up(
+    PowerUp(PowerUpEffect.DOUBLE_SPEED, _set("speed_mult", 2.0), good=False)
+)
+register_power_up(PowerUp(PowerUpEffect.CONFUSION, _set("confused", True), good=False))
+register_power_up(PowerUp(PowerUpEffect.HALF_SPEED, _set("speed_mult", 0.5)))
+register_power_up(PowerUp(PowerUpEffect.DOUBLE_GROWTH, _set("double_growth", True)))
+
+
+def apply_power_up(snake, power_up):
+    POWER_UPS[power_up].apply(snake)
+
+
+def clear_power_up(snake):
+    snake.confused = False
+    snake.speed_mult = 1.0
+    snake.double_growth = False
+
+
+class Timeline:
+    """Events scheduled for a given reading of one of the engine's clocks.
+
+    Each clock (MOVES, TICKS or SCORE) has its own heap ordered by due
+    time, so finding out whether anything is due costs O(1) however many
+    events are pending. Events due at the same time come out in the order
+    they were scheduled.
+    """
+
+    def __init__(self):
+        self.queues = {MOVES: [], TICKS: [], SCORE: []}
+        self.count = 0
+
+    def schedule(self, unit, due, event):
+        heapq.heappush(self.queues[unit], (due, self.count, event))
+        self.count += 1
+
+    def due(self, unit, now):
+        queue = self.queues[unit]
+        return bool(queue) and queue[0][0] <= now
+
+    def pop(self, unit):
+        return heapq.heappop(self.queues[unit])[2]
+
+    def events(self):
+        """Pending `(unit, due, event)` triples in the order they were
+        scheduled."""
+        pending = sorted(
+            (count, unit, due, event)
+            for unit, queue in self.queues.items()
+            for due, count, event in queue
+        )
+        return [(unit, due, event) for _, unit, due, event in pending]
+
+    def copy(self):
+        timeline = Timeline()
+        timeline.queues = {unit: queue[:] for unit, queue in self.queues.items()}
+        timeline.count = self.count
+        return timeline
+
+
+# Engine attributes that make up the state of a game, besides the snake
+STATE = (
+    "difficulty",
+    "grid_count",
+    "food_pos",
+    "power_up",
+    "power_up_pos",
+    "score",
+    "level",
+    "game_over",
+    "won",
+    "active_power_up",
+    "ticks",
+    "moves",
+    "vacated",
+)
+
+
+class Engine:
+    """Display-free game logic.
+
+    Holds the snake, food, power-ups, score and level. It never touches
+    pygame and has no notion of wall-clock time: the caller advances it
+    with `step()` (one move) or `tick(move)` (one frame).
+    """
+
+    def __init__(self, difficulty=None, rng=None, grid_count=GRID_COUNT):
+        self.difficulty = difficulty
+        self.grid_count = grid_count  # Cells per side of the (square) board
+        # Source of randomness for food and power-ups; pass a seeded
+        # random.Random for reproducible games
+        self.rng = rng if rng is not None else random
+        # Optional journal of packed cells whose snake segment changed (new
+        # head, old head, vacated tail). Renderers and other consumers set it
+        # to a list and clear it after reading.
+        self.changed_cells = None
+        # Optional hook called as input_log.on_move(engine) right before each
+        # move, used to record or replay direction changes
+        self.input_log = None
+        # Optional planner called as autopilot.on_move(engine) right before
+        # each move, after queued turns, to set the snake's next direction
+        self.autopilot = None
+        # Optional hook told about power-ups as power_up_log.on_spawn(engine)
+        # once one is on the board and power_up_log.on_pickup(engine, name)
+        # when the snake takes it, e.g. to count them
+        self.power_up_log = None
+        self.power_up_pos = None
+        self.active_power_up = None
+        self.reset()
+
+    def reset(self):
+        self.snake = Snake(self.grid_count)
+        self.power_up = None
+        self.power_up_pos = None
+        self.food_pos = None
+        self.food_pos = self.get_random_position()
+        self.reset_state()
+
+    def reset_state(self):
+        """Start the score, clocks, power-up timeline and turn queue of a new
+        game: everything `reset()` sets up but the board."""
+        self.score = 0
+        self.level = 1
+        self.game_over = False
+        self.won = False  # Set when the snake fills the whole board
+        self.active_power_up = None  # Latest power-up still in effect
+        # Effects in force as (name, unit, due) triples, oldest first
+        self.effects = []
+        # Power-up spawns and expiries, checked in O(1) per tick
+        self.timeline = Timeline()
+        self.timeline.schedule(SCORE, POWER_UP_EVERY, SPAWN)
+        self.moves = 0
+        self.ticks = 0  # Calls to tick(), moving or not
+        self.vacated = -1  # Tail cell freed by the last move, -1 if it grew
+        # Pending (direction, stamp) turns, one consumed per move. `stamp` is
+        # whatever the caller passed to queue_turn (e.g. the key press time)
+        # and is copied to applied_turn_stamp when the turn takes effect.
+        self.turns = deque()
+        self.applied_turn_stamp = None
+        self.accumulator = 0.0  # Elapsed ms not yet spent on moves
+        self.dropped_moves = 0  # Moves that were due but dropped by advance()
+
+    def fork(self, rng=None):
+        """An independent copy of the game, for branching simulations.
+
+        The copy is a plain `Engine` with its own snake and, unless `rng` is
+        given, a copy of this engine's random state, so it plays on exactly
+        like the original until the two are given different moves. Hooks
+        and queued turns are not copied.
+        """
+        if rng is None:
+            rng = random.Random()
+            rng.setstate(self.rng.getstate())
+        engine = Engine.__new__(Engine)
+        for name in STATE:
+            setattr(engine, name, getattr(self, name))
+        engine.snake = self.snake.copy()
+        engine.effects = list(self.effects)
+        engine.timeline = self.timeline.copy()
+        engine.rng = rng
+        engine.changed_cells = None
+        engine.input_log = None
+        engine.autopilot = None
+        engine.power_up_log = None
+        engine.turns = deque()
+        engine.applied_turn_stamp = None
+        engine.accumulator = self.accumulator
+        engine.dropped_moves = 0
+        return engine
+
+    def get_random_position(self):
+        """Return a uniformly chosen cell not covered by the snake, the food
+        or the power-up, or None when the board is full."""
+        free = self.snake.free
+        grid_count = self.snake.grid_count
+        blocked = [
+            pos[1] * grid_count + pos[0]
+            for pos in (self.food_pos, self.power_up_pos)
+            if pos is not None
+        ]
+        blocked = [cell for cell in blocked if cell in free]
+        if len(free) <= len(blocked):
+            return None
+
+        # At most two free cells are blocked, so this takes O(1) tries
+        while True:
+            cell = free.choice(self.rng)
+            if cell not in blocked:
+                y, x = divmod(cell, grid_count)
+                return (x, y)
+
+    def spawn_power_up(self):
+        # Force spawn a power-up regardless of level
+        beginner = self.difficulty == "Beginner"
+        power_ups = [
+            name for name, power_up in POWER_UPS.items() if power_up.good or not beginner
+        ]
+
+        # Always spawn a power-up, unless there is no room left for it
+        power_up = self.rng.choice(power_ups)
+        self.power_up_pos = self.get_random_position()
+        self.power_up = power_up if self.power_up_pos is not None else None
+        if self.power_up is not None and self.power_up_log is not None:
+            self.power_up_log.on_spawn(self)
+
+    def turn(self, direction):
+        if self.snake.confused:
+            # Invert directions when confused
+            direction = (-direction[0], -direction[1])
+
+        # Prevent 180-degree turns
+        current = self.snake.direction
+        if (-current[0], -current[1]) != direction:
+            self.snake.next_direction = direction
+
+    def queue_turn(self, direction, stamp=None):
+        """Buffer a requested turn until the next free move.
+
+        Quick turns made between two moves are all kept, up to
+        MAX_QUEUED_TURNS. Repeats and reversals are checked against the last
+        queued turn rather than the current direction. Returns True if the
+        turn was queued.
+        """
+        if self.turns:
+            last = self.turns[-1][0]
+        else:
+            last = self.snake.next_direction
+            if self.snake.confused:
+                last = (-last[0], -last[1])
+        if direction == last or direction == (-last[0], -last[1]):
+            return False
+        if len(self.turns) >= MAX_QUEUED_TURNS:
+            return False
+        self.turns.append((direction, stamp))
+        return True
+
+    def consume_turn(self):
+        # Confusion is applied now, when the turn is used, not when queued
+        snake = self.snake
+        current = snake.direction
+        while self.turns:
+            direction, stamp = self.turns.popleft()
+            if snake.confused:
+                direction = (-direction[0], -direction[1])
+            if direction != current and direction != (-current[0], -current[1]):
+                snake.next_direction = direction
+                self.applied_turn_stamp = stamp
+                return
+
+    def step(self, action=None):
+        """Advance the game by exactly one move.
+
+        `action` is an optional `Direction` requested for this move; it goes
+        through the same confusion and 180-degree rules as keyboard input.
+        Returns True once the game is over.
+        """
+        if action is not None:
+            self.turn(action)
+        self.tick(True)
+        return self.game_over
+
+    def advance(self, elapsed, on_move=None):
+        """Play `elapsed` ms of the game at its own speed.
+
+        Fixed timestep: makes every move that is due and carries the
+        remainder, so the speed does not depend on how often this is called;
+        with no move due it still ticks once. Past MAX_STEPS_PER_FRAME moves
+        the rest of the backlog is dropped and counted in `dropped_moves`.
+        `on_move(engine)` is called after each move. Returns the moves made.
+        """
+        self.accumulator += elapsed
+        move_delay = 1000 / self.get_current_speed()
+        self.dropped_moves = 0
+        steps = 0
+        while self.accumulator >= move_delay and not self.game_over:
+            if steps == MAX_STEPS_PER_FRAME:
+                # Too far behind (e.g. the window was dragged): drop the rest
+                self.dropped_moves = int(self.accumulator // move_delay)
+                self.accumulator %= move_delay
+                break
+            self.tick(True)
+            if on_move is not None:
+                on_move(self)
+            self.accumulator -= move_delay
+            steps += 1
+            move_delay = 1000 / self.get_current_speed()
+        if not steps and not self.game_over:
+            self.tick(False)
+        return steps
+
+    def tick(self, move):
+        self.ticks += 1
+        # Spawn or expire power-ups when the timeline says so
+        timeline = self.timeline
+        if timeline.due(SCORE, self.score):
+            self.run_timeline(SCORE, self.score)
+        if timeline.due(TICKS, self.ticks):
+            self.run_timeline(TICKS, self.ticks)
+
+        if move:
+            snake = self.snake
+            if self.turns:
+                self.consume_turn()
+            if self.autopilot is not None:
+                self.autopilot.on_move(self)
+            if self.input_log is not None:
+                self.input_log.on_move(self)
+            old_head = snake.body[0]
+            tail = snake.update()
+            self.vacated = tail
+            self.moves += 1
+            if timeline.due(MOVES, self.moves):
+                self.run_timeline(MOVES, self.moves)
+            if self.changed_cells is not None:
+                self.changed_cells.append(old_head)
+                self.changed_cells.append(snake.body[0])
+                if tail >= 0:
+                    self.changed_cells.append(tail)
+
+        # Check collisions
+        if self.snake.check_collision():
+            self.game_over = True
+            return
+
+        # Check food collision
+        if self.snake.head == self.food_pos:
+            # Apply double score if double_growth is active
+            score_increase = 2 if self.snake.double_growth else 1
+            self.score += score_increase
+            self.level = (self.score // 5) + 1
+            self.snake.grow = True
+            if self.snake.double_growth:
+                self.snake.grow = True  # Will grow again next update
+                self.snake.double_growth = False
+            self.food_pos = self.get_random_position()
+            if self.food_pos is None and self.power_up_pos is not None:
+                # Only the power-up's cell is left: the food takes it
+                self.food_pos = self.power_up_pos
+                self.power_up = None
+                self.power_up_pos = None
+            if self.food_pos is None:
+                # No free cell left: the snake has filled the board
+                self.won = True
+                self.game_over = True
+                return
+
+        # Check power-up collision
+        if self.power_up and self.snake.head == self.power_up_pos:
+            if self.power_up_log is not None:
+                self.power_up_log.on_pickup(self, self.power_up)
+            self.start_effect(self.power_up)
+            self.power_up = None
+            self.power_up_pos = None
+
+    def run_timeline(self, unit, now):
+        """Handle every event due on clock `unit` at reading `now`."""
+        timeline = self.timeline
+        while timeline.due(unit, now):
+            event = timeline.pop(unit)
+            if event == SPAWN:
+                # Only on an exact multiple: a double-growth jump over one
+                # skips that power-up
+                if self.score % POWER_UP_EVERY == 0 and not self.power_up:
+                    self.spawn_power_up()
+                due = (self.score // POWER_UP_EVERY + 1) * POWER_UP_EVERY
+                timeline.schedule(SCORE, due, SPAWN)
+            elif event in self.effects:  # Not restarted since
+                self.effects.remove(event)
+                self.end_effect(event)
+
+    def start_effect(self, name):
+        power_up = POWER_UPS[name]
+        if not power_up.stacks:
+            self.effects = [effect for effect in self.effects if effect[0] != name]
+        effect = (name, power_up.unit, getattr(self, power_up.unit) + power_up.duration)
+        self.effects.append(effect)
+        self.timeline.schedule(power_up.unit, effect[2], effect)
+        power_up.apply(self.snake)
+        self.active_power_up = name
+
+    def end_effect(self, effect):
+        snake = self.snake
+        clear_power_up(snake)
+        for name, _, _ in self.effects:
+            POWER_UPS[name].apply(snake)
+        revert = POWER_UPS[effect[0]].revert
+        if revert is not None:
+            revert(self)
+        self.active_power_up = self.effects[-1][0] if self.effects else None
+
+    def get_current_speed(self):
+        # Calculate speed based on difficulty and level
+        base_speed = {"Beginner": 5, "Recommended": 8, "Expert": 12}[self.difficulty]
+
+        # Add level-based speed increase for non-beginner modes
+        level_speed = 0 if self.difficulty == "Beginner" else min(self.level * 0.5, 8)
+        return max(1, (base_speed + level_speed) * self.snake.speed_mult)
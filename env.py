@@ -0,0 +1,233 @@
+"""Gym-style reinforcement-learning environment over `Engine`.
+
+`SnakeEnv.reset(seed)` starts a game and `step(action)` makes one move,
+returning `(observation, reward, done, info)`. Moves go through
+`Engine.step`, the same logic `Game.update` runs, power-ups and confusion
+included; speed power-ups only change how fast `Game` plays moves, so
+here they show up in `info` alone. Actions index `DIRECTIONS`; None or -1
+keeps going straight.
+
+Observations are uint8 cell states (`grid.EMPTY` ... `grid.POWER_UP`),
+indexed `[y, x]`, and are NumPy views into a persistent buffer: after each
+move only the cells the engine reports as changed (new head, old head,
+vacated tail) and the food and power-up cells that moved are rewritten, so
+a step allocates no arrays and never walks the body.
+
+- `frames=N` stacks the last N boards, oldest first, as an `(N, ...)` view.
+  The boards form a ring, each held twice so that the window of the last N
+  is always contiguous. A move takes over the oldest board's planes and
+  rewrites only the cells that changed in the last N moves.
+- `crop=S` (odd) gives an `S x S` view centred on the head instead of the
+  whole board, wrapping around the edges. Boards are stored with an
+  `S // 2` border mirroring the opposite edges, which makes any such
+  window a plain slice. `board` is still the whole newest board.
+
+Views are only valid until the next `step()` or `reset()`; copy one to
+keep it. Once `done` is returned, `step()` raises until `reset()`.
+"""
+
+import random
+from array import array
+
+import numpy as np
+
+from engine import DIRECTIONS, GRID_COUNT, Engine
+from grid import BODY, EMPTY, FOOD, HEAD, POWER_UP, cell_grid
+
+# Cells a move can change: old and new head, the vacated tail, and the old
+# and new food and power-up
+CHANGES_PER_MOVE = 7
+
+
+class SnakeEnv:
+    """One game for an agent. The reward is the score gained by the move,
+    or -1 when it ends the game without filling the board. `done` is also
+    set after `max_moves` moves."""
+
+    action_count = len(DIRECTIONS)
+
+    def __init__(
+        self,
+        difficulty="Recommended",
+        grid_count=GRID_COUNT,
+        frames=1,
+        crop=None,
+        max_moves=None,
+    ):
+        if crop is not None and (crop % 2 == 0 or crop > grid_count):
+            raise ValueError("crop must be odd and no larger than the board")
+        self.engine = Engine(difficulty, random.Random(), grid_count)
+        self.engine.changed_cells = []  # Cells to rewrite after each move
+        self.grid_count = grid_count
+        self.frames = frames
+        self.crop = crop
+        self.border = crop // 2 if crop else 0
+        side = grid_count + 2 * self.border
+        # Board `i` is kept in planes[i] and, when stacking, planes[i + frames]
+        self.planes = np.zeros((2 * frames if frames > 1 else 1, side, side), np.uint8)
+        self.slot = 0  # Ring index of the newest board
+        # Planes holding each board of the ring, and the newest board's
+        self.plane_pairs = [(i, i + frames) for i in range(frames)]
+        self.copies = (0,)
+        # Cells rewritten by each of the last `frames` moves, a row of
+        # CHANGES_PER_MOVE per board in the ring, padded with -1
+        self.changes = array("i", [-1]) * (CHANGES_PER_MOVE * frames)
+        # Step each cell was last rewritten in, so a cell changed by several
+        # of those moves is written once
+        self.written = array("q", bytes(8 * grid_count * grid_count))
+        self.steps = 0
+        self.done = False
+        self.items = (-1, -1)  # Food and power-up cells written to the board
+        self.max_moves = max_moves
+        self.info = None
+        size = crop or grid_count
+        self.observation_shape = (frames, size, size) if frames > 1 else (size, size)
+
+    def reset(self, seed=None):
+        engine = self.engine
+        engine.rng = random.Random(seed)
+        engine.reset()
+        engine.changed_cells.clear()
+
+        planes = self.planes
+        border = self.border
+        grid_count = self.grid_count
+        planes[:, border : border + grid_count, border : border + grid_count] = (
+            cell_grid(engine)
+        )
+        if border:
+            end = border + grid_count
+            planes[:, :border] = planes[:, grid_count:end]
+            planes[:, end:] = planes[:, border : 2 * border]
+            planes[:, :, :border] = planes[:, :, grid_count:end]
+            planes[:, :, end:] = planes[:, :, border : 2 * border]
+        self.slot = 0
+        if self.frames > 1:
+            self.copies = self.plane_pairs[0]
+        changes = self.changes
+        for i in range(len(changes)):
+            changes[i] = -1
+        self.done = False
+        self.items = self.read_items()
+        self.info = self.read_info()
+        return self.observation()
+
+    def step(self, action):
+        if self.done:
+            raise RuntimeError("step() after the episode ended; call reset()")
+        engine = self.engine
+        score = engine.score
+        if action is None or action < 0:
+            engine.step()
+        else:
+            engine.step(DIRECTIONS[action])
+
+        items = self.read_items()
+        cells = engine.changed_cells
+        if items != self.items:
+            for pair in (self.items, items):
+                for cell in pair:
+                    if cell >= 0:
+                        cells.append(cell)
+            self.items = items
+        if self.frames > 1:
+            # The planes taken over hold the board of `frames` moves ago, so
+            # only the cells changed since need rewriting
+            self.slot = (self.slot + 1) % self.frames
+            self.copies = self.plane_pairs[self.slot]
+            changes = self.changes
+            row = self.slot * CHANGES_PER_MOVE
+            for i in range(CHANGES_PER_MOVE):
+                changes[row + i] = cells[i] if i < len(cells) else -1
+            cells = changes
+        self.steps += 1
+        steps = self.steps
+        written = self.written
+        for cell in cells:
+            if cell >= 0 and written[cell] != steps:
+                written[cell] = steps
+                self.write(cell, items)
+        engine.changed_cells.clear()
+
+        reward = engine.score - score
+        if engine.game_over and not engine.won:
+            reward = -1
+        self.done = engine.game_over or (
+            self.max_moves is not None and engine.moves >= self.max_moves
+        )
+        self.info = self.read_info()
+        return self.observation(), reward, self.done, self.info
+
+    @property
+    def board(self):
+        """The whole newest board."""
+        border = self.border
+        end = border + self.grid_count
+        return self.planes[self.slot, border:end, border:end]
+
+    def observation(self):
+        if self.frames > 1:
+            planes = self.planes[self.slot + 1 : self.slot + 1 + self.frames]
+        else:
+            planes = self.planes[0]
+        if self.crop:
+            # With the border, the window centred on the head starts at the
+            # head's own cell
+            y, x = divmod(self.engine.snake.body[0], self.grid_count)
+            return planes[..., y : y + self.crop, x : x + self.crop]
+        return planes
+
+    def read_items(self):
+        engine = self.engine
+        grid_count = self.grid_count
+        food = engine.food_pos
+        power_up = engine.power_up_pos if engine.power_up else None
+        return (
+            -1 if food is None else food[1] * grid_count + food[0],
+            -1 if power_up is None else power_up[1] * grid_count + power_up[0],
+        )
+
+    def write(self, cell, items):
+        """Rewrite board cell `cell`, and its copies in the border, in the
+        newest board's planes. `items` are the food and power-up cells."""
+        snake = self.engine.snake
+        food, power_up = items
+        if cell == power_up:
+            state = POWER_UP
+        elif cell == food:
+            state = FOOD
+        elif snake.counts[cell]:
+            head = cell == snake.body[0] and snake.counts[cell] == 1
+            state = HEAD if head else BODY
+        else:
+            state = EMPTY
+
+        grid_count = self.grid_count
+        border = self.border
+        y, x = divmod(cell, grid_count)
+        rows = [y + border]
+        columns = [x + border]
+        if border:
+            if y < border:
+                rows.append(y + border + grid_count)
+            elif y >= grid_count - border:
+                rows.append(y + border - grid_count)
+            if x < border:
+                columns.append(x + border + grid_count)
+            elif x >= grid_count - border:
+                columns.append(x + border - grid_count)
+        for index in self.copies:
+            plane = self.planes[index]
+            for row in rows:
+                for column in columns:
+                    plane[row, column] = state
+
+    def read_info(self):
+        """A new `info` dict, so agents can keep the ones they are given."""
+        engine = self.engine
+        return {
+            "score": engine.score,
+            "moves": engine.moves,
+            "won": engine.won,
+            "power_up": engine.active_power_up,
+        }
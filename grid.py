@@ -0,0 +1,62 @@
+"""NumPy views of an `Engine` board as a compact cell-state grid.
+
+`occupancy(snake)` is a live, zero-copy `(grid_count, grid_count)` view of
+the snake's occupancy index. `cell_grid(engine)` classifies every cell as
+one of the states below, for renderers, AI policies and analysis tools.
+Arrays are indexed `[y, x]`, matching the packed cells `y * grid_count + x`.
+"""
+
+import numpy as np
+
+# Cell states, in drawing order: later ones are painted over earlier ones
+EMPTY, HEAD, BODY, FOOD, POWER_UP = range(5)
+
+
+def occupancy(snake):
+    """Segments per cell, sharing memory with `snake.counts`."""
+    counts = np.frombuffer(snake.counts, np.uint8)
+    return counts.reshape(snake.grid_count, snake.grid_count)
+
+
+def cell_grid(engine, x=0, y=0, size=None, out=None):
+    """Cell states of the `size` x `size` window of the board starting at
+    cell (`x`, `y`), wrapping around the edges; the whole board by default.
+
+    Costs O(size * size) whatever the snake length. Pass `out` (a uint8
+    array of the right shape) to reuse a buffer between calls.
+    """
+    snake = engine.snake
+    grid_count = snake.grid_count
+    size = grid_count if size is None else size
+    counts = occupancy(snake)
+    if x or y or size != grid_count:
+        rows = (y + np.arange(size)) % grid_count
+        columns = (x + np.arange(size)) % grid_count
+        counts = counts[rows[:, None], columns]
+    if out is None:
+        out = np.empty((size, size), np.uint8)
+    np.minimum(counts, 1, out=out)
+    out *= BODY
+
+    head = _window_pos(snake.body[0], grid_count, x, y, size)
+    if head is not None and counts[head] == 1:
+        out[head] = HEAD  # Hidden when another segment lies on it
+    items = [(engine.food_pos, FOOD)]
+    if engine.power_up:
+        items.append((engine.power_up_pos, POWER_UP))
+    for pos, state in items:
+        if pos is not None:
+            index = _window_pos(pos[1] * grid_count + pos[0], grid_count, x, y, size)
+            if index is not None:
+                out[index] = state
+    return out
+
+
+def _window_pos(cell, grid_count, x, y, size):
+    """`(row, column)` of packed `cell` in the window, or None outside it."""
+    row, column = divmod(cell, grid_count)
+    row = (row - y) % grid_count
+    column = (column - x) % grid_count
+    if row < size and column < size:
+        return (row, column)
+    return None
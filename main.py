@@ -1,325 +1,211 @@
-import pygame
+import argparse
+import os
+import random
 import sys
+import time
 
-# from enum import Enum
-import random
+import pygame
 
-# Initialize Pygame
-pygame.init()
+from autopilot import Autopilot
+from engine import DIFFICULTIES, GRID_COUNT, Direction, Engine, PowerUpEffect, Snake
+from profiler import (
+    DRAW,
+    EVENTS,
+    FLIP,
+    INPUT,
+    TICK,
+    UPDATE,
+    FrameProfiler,
+    NullProfiler,
+)
+from replay import Recorder, Replay
+from render import (
+    BLACK,
+    GRAY,
+    WHITE,
+    WINDOW_SIZE,
+    Camera,
+    DirtyRectRenderer,
+    FullRenderer,
+    GridRenderer,
+    TextCache,
+    draw_panel,
+    stats_lines,
+)
 
 # Constants
-WINDOW_SIZE = 800
-GRID_SIZE = 20
-GRID_COUNT = WINDOW_SIZE // GRID_SIZE
 FPS = 60
-
-# Colors
-BLACK = (0, 0, 0)
-WHITE = (255, 255, 255)
-GREEN = (0, 255, 0)
-DARK_GREEN = (0, 150, 0)
-RED = (255, 0, 0)
-BLUE = (0, 0, 255)
-GRAY = (128, 128, 128)
-
-
-class Direction:
-    UP = (0, -1)
-    DOWN = (0, 1)
-    LEFT = (-1, 0)
-    RIGHT = (1, 0)
-
-
-class PowerUpEffect:
-    HALF_SPEED = "Half Speed"
-    DOUBLE_SPEED = "Double Speed"
-    DOUBLE_GROWTH = "x2"
-    CONFUSION = "Confusion"
-
-
-class Snake:
-    def __init__(self):
-        self.reset()
-
-    def reset(self):
-        self.positions = [(GRID_COUNT // 2, GRID_COUNT // 2)]
-        self.direction = Direction.RIGHT
-        self.next_direction = Direction.RIGHT
-        self.grow = False
-        self.double_growth = False
-        self.confused = False
-        self.speed_mult = 1.0
-
-    def update(self):
-        self.direction = self.next_direction
-        current_head = self.positions[0]
-        new_head = (
-            (current_head[0] + self.direction[0]) % GRID_COUNT,
-            (current_head[1] + self.direction[1]) % GRID_COUNT,
-        )
-
-        self.positions.insert(0, new_head)
-        if not self.grow:
-            self.positions.pop()
-        self.grow = False
-
-    def check_collision(self):
-        return self.positions[0] in self.positions[1:]
-
-
-class Game:
-    def __init__(self):
-        self.screen = pygame.display.set_mode((WINDOW_SIZE, WINDOW_SIZE))
-        pygame.display.set_caption("Snake Game")
+IDLE_TIMEOUT = 1000  # ms to block on events in the menu, pause and game over
+RENDERERS = {"dirty": DirtyRectRenderer, "full": FullRenderer, "grid": GridRenderer}
+
+KEY_DIRECTIONS = {
+    pygame.K_UP: Direction.UP,
+    pygame.K_w: Direction.UP,
+    pygame.K_DOWN: Direction.DOWN,
+    pygame.K_s: Direction.DOWN,
+    pygame.K_LEFT: Direction.LEFT,
+    pygame.K_a: Direction.LEFT,
+    pygame.K_RIGHT: Direction.RIGHT,
+    pygame.K_d: Direction.RIGHT,
+}
+
+
+class Game(Engine):
+    def __init__(
+        self,
+        renderer=None,
+        record_dir=None,
+        replay=None,
+        profile=False,
+        interpolate=False,
+        headless=False,
+        grid_count=GRID_COUNT,
+        autopilot=False,
+        remote=None,
+        seed=None,
+    ):
+        self.headless = headless  # Draw offscreen with the SDL dummy driver
+        self.renderer = renderer or DirtyRectRenderer()
+        self.interpolate = interpolate  # Slide the head and tail between cells
+        self.alpha = 0.0  # Fraction of the next move already elapsed
+        self.profiler = FrameProfiler() if profile else NullProfiler()
+        self.show_stats = False  # Frame-time overlay, toggled with F3
+        self.stats_lines = []
+        self.input_latency = None  # ms from the last applied key press to its move
+        self.record_dir = record_dir  # Save a recording of every game here
+        self.replay = replay  # Play back this Replay instead of reading keys
+        self.seed = seed  # Seed of every game's rng; a random one when recording
+        # A server.Connection whose game is shown instead of simulating one
+        self.remote = remote
+        # The window and fonts are created on first use, so a Game that is
+        # only simulated never starts the video or font subsystems
+        self._screen = None
+        self._fonts = None
         self.clock = pygame.time.Clock()
-        self.font = pygame.font.Font(None, 36)
-        self.power_up_pos = None  # Initialize power_up_pos
-        self.last_move_time = 0  # Track last movement time
-        self.active_power_up = None  # Track the currently active power-up
-        self.reset()
+        self.clock.tick()  # Starts the SDL timer; get_ticks() reads 0 until then
+        self.text = TextCache()
+        self.last_update_time = 0  # Time the simulation was advanced to
+        super().__init__(grid_count=grid_count)
+        self.changed_cells = []  # Feeds the incremental renderer
+        if autopilot:
+            self.autopilot = Autopilot()  # Plays by itself, e.g. as a demo
+
+    def open_window(self):
+        """Start the video subsystem and create the window, once."""
+        if self._screen is None:
+            if self.headless:
+                os.environ["SDL_VIDEODRIVER"] = "dummy"
+            pygame.display.init()
+            self._screen = pygame.display.set_mode((WINDOW_SIZE, WINDOW_SIZE))
+            pygame.display.set_caption("Snake Game")
+        return self._screen
+
+    @property
+    def screen(self):
+        return self._screen if self._screen is not None else self.open_window()
+
+    @property
+    def font(self):
+        return self.fonts[0]
+
+    @property
+    def small_font(self):
+        return self.fonts[1]  # For the power-up "?"
+
+    @property
+    def fonts(self):
+        if self._fonts is None:
+            pygame.font.init()
+            self._fonts = (pygame.font.Font(None, 36), pygame.font.Font(None, 24))
+        return self._fonts
 
     def reset(self):
-        # Store current difficulty before resetting
-        current_difficulty = getattr(self, "difficulty", None)
-
-        self.snake = Snake()
-        self.food_pos = self.get_random_position()
-        self.power_up = None
-        self.power_up_pos = None
-        self.score = 0
-        self.level = 1
+        if self.replay is not None:
+            self.difficulty = self.replay.difficulty
+            self.grid_count = self.replay.grid_count
+            self.rng = random.Random(self.replay.seed)
+            self.replay.index = 0
+            self.input_log = self.replay
+        elif self.seed is not None or self.record_dir is not None:
+            seed = self.seed if self.seed is not None else random.getrandbits(63)
+            self.rng = random.Random(seed)
+            if self.record_dir is not None:
+                self.input_log = Recorder(seed)
+        super().reset()
+        if self.remote is not None and self.difficulty is not None:
+            self.remote.start(self)  # Join or restart the server's game
+        self.camera = Camera(self.grid_count)
+        self.camera.center(self.snake.head)
         self.paused = False
-        self.game_over = False
-        self.difficulty = current_difficulty  # Preserve difficulty when resetting
-        self.active_power_up = None
-        self.last_move_time = pygame.time.get_ticks()  # Reset movement timer
-        self.last_score = 0  # Track last score to detect when score changes
-
-    def get_random_position(self):
-        while True:
-            pos = (random.randint(0, GRID_COUNT - 1), random.randint(0, GRID_COUNT - 1))
-            if pos not in self.snake.positions:
-                if self.power_up_pos != pos:
-                    return pos
-
-    def spawn_power_up(self):
-        # Force spawn a power-up regardless of level
-        power_ups = []
-        if self.difficulty == "Beginner":
-            power_ups = [PowerUpEffect.HALF_SPEED, PowerUpEffect.DOUBLE_GROWTH]
+        self.paused_at = 0
+        self.last_update_time = pygame.time.get_ticks()  # Reset movement timer
+
+    def handle_input(self, key):
+        """Queue the turn for a pressed direction key, stamped with the press
+        time so its latency can be measured when the move makes it."""
+        direction = KEY_DIRECTIONS.get(key)
+        if direction is None:
+            return
+        if self.remote is not None:
+            self.remote.turn(direction)
         else:
-            power_ups = [
-                PowerUpEffect.DOUBLE_SPEED,
-                PowerUpEffect.CONFUSION,
-                PowerUpEffect.HALF_SPEED,
-                PowerUpEffect.DOUBLE_GROWTH,
-            ]
-
-        # Always spawn a power-up
-        self.power_up = random.choice(power_ups)
-        self.power_up_pos = self.get_random_position()
-
-    def handle_input(self):
-        keys = pygame.key.get_pressed()
-
-        direction_map = {
-            (pygame.K_UP, pygame.K_w): Direction.UP,
-            (pygame.K_DOWN, pygame.K_s): Direction.DOWN,
-            (pygame.K_LEFT, pygame.K_a): Direction.LEFT,
-            (pygame.K_RIGHT, pygame.K_d): Direction.RIGHT,
-        }
-
-        for (key1, key2), direction in direction_map.items():
-            if keys[key1] or keys[key2]:
-                if self.snake.confused:
-                    # Invert directions when confused
-                    if direction == Direction.UP:
-                        new_dir = Direction.DOWN
-                    elif direction == Direction.DOWN:
-                        new_dir = Direction.UP
-                    elif direction == Direction.LEFT:
-                        new_dir = Direction.RIGHT
-                    else:
-                        new_dir = Direction.LEFT
-                else:
-                    new_dir = direction
-
-                # Prevent 180-degree turns
-                if (
-                    self.snake.direction[0] * -1,
-                    self.snake.direction[1] * -1,
-                ) != new_dir:
-                    self.snake.next_direction = new_dir
-
-    def update(self):
-        # Generate a new power-up every 5 rounds (5th, 10th, etc.)
-        if (
-            self.score % 5 == 0
-            and self.score > 0
-            and not self.power_up
-            and self.score != self.last_score
-        ):
-            self.spawn_power_up()
-
-        # Check if score has increased for powerup duration
-        if self.score > self.last_score and self.active_power_up:
-            # Reset all temporary effects after 1 score
-            self.snake.confused = False
-            self.snake.speed_mult = 1.0
-            self.active_power_up = None  # Clear the active power-up display
-            self.snake.double_growth = False
-
-        # Update last_score
-        self.last_score = self.score
-
-        # Time-based movement for fluid motion
-        current_time = pygame.time.get_ticks()
-        move_delay = 1000 / self.get_current_speed()  # Convert speed to milliseconds
-
-        if current_time - self.last_move_time >= move_delay:
-            self.snake.update()
-            self.last_move_time = current_time
+            self.queue_turn(direction, pygame.time.get_ticks())
 
-        # Check collisions
-        if self.snake.check_collision():
-            self.game_over = True
+    def update(self, now=None):
+        """Advance the game to `now` ms, the SDL clock by default."""
+        if self.remote is not None:
+            self.remote.poll()  # The server moves the snake
             return
 
-        # Check food collision
-        if self.snake.positions[0] == self.food_pos:
-            # Apply double score if double_growth is active
-            score_increase = 2 if self.snake.double_growth else 1
-            self.score += score_increase
-            self.level = (self.score // 5) + 1
-            self.snake.grow = True
-            if self.snake.double_growth:
-                self.snake.grow = True  # Will grow again next update
-                self.snake.double_growth = False
-            self.food_pos = self.get_random_position()
-
-        # Check power-up collision
-        if self.power_up and self.snake.positions[0] == self.power_up_pos:
-            # Store the active power-up type to display it
-            self.active_power_up = self.power_up
-
-            if self.power_up == PowerUpEffect.HALF_SPEED:
-                self.snake.speed_mult = 0.5
-            elif self.power_up == PowerUpEffect.DOUBLE_SPEED:
-                self.snake.speed_mult = 2.0
-            elif self.power_up == PowerUpEffect.DOUBLE_GROWTH:
-                self.snake.double_growth = True
-            elif self.power_up == PowerUpEffect.CONFUSION:
-                self.snake.confused = True
-
-            self.power_up = None
-            self.power_up_pos = None
-
-    def draw(self):
-        self.screen.fill(BLACK)
-
-        # Draw snake
-        for i, pos in enumerate(self.snake.positions):
-            color = DARK_GREEN if i == 0 else GREEN
-            pygame.draw.rect(
-                self.screen,
-                color,
-                (pos[0] * GRID_SIZE, pos[1] * GRID_SIZE, GRID_SIZE - 1, GRID_SIZE - 1),
-            )
-
-        # Draw food
-        pygame.draw.rect(
-            self.screen,
-            RED,
-            (
-                self.food_pos[0] * GRID_SIZE,
-                self.food_pos[1] * GRID_SIZE,
-                GRID_SIZE - 1,
-                GRID_SIZE - 1,
-            ),
-        )
-
-        # Draw power-up
-        if self.power_up:
-            color = BLUE  # Always use blue for powerups
-            pygame.draw.rect(
-                self.screen,
-                color,
-                (
-                    self.power_up_pos[0] * GRID_SIZE,
-                    self.power_up_pos[1] * GRID_SIZE,
-                    GRID_SIZE - 1,
-                    GRID_SIZE - 1,
-                ),
-            )
-            # Add "?" symbol to power-up (smaller size)
-            small_font = pygame.font.Font(None, 24)  # Smaller font size
-            question_mark = small_font.render("?", True, WHITE)
-            question_rect = question_mark.get_rect(
-                center=(
-                    self.power_up_pos[0] * GRID_SIZE + GRID_SIZE // 2,
-                    self.power_up_pos[1] * GRID_SIZE + GRID_SIZE // 2,
-                )
-            )
-            self.screen.blit(question_mark, question_rect)
-
-        # Draw score, level, difficulty and speed
-        score_text = self.font.render(f"Score: {self.score}", True, WHITE)
-        level_text = self.font.render(f"Level: {self.level}", True, WHITE)
-        diff_text = self.font.render(f"Difficulty: {self.difficulty}", True, WHITE)
-        speed_text = self.font.render(
-            f"Speed: {self.get_current_speed():.1f}", True, WHITE
-        )
-
-        self.screen.blit(score_text, (10, 10))
-        self.screen.blit(level_text, (10, 50))
-        self.screen.blit(diff_text, (10, 90))
-        self.screen.blit(speed_text, (10, 130))
-
-        # Display active power-up only after it's collected
-        if self.active_power_up:
-            power_up_text = self.font.render(
-                f"Power-up: {self.active_power_up}", True, BLUE
-            )
-            self.screen.blit(power_up_text, (10, 170))
-
-        if self.paused:
-            pause_text = self.font.render("PAUSED", True, WHITE)
-            restart_text = self.font.render("Press R to restart", True, WHITE)
-
-            pause_rect = pause_text.get_rect(
-                center=(WINDOW_SIZE // 2, WINDOW_SIZE // 2)
-            )
-            restart_rect = restart_text.get_rect(
-                center=(WINDOW_SIZE // 2, WINDOW_SIZE // 2 + 50)
-            )
-
-            self.screen.blit(pause_text, pause_rect)
-            self.screen.blit(restart_text, restart_rect)
-
-        if self.game_over:
-            game_over_text = self.font.render("GAME OVER", True, WHITE)
-            restart_text = self.font.render("Press R to restart", True, WHITE)
-
-            game_over_rect = game_over_text.get_rect(
-                center=(WINDOW_SIZE // 2, WINDOW_SIZE // 2)
-            )
-            restart_rect = restart_text.get_rect(
-                center=(WINDOW_SIZE // 2, WINDOW_SIZE // 2 + 50)
-            )
-
-            self.screen.blit(game_over_text, game_over_rect)
-            self.screen.blit(restart_text, restart_rect)
-
-        pygame.display.flip()
+        current_time = pygame.time.get_ticks() if now is None else now
+        elapsed = current_time - self.last_update_time
+        self.last_update_time = current_time
+        self.advance(elapsed, self.measure_latency)
+        move_delay = 1000 / self.get_current_speed()  # Convert speed to milliseconds
+        self.alpha = min(self.accumulator / move_delay, 1.0)
 
-    def show_menu(self):
-        self.screen.fill(BLACK)
+        if self.game_over and self.record_dir is not None:
+            name = f"{time.strftime('%Y%m%d-%H%M%S')}-{self.input_log.seed}.snkr"
+            self.input_log.save(os.path.join(self.record_dir, name), self)
 
-        title = self.font.render("Snake Game", True, WHITE)
-        title_rect = title.get_rect(center=(WINDOW_SIZE // 2, 100))
-        self.screen.blit(title, title_rect)
+    def measure_latency(self, engine):
+        """After a move, time the key press it applied, if any."""
+        if self.applied_turn_stamp is not None:
+            self.input_latency = self.last_update_time - self.applied_turn_stamp
+            self.profiler.add_latency(self.input_latency)
+            self.applied_turn_stamp = None
 
-        difficulties = ["Beginner", "Recommended", "Expert"]
+    def draw(self):
+        self.present(self.render())
+
+    def render(self):
+        """Draw the frame; return the changed rectangles, or None for all."""
+        self.camera.follow(self.snake.head)
+        rects = self.renderer.draw(self)
+        if self.show_stats:
+            if self.profiler.frames % 30 == 0 or not self.stats_lines:
+                plan = self.autopilot.summary() if self.autopilot is not None else None
+                self.stats_lines = stats_lines(self.profiler.summary(last=300), plan)
+            rect = draw_panel(self.screen, self, self.stats_lines)
+            if rects is not None:
+                rects.append(rect)
+        return rects
+
+    def present(self, rects):
+        if rects is None:
+            pygame.display.flip()
+        elif rects:
+            pygame.display.update(rects)
+
+    def toggle_stats(self):
+        if not self.profiler.enabled:
+            self.profiler = FrameProfiler()
+        self.show_stats = not self.show_stats
+        self.stats_lines = []
+        self.renderer.invalidate()  # Clear the panel from the board
+
+    def menu_buttons(self):
+        difficulties = DIFFICULTIES
         button_height = 50
         button_width = 200
         spacing = 20
@@ -328,75 +214,239 @@ class Game:
             WINDOW_SIZE // 2 - (len(difficulties) * (button_height + spacing)) // 2
         )
 
-        mouse_pos = pygame.mouse.get_pos()
-
-        for i, diff in enumerate(difficulties):
-            button_rect = pygame.Rect(
-                (WINDOW_SIZE - button_width) // 2,
-                start_y + i * (button_height + spacing),
-                button_width,
-                button_height,
+        return [
+            (
+                diff,
+                pygame.Rect(
+                    (WINDOW_SIZE - button_width) // 2,
+                    start_y + i * (button_height + spacing),
+                    button_width,
+                    button_height,
+                ),
             )
+            for i, diff in enumerate(difficulties)
+        ]
+
+    def show_menu(self, hovered=None):
+        self.screen.fill(BLACK)
+
+        title = self.text.render(self.font, "Snake Game", WHITE)
+        title_rect = title.get_rect(center=(WINDOW_SIZE // 2, 100))
+        self.screen.blit(title, title_rect)
 
-            color = GRAY if button_rect.collidepoint(mouse_pos) else WHITE
+        for diff, button_rect in self.menu_buttons():
+            color = GRAY if diff == hovered else WHITE
             pygame.draw.rect(self.screen, color, button_rect, 2)
 
-            text = self.font.render(diff, True, color)
+            text = self.text.render(self.font, diff, color)
             text_rect = text.get_rect(center=button_rect.center)
             self.screen.blit(text, text_rect)
 
         pygame.display.flip()
-        return difficulties, start_y, button_height, spacing, button_width
 
-    def run(self):
+    def run_menu(self):
+        """Show the difficulty menu until one is picked.
+
+        Blocks on events and only redraws when the hovered button changes or
+        the window needs repainting. Returns False if the window was closed.
+        """
+        buttons = self.menu_buttons()
+        shown = redraw = True
+        while self.difficulty is None:
+            mouse_pos = pygame.mouse.get_pos()
+            hovered = next((d for d, r in buttons if r.collidepoint(mouse_pos)), None)
+            if redraw or hovered != shown:
+                self.show_menu(hovered)
+                shown = hovered
+                redraw = False
+
+            event = pygame.event.wait(IDLE_TIMEOUT)
+            if event.type == pygame.QUIT:
+                return False
+            if event.type == pygame.MOUSEBUTTONDOWN:
+                for diff, button_rect in buttons:
+                    if button_rect.collidepoint(event.pos):
+                        self.start(diff)
+                        break
+            elif event.type == pygame.VIDEOEXPOSE:
+                redraw = True
+        return True
+
+    def start(self, difficulty):
+        """Begin playing at `difficulty`, as picking it in the menu does."""
+        self.difficulty = difficulty
+        if self.remote is not None:
+            self.reset()  # Start the game on the server
+        self.last_update_time = pygame.time.get_ticks()  # Start moving from now
+
+    def ended(self):
+        """Over, or past the last move of a recording that stops early."""
+        if self.replay is not None and self.moves >= self.replay.moves:
+            return True
+        return self.game_over
+
+    def run_idle(self):
+        """Paused or game over: nothing changes until a key is pressed, so
+        draw once and block on events. Returns False if the window was
+        closed."""
+        self.present(self.render())
+        while self.paused or self.game_over:
+            event = pygame.event.wait(IDLE_TIMEOUT)
+            if not self.handle_event(event):
+                return False
+            if event.type in (pygame.KEYDOWN, pygame.VIDEOEXPOSE):
+                self.present(self.render())
+        self.clock.tick()  # Don't count the idle time as a frame
+        return True
+
+    def handle_event(self, event):
+        """Handle a window or key event; return False on quit."""
+        if event.type == pygame.QUIT:
+            return False
+        if event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_ESCAPE and self.remote is None:
+                self.paused = not self.paused
+                if self.paused:
+                    self.paused_at = pygame.time.get_ticks()
+                else:
+                    # Resume the move timer where it was paused
+                    self.last_update_time += pygame.time.get_ticks() - self.paused_at
+            elif event.key == pygame.K_r and (self.game_over or self.paused):
+                self.reset()
+            elif event.key == pygame.K_F3:
+                self.toggle_stats()
+            elif self.replay is None and not (self.paused or self.game_over):
+                self.handle_input(event.key)
+        return True
+
+    def run(self, max_moves=None):
+        """Play until the window is closed. Headless, return once the game
+        ends or has made `max_moves` moves."""
+        self.open_window()  # Events need the video subsystem
+        fast = self.headless and self.remote is None  # The server sets the pace
         while True:
             if self.difficulty is None:
-                difficulties, start_y, btn_height, spacing, btn_width = self.show_menu()
-
-                for event in pygame.event.get():
-                    if event.type == pygame.QUIT:
-                        return
-                    if event.type == pygame.MOUSEBUTTONDOWN:
-                        mouse_pos = pygame.mouse.get_pos()
-                        for i, diff in enumerate(difficulties):
-                            button_rect = pygame.Rect(
-                                (WINDOW_SIZE - btn_width) // 2,
-                                start_y + i * (btn_height + spacing),
-                                btn_width,
-                                btn_height,
-                            )
-                            if button_rect.collidepoint(mouse_pos):
-                                self.difficulty = diff
-                                break
+                if not self.run_menu():
+                    return
                 continue
 
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
+            if self.headless and (
+                self.ended() or max_moves is not None and self.moves >= max_moves
+            ):
+                return  # Nobody can press a key to play again
+            if self.paused or self.game_over:
+                if not self.run_idle():
                     return
-                if event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_ESCAPE:
-                        self.paused = not self.paused
-                    elif event.key == pygame.K_r and (self.game_over or self.paused):
-                        self.reset()
-
-            if not self.paused and not self.game_over:
-                self.handle_input()
-                self.update()
-
-            self.draw()
-            self.clock.tick(FPS)
+                continue
 
-    def get_current_speed(self):
-        # Calculate speed based on difficulty and level
-        base_speed = {"Beginner": 5, "Recommended": 8, "Expert": 12}[self.difficulty]
+            profiler = self.profiler
+            profiler.begin_frame()
+            events = pygame.event.get()
+            profiler.mark(EVENTS)
+            for event in events:
+                if not self.handle_event(event):
+                    return
+            profiler.mark(INPUT)  # Key presses handled and turns queued
 
-        # Add level-based speed increase for non-beginner modes
-        level_speed = 0 if self.difficulty == "Beginner" else min(self.level * 0.5, 8)
-        return max(1, (base_speed + level_speed) * self.snake.speed_mult)
+            self.dropped_moves = 0
+            if not self.paused and not self.game_over:
+                now = None
+                if fast:
+                    # Nobody is watching: run on a virtual clock that moves
+                    # one frame ahead per frame, as fast as possible
+                    now = self.last_update_time + 1000 / FPS
+                self.update(now)
+                profiler.mark(UPDATE)
+
+            rects = self.render()
+            profiler.mark(DRAW)
+            self.present(rects)
+            profiler.mark(FLIP)
+            self.clock.tick(0 if fast else FPS)
+            profiler.mark(TICK)
+            profiler.end_frame(self.dropped_moves)
 
 
 if __name__ == "__main__":
-    game = Game()
-    game.run()
+    parser = argparse.ArgumentParser(description="Snake Game")
+    parser.add_argument("--record", metavar="DIR", help="save every game to DIR")
+    parser.add_argument("--replay", metavar="FILE", help="watch a recorded game")
+    parser.add_argument("--profile", action="store_true", help="time frame phases")
+    parser.add_argument(
+        "--smooth", action="store_true", help="interpolate movement between moves"
+    )
+    parser.add_argument(
+        "--board",
+        type=int,
+        default=GRID_COUNT,
+        metavar="N",
+        help="play on an N x N board (the view follows the snake)",
+    )
+    parser.add_argument(
+        "--renderer", choices=RENDERERS, default="dirty", help="board drawing backend"
+    )
+    parser.add_argument(
+        "--autopilot", action="store_true", help="let the snake play by itself"
+    )
+    parser.add_argument(
+        "--headless",
+        action="store_true",
+        help="run without a window (SDL dummy) until the game ends",
+    )
+    parser.add_argument(
+        "--difficulty",
+        choices=DIFFICULTIES,
+        help="skip the menu (headless games default to Recommended)",
+    )
+    parser.add_argument(
+        "--seed", type=int, default=None, help="seed the food and power-ups"
+    )
+    parser.add_argument(
+        "--max-moves",
+        type=int,
+        default=None,
+        metavar="N",
+        help="stop a headless game after N moves",
+    )
+    parser.add_argument(
+        "--trace", metavar="FILE", help="write a Chrome/Perfetto trace on exit"
+    )
+    parser.add_argument(
+        "--connect",
+        metavar="ADDRESS",
+        help="play on a server (HOST:PORT or a Unix socket path)",
+    )
+    args = parser.parse_args()
+    if args.headless and not (args.autopilot or args.replay):
+        parser.error("--headless needs --autopilot or --replay to steer")
+
+    if args.record:
+        os.makedirs(args.record, exist_ok=True)
+    replay = Replay.open(args.replay) if args.replay else None
+    remote = None
+    if args.connect:
+        from server import Connection  # asyncio and ssl only load when used
+
+        remote = Connection(args.connect)
+    game = Game(
+        renderer=RENDERERS[args.renderer](),
+        record_dir=args.record,
+        replay=replay,
+        profile=args.profile or bool(args.trace),
+        interpolate=args.smooth,
+        headless=args.headless,
+        grid_count=args.board,
+        autopilot=args.autopilot,
+        remote=remote,
+        seed=args.seed,
+    )
+    difficulty = args.difficulty or ("Recommended" if args.headless else None)
+    if difficulty is not None and replay is None:
+        game.start(difficulty)
+    game.run(args.max_moves)
+    if args.trace:
+        game.profiler.export_trace(args.trace)
+    if args.headless:
+        print(f"score {game.score} moves {game.moves}")
     pygame.quit()
     sys.exit()
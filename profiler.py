@@ -0,0 +1,152 @@
+import json
+import time
+from array import array
+from collections import deque
+
+# Frame phases, in the order Game.run goes through them
+PHASES = ("events", "input", "update", "draw", "flip", "tick")
+EVENTS, INPUT, UPDATE, DRAW, FLIP, TICK = range(len(PHASES))
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+class NullProfiler:
+    """Stand-in used when profiling is off; every hook is a no-op."""
+
+    enabled = False
+
+    def begin_frame(self):
+        pass
+
+    def mark(self, phase):
+        pass
+
+    def end_frame(self, dropped_moves=0):
+        pass
+
+    def add_latency(self, ms):
+        pass
+
+
+class FrameProfiler:
+    """Per-phase frame timings kept in a fixed-size ring buffer.
+
+    `Game.run` calls `begin_frame()`, then `mark(phase)` as each phase ends,
+    then `end_frame()`. Only the last `capacity` frames are kept.
+    """
+
+    enabled = True
+
+    def __init__(self, capacity=3600, clock=time.perf_counter):
+        self.capacity = capacity
+        self.clock = clock
+        self.durations = array("d", bytes(8 * capacity * len(PHASES)))
+        self.starts = array("d", bytes(8 * capacity))
+        self.dropped = array("I", bytes(4 * capacity))
+        self.frames = 0  # Frames recorded so far, including overwritten ones
+        self.slot = 0
+        self.frame_start = self.last = clock()
+        self.zeros = array("d", bytes(8 * len(PHASES)))
+        # Key-press-to-move latencies in ms, last `capacity` turns
+        self.latencies = deque(maxlen=capacity)
+
+    def begin_frame(self):
+        self.frame_start = self.last = self.clock()
+        self.slot = self.frames % self.capacity * len(PHASES)
+        # Phases skipped this frame (e.g. input while paused) stay at zero
+        self.durations[self.slot : self.slot + len(PHASES)] = self.zeros
+
+    def mark(self, phase):
+        now = self.clock()
+        self.durations[self.slot + phase] = now - self.last
+        self.last = now
+
+    def end_frame(self, dropped_moves=0):
+        index = self.frames % self.capacity
+        self.starts[index] = self.frame_start
+        self.dropped[index] = dropped_moves
+        self.frames += 1
+
+    def add_latency(self, ms):
+        self.latencies.append(ms)
+
+    def recorded(self):
+        """Ring indexes of the kept frames, oldest first."""
+        count = min(self.frames, self.capacity)
+        first = self.frames - count
+        return [i % self.capacity for i in range(first, self.frames)]
+
+    def summary(self, last=None):
+        """Frame and phase percentiles in milliseconds over the last `last`
+        frames (all kept frames by default), plus dropped moves and the
+        input-to-move latency of recent turns."""
+        frames = self.recorded()[-last:] if last else self.recorded()
+        phases = len(PHASES)
+        totals = [
+            sum(self.durations[i * phases : (i + 1) * phases]) * 1000 for i in frames
+        ]
+        result = {
+            "frames": len(frames),
+            "frame_p50": percentile(totals, 0.5),
+            "frame_p99": percentile(totals, 0.99),
+            "dropped_moves": sum(self.dropped[i] for i in frames),
+            "latency_p50": percentile(self.latencies, 0.5),
+            "latency_p99": percentile(self.latencies, 0.99),
+        }
+        for phase, name in enumerate(PHASES):
+            times = [self.durations[i * phases + phase] * 1000 for i in frames]
+            result[f"{name}_p50"] = percentile(times, 0.5)
+            result[f"{name}_p99"] = percentile(times, 0.99)
+        return result
+
+    def trace_events(self):
+        """The kept frames as Chrome trace events (load the exported file in
+        chrome://tracing or ui.perfetto.dev)."""
+        events = []
+        phases = len(PHASES)
+        for i in self.recorded():
+            ts = self.starts[i] * 1e6
+            durations = self.durations[i * phases : (i + 1) * phases]
+            events.append(
+                {
+                    "name": "frame",
+                    "ph": "X",
+                    "ts": ts,
+                    "dur": sum(durations) * 1e6,
+                    "pid": 1,
+                    "tid": 1,
+                }
+            )
+            for phase, duration in enumerate(durations):
+                if duration:
+                    events.append(
+                        {
+                            "name": PHASES[phase],
+                            "ph": "X",
+                            "ts": ts,
+                            "dur": duration * 1e6,
+                            "pid": 1,
+                            "tid": 1,
+                        }
+                    )
+                ts += duration * 1e6
+            if self.dropped[i]:
+                events.append(
+                    {
+                        "name": "dropped moves",
+                        "ph": "C",
+                        "ts": self.starts[i] * 1e6,
+                        "pid": 1,
+                        "args": {"moves": self.dropped[i]},
+                    }
+                )
+        return events
+
+    def export_trace(self, path):
+        with open(path, "w") as f:
+            json.dump({"traceEvents": self.trace_events(), "displayTimeUnit": "ms"}, f)
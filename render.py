@@ -0,0 +1,535 @@
+from collections import OrderedDict
+
+import pygame
+
+# Constants
+WINDOW_SIZE = 800
+GRID_SIZE = 20
+VIEW_CELLS = WINDOW_SIZE // GRID_SIZE  # Cells per side shown in the window
+
+# Colors
+BLACK = (0, 0, 0)
+WHITE = (255, 255, 255)
+GREEN = (0, 255, 0)
+DARK_GREEN = (0, 150, 0)
+RED = (255, 0, 0)
+BLUE = (0, 0, 255)
+GRAY = (128, 128, 128)
+
+
+class Camera:
+    """The part of the board shown in the window: `size` cells per side
+    starting at cell (`x`, `y`).
+
+    Boards no bigger than the window are shown whole. On larger ones the
+    camera scrolls to keep the head at least `margin` cells from the edge of
+    the view. The board wraps around, and so does the view.
+    """
+
+    def __init__(self, grid_count, size=VIEW_CELLS):
+        self.grid_count = grid_count
+        self.size = min(size, grid_count)
+        self.margin = self.size // 4
+        self.x = self.y = 0
+
+    @property
+    def fixed(self):
+        return self.size == self.grid_count
+
+    def center(self, pos):
+        if not self.fixed:
+            self.x = (pos[0] - self.size // 2) % self.grid_count
+            self.y = (pos[1] - self.size // 2) % self.grid_count
+
+    def follow(self, pos):
+        if not self.fixed:
+            self.x = self._follow_axis(self.x, pos[0])
+            self.y = self._follow_axis(self.y, pos[1])
+
+    def _follow_axis(self, start, pos):
+        offset = (pos - start) % self.grid_count
+        if offset >= self.size:
+            return (pos - self.size // 2) % self.grid_count  # Jumped out of view
+        if offset < self.margin:
+            return (pos - self.margin) % self.grid_count
+        if offset >= self.size - self.margin:
+            return (pos - self.size + self.margin + 1) % self.grid_count
+        return start
+
+    def to_screen(self, pos):
+        """View cell of board cell `pos`, or None when it is out of view."""
+        x = (pos[0] - self.x) % self.grid_count
+        y = (pos[1] - self.y) % self.grid_count
+        if x < self.size and y < self.size:
+            return (x, y)
+        return None
+
+    def to_board(self, pos):
+        """Packed board cell shown at view cell `pos`."""
+        x = (pos[0] + self.x) % self.grid_count
+        y = (pos[1] + self.y) % self.grid_count
+        return y * self.grid_count + x
+
+    def visible_snake(self, snake):
+        """View cells of the snake in view: `(head, body)`, where `head` is
+        None when the head is out of view and `body` holds the other
+        segments, the head's cell included if the body crosses it.
+
+        Walks whichever is smaller, the body or the view, looking cells up
+        in the snake's occupancy index, so the cost is bounded by the window
+        size however long the snake or large the board.
+        """
+        grid_count = self.grid_count
+        y, x = divmod(snake.body[0], grid_count)
+        head = self.to_screen((x, y))
+        body = []
+        if len(snake.body) <= self.size * self.size:
+            cells = iter(snake.body)
+            next(cells)  # The head
+            for cell in cells:
+                y, x = divmod(cell, grid_count)
+                pos = self.to_screen((x, y))
+                if pos is not None:
+                    body.append(pos)
+        else:
+            counts = snake.counts
+            for y in range(self.size):
+                for x in range(self.size):
+                    pos = (x, y)
+                    if counts[self.to_board(pos)] > (pos == head):
+                        body.append(pos)
+        return head, body
+
+
+def cell_rect(pos):
+    return pygame.Rect(
+        pos[0] * GRID_SIZE, pos[1] * GRID_SIZE, GRID_SIZE - 1, GRID_SIZE - 1
+    )
+
+
+def slide_rect(start, end, alpha):
+    """Cell rectangle `alpha` of the way from `start` to `end`; jumps straight
+    to `end` when the move wraps around the board edge."""
+    if abs(end[0] - start[0]) + abs(end[1] - start[1]) != 1:
+        return cell_rect(end)
+    x = start[0] + (end[0] - start[0]) * alpha
+    y = start[1] + (end[1] - start[1]) * alpha
+    return pygame.Rect(
+        round(x * GRID_SIZE), round(y * GRID_SIZE), GRID_SIZE - 1, GRID_SIZE - 1
+    )
+
+
+class TextCache:
+    """Bounded LRU cache of rendered text surfaces keyed on
+    (font, text, colour)."""
+
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self.surfaces = OrderedDict()
+
+    def render(self, font, text, color):
+        key = (font, text, color)
+        surface = self.surfaces.get(key)
+        if surface is None:
+            surface = font.render(text, True, color)
+            self.surfaces[key] = surface
+            if len(self.surfaces) > self.maxsize:
+                self.surfaces.popitem(last=False)
+        else:
+            self.surfaces.move_to_end(key)
+        return surface
+
+
+# Tile colours; pass a dict with other colours as a renderer's `skin`
+SKIN = {"head": DARK_GREEN, "body": GREEN, "food": RED, "power_up": BLUE}
+
+
+class TileAtlas:
+    """Pre-rendered head, body, food and power-up tiles in one surface.
+
+    Tiles are a cell minus its one-pixel gap, with the power-up's "?" baked
+    in. `tile(name, pos)` returns an entry for `Surface.blits`, so a whole
+    board is drawn with a single batched call.
+    """
+
+    NAMES = ("head", "body", "food", "power_up")
+
+    def __init__(self, font, skin=SKIN):
+        size = GRID_SIZE - 1
+        self.surface = pygame.Surface((size * len(self.NAMES), size))
+        self.areas = {}
+        for i, name in enumerate(self.NAMES):
+            area = pygame.Rect(i * size, 0, size, size)
+            self.surface.fill(skin[name], area)
+            self.areas[name] = area
+        question_mark = font.render("?", True, WHITE)
+        area = self.areas["power_up"]
+        center = (area.x + GRID_SIZE // 2, GRID_SIZE // 2)
+        self.surface.set_clip(area)
+        self.surface.blit(question_mark, question_mark.get_rect(center=center))
+        self.surface.set_clip(None)
+
+    def tile(self, name, pos):
+        """Blit entry for tile `name` in view cell `pos`."""
+        return (
+            self.surface,
+            (pos[0] * GRID_SIZE, pos[1] * GRID_SIZE),
+            self.areas[name],
+        )
+
+    def tile_at(self, name, rect):
+        """Blit entry for tile `name` at the top-left of `rect`."""
+        return (self.surface, rect.topleft, self.areas[name])
+
+
+def stats_lines(summary, plan=None):
+    """Text for the frame-time overlay from `FrameProfiler.summary()`, and
+    `Autopilot.summary()` when the autopilot is on."""
+    lines = [
+        f"frame p50 {summary['frame_p50']:.1f} ms  p99 {summary['frame_p99']:.1f} ms",
+        f"update p99 {summary['update_p99']:.2f}  draw p99 {summary['draw_p99']:.2f}",
+        f"flip p99 {summary['flip_p99']:.2f}  tick p50 {summary['tick_p50']:.1f}",
+        f"dropped moves {summary['dropped_moves']}",
+        f"input lag p50 {summary['latency_p50']:.0f}  p99 {summary['latency_p99']:.0f} ms",
+    ]
+    if plan is not None:
+        lines.append(
+            f"autopilot p50 {plan['plan_p50_us']:.0f}  p99 {plan['plan_p99_us']:.0f} us"
+        )
+    return lines
+
+
+def draw_panel(surface, game, lines):
+    """Draw `lines` in an opaque box in the top-right corner and return its
+    rectangle. Being opaque, it needs no restoring between frames."""
+    surfaces = [game.text.render(game.small_font, line, WHITE) for line in lines]
+    width = max(text.get_width() for text in surfaces) + 16
+    rect = pygame.Rect(surface.get_width() - width - 10, 10, width, 20 * len(lines) + 8)
+    surface.fill(GRAY, rect)
+    surface.fill(BLACK, rect.inflate(-2, -2))
+    for i, text in enumerate(surfaces):
+        surface.blit(text, (rect.x + 8, rect.y + 4 + 20 * i))
+    return rect
+
+
+class FullRenderer:
+    """Repaints the whole window every frame."""
+
+    def __init__(self, skin=SKIN):
+        self.skin = skin
+        self.atlas = None
+
+    def tiles(self, game):
+        """The tile atlas, rendered on first use (it needs the game's font)."""
+        if self.atlas is None:
+            self.atlas = TileAtlas(game.small_font, self.skin)
+        return self.atlas
+
+    def invalidate(self):
+        """Forget what is on screen; the next frame is repainted in full."""
+
+    def draw(self, game):
+        """Draw `game` onto its screen.
+
+        Returns the list of rectangles that changed, or None when the whole
+        display has to be flipped.
+        """
+        self.draw_board(game.screen, game)
+        self.draw_hud(game.screen, game)
+        self.draw_overlay(game.screen, game)
+        return None
+
+    def draw_board(self, surface, game):
+        surface.fill(BLACK)
+        camera = game.camera
+        tiles = self.tiles(game)
+
+        # Snake, then food, then power-up, all in one batched blit
+        if game.interpolate:
+            blits = self.sliding_snake(game, tiles)
+        else:
+            head, body = camera.visible_snake(game.snake)
+            blits = [tiles.tile("body", pos) for pos in body]
+            if head is not None:
+                blits.insert(0, tiles.tile("head", head))
+
+        # Food (there is none once the board is full)
+        food = game.food_pos and camera.to_screen(game.food_pos)
+        if food is not None:
+            blits.append(tiles.tile("food", food))
+
+        power_up = game.power_up and camera.to_screen(game.power_up_pos)
+        if power_up is not None:
+            blits.append(tiles.tile("power_up", power_up))
+        surface.blits(blits, doreturn=False)
+
+    def sliding_snake(self, game, tiles):
+        """Blits for the snake between its last two states: the head slides
+        in from the previous cell and the tail slides off the vacated one, by
+        the fraction `game.alpha` of the current move that has elapsed."""
+        snake = game.snake
+        camera = game.camera
+        head, body = camera.visible_snake(snake)
+        blits = [tiles.tile("body", pos) for pos in body]
+
+        positions = snake.positions
+        if head is not None:
+            if len(positions) > 1:
+                previous = positions[1]
+            else:
+                previous = positions[0]
+                previous = (
+                    (previous[0] - snake.direction[0]) % snake.grid_count,
+                    (previous[1] - snake.direction[1]) % snake.grid_count,
+                )
+            previous = camera.to_screen(previous) or head
+            blits.append(tiles.tile_at("head", slide_rect(previous, head, game.alpha)))
+
+        if game.vacated >= 0 and len(positions) > 1:
+            y, x = divmod(game.vacated, snake.grid_count)
+            start = camera.to_screen((x, y))
+            end = camera.to_screen(positions[-1])
+            if start is not None and end is not None:
+                blits.append(tiles.tile_at("body", slide_rect(start, end, game.alpha)))
+        return blits
+
+    def hud_lines(self, game):
+        # Score, level, difficulty and speed
+        lines = [
+            (f"Score: {game.score}", WHITE),
+            (f"Level: {game.level}", WHITE),
+            (f"Difficulty: {game.difficulty}", WHITE),
+            (f"Speed: {game.get_current_speed():.1f}", WHITE),
+        ]
+        # Display active power-up only after it's collected
+        if game.active_power_up:
+            lines.append((f"Power-up: {game.active_power_up}", BLUE))
+        return lines
+
+    def draw_hud(self, surface, game, lines=None):
+        """Blit the HUD and return the rectangle it covers."""
+        area = None
+        for i, (text, color) in enumerate(lines or self.hud_lines(game)):
+            rect = surface.blit(
+                game.text.render(game.font, text, color), (10, 10 + i * 40)
+            )
+            area = rect if area is None else area.union(rect)
+        return area
+
+    def draw_overlay(self, surface, game):
+        if game.paused:
+            self.draw_message(surface, game, "PAUSED")
+
+        if game.game_over:
+            self.draw_message(surface, game, "YOU WIN" if game.won else "GAME OVER")
+
+    def draw_message(self, surface, game, message):
+        title_text = game.text.render(game.font, message, WHITE)
+        restart_text = game.text.render(game.font, "Press R to restart", WHITE)
+
+        title_rect = title_text.get_rect(center=(WINDOW_SIZE // 2, WINDOW_SIZE // 2))
+        restart_rect = restart_text.get_rect(
+            center=(WINDOW_SIZE // 2, WINDOW_SIZE // 2 + 50)
+        )
+
+        surface.blit(title_text, title_rect)
+        surface.blit(restart_text, restart_rect)
+
+
+class DirtyRectRenderer(FullRenderer):
+    """Keeps a persistent board surface and repaints only changed cells.
+
+    Per move only the new head, the old head, the vacated tail and any
+    food or power-up cell that moved are painted, and only their rectangles
+    are pushed to the display, so frame cost does not depend on snake
+    length. When the camera scrolls, the board surface is scrolled with it
+    and only the newly exposed rows and columns are painted. Paused and
+    game-over screens, and interpolated movement, fall back to a full
+    repaint.
+    """
+
+    def __init__(self, skin=SKIN):
+        super().__init__(skin)
+        self.board = None
+        self.body = None  # Body the board was painted from
+        self.items = None  # (food_pos, power_up_pos) painted on the board
+        self.view = None  # Camera position the board was painted at
+        self.hud = None  # HUD lines currently on screen
+        self.hud_rect = None
+        self.overlay = False
+
+    def invalidate(self):
+        self.body = None
+
+    def draw(self, game):
+        overlay = game.paused or game.game_over
+        if (
+            overlay
+            or game.interpolate
+            or self.overlay
+            or self.board is None
+            or self.body is not game.snake.body
+        ):
+            self.overlay = overlay
+            return self.repaint(game)
+
+        cells = set(game.changed_cells)
+        game.changed_cells.clear()
+        scrolled = (game.camera.x, game.camera.y) != self.view
+        if scrolled and not self.scroll(game, cells):
+            return self.repaint(game)
+        items = (game.food_pos, game.power_up_pos if game.power_up else None)
+        if items != self.items:
+            grid_count = game.snake.grid_count
+            for pos in self.items + items:
+                if pos is not None:
+                    cells.add(pos[1] * grid_count + pos[0])
+            self.items = items
+
+        rects = [self.paint_cell(game, cell) for cell in cells]
+        rects = [rect for rect in rects if rect is not None]
+        if scrolled:
+            game.screen.blit(self.board, (0, 0))
+            self.hud = self.hud_lines(game)
+            self.hud_rect = self.draw_hud(game.screen, game, self.hud)
+            return None
+        for rect in rects:
+            game.screen.blit(self.board, rect, rect)
+
+        lines = self.hud_lines(game)
+        if lines != self.hud or self.hud_rect.collidelist(rects) != -1:
+            # Restore the board under the old HUD, then draw the new one
+            game.screen.blit(self.board, self.hud_rect, self.hud_rect)
+            rects.append(self.hud_rect)
+            self.hud = lines
+            self.hud_rect = self.draw_hud(game.screen, game, lines)
+            rects.append(self.hud_rect)
+        return rects
+
+    def scroll(self, game, cells):
+        """Shift the board surface to the camera's new position and add the
+        cells scrolled into view to `cells`. Returns False when the camera
+        moved too far for that to be worth it."""
+        camera = game.camera
+        grid_count = camera.grid_count
+        size = camera.size
+        dx = (camera.x - self.view[0]) % grid_count
+        dy = (camera.y - self.view[1]) % grid_count
+        dx = dx - grid_count if dx > grid_count // 2 else dx
+        dy = dy - grid_count if dy > grid_count // 2 else dy
+        if abs(dx) >= size // 2 or abs(dy) >= size // 2:
+            return False
+
+        self.board.scroll(-dx * GRID_SIZE, -dy * GRID_SIZE)
+        self.view = (camera.x, camera.y)
+        columns = range(size - dx, size) if dx > 0 else range(-dx)
+        rows = range(size - dy, size) if dy > 0 else range(-dy)
+        for i in range(size):
+            for x in columns:
+                cells.add(camera.to_board((x, i)))
+            for y in rows:
+                cells.add(camera.to_board((i, y)))
+        return True
+
+    def repaint(self, game):
+        if self.board is None:
+            self.board = pygame.Surface(game.screen.get_size())
+        self.draw_board(self.board, game)
+        self.body = game.snake.body
+        self.items = (game.food_pos, game.power_up_pos if game.power_up else None)
+        self.view = (game.camera.x, game.camera.y)
+        game.changed_cells.clear()
+
+        game.screen.blit(self.board, (0, 0))
+        self.hud = self.hud_lines(game)
+        self.hud_rect = self.draw_hud(game.screen, game, self.hud)
+        self.draw_overlay(game.screen, game)
+        return None
+
+    def paint_cell(self, game, cell):
+        """Repaint board cell `cell`; return its screen rectangle, or None
+        when it is out of view."""
+        snake = game.snake
+        y, x = divmod(cell, snake.grid_count)
+        pos = (x, y)
+        view = game.camera.to_screen(pos)
+        if view is None:
+            return None
+        rect = pygame.Rect(view[0] * GRID_SIZE, view[1] * GRID_SIZE, GRID_SIZE, GRID_SIZE)
+        self.board.fill(BLACK, rect)
+
+        # Same stacking order as draw_board: head, body, food, power-up
+        is_head = cell == snake.body[0]
+        if game.power_up and pos == game.power_up_pos:
+            name = "power_up"
+        elif pos == game.food_pos:
+            name = "food"
+        elif snake.counts[cell] > is_head:
+            name = "body"
+        elif is_head:
+            name = "head"
+        else:
+            return rect
+        self.board.blit(*self.tiles(game).tile(name, view))
+        return rect
+
+
+class GridRenderer(FullRenderer):
+    """Draws the board from a uint8 cell-state grid in a constant number of
+    bulk operations.
+
+    The grid for the camera's view (see `grid.cell_grid`) is copied into an
+    8-bit one-pixel-per-cell surface whose palette holds the cell colours,
+    scaled up to the window in one blit, and the gaps between cells are laid
+    on top from a pre-drawn grid-line overlay. The cost no longer depends on
+    snake length. Interpolated movement falls back to `FullRenderer`.
+    """
+
+    def __init__(self, skin=SKIN):
+        super().__init__(skin)
+        self.grid = None  # Cell states last drawn, indexed [y, x]
+        self.cells = None  # One-pixel-per-cell palette surface
+        self.lines = None  # Black cell gaps over a transparent background
+
+    def draw_board(self, surface, game):
+        if game.interpolate:
+            super().draw_board(surface, game)
+            return
+        # Imported here so that starting the game doesn't load NumPy
+        from grid import cell_grid
+
+        camera = game.camera
+        size = camera.size
+        if self.grid is None or self.grid.shape != (size, size):
+            self.setup(size)
+        cell_grid(game, camera.x, camera.y, size, out=self.grid)
+        pygame.surfarray.blit_array(self.cells, self.grid.T)
+
+        if size < VIEW_CELLS:
+            surface.fill(BLACK)
+        area = pygame.Rect(0, 0, size * GRID_SIZE, size * GRID_SIZE)
+        surface.blit(pygame.transform.scale(self.cells, area.size), area)
+        surface.blit(self.lines, area)
+
+        power_up = game.power_up and camera.to_screen(game.power_up_pos)
+        if power_up is not None:
+            surface.blit(*self.tiles(game).tile("power_up", power_up))  # The "?"
+
+    def setup(self, size):
+        import numpy as np
+
+        self.grid = np.zeros((size, size), np.uint8)
+        self.cells = pygame.Surface((size, size), depth=8)
+        skin = self.skin
+        self.cells.set_palette(
+            [BLACK, skin["head"], skin["body"], skin["food"], skin["power_up"]]
+        )
+
+        key = (255, 0, 255)
+        self.lines = pygame.Surface((size * GRID_SIZE, size * GRID_SIZE))
+        self.lines.fill(key)
+        self.lines.set_colorkey(key)
+        for i in range(1, size + 1):
+            edge = i * GRID_SIZE - 1
+            self.lines.fill(BLACK, (edge, 0, 1, size * GRID_SIZE))
+            self.lines.fill(BLACK, (0, edge, size * GRID_SIZE, 1))
@@ -0,0 +1,150 @@
+"""Compact input-log recordings and deterministic replays.
+
+A recording is a fixed 28-byte header (seed, difficulty, final moves and
+score) followed by one little-endian uint32 per direction change:
+`move_index << 2 | direction`. Four bytes per turn, and the turn array can
+be used straight from an mmap.
+
+Usage:
+    python replay.py verify sessions/*.snkr   # Re-simulate at max speed
+    python main.py --replay session.snkr      # Watch it in real time
+"""
+
+import argparse
+import mmap
+import random
+import struct
+import sys
+from array import array
+
+from engine import DIFFICULTIES, DIRECTIONS, Engine
+
+MAGIC = b"SNKR"
+VERSION = 1
+# magic, version, difficulty, flags, grid_count, seed, moves, score
+HEADER = struct.Struct("<4sBBBxHxxQII")
+GAME_OVER, WON = 1, 2
+
+
+class Recorder:
+    """Logs every direction change of an engine, keyed by move index.
+
+    Attach it as `engine.input_log` on an engine whose rng was created with
+    `random.Random(seed)`.
+    """
+
+    def __init__(self, seed):
+        self.seed = seed
+        self.turns = array("I")
+
+    def on_move(self, engine):
+        snake = engine.snake
+        if snake.next_direction != snake.direction:
+            self.turns.append(
+                engine.moves << 2 | DIRECTIONS.index(snake.next_direction)
+            )
+
+    def to_bytes(self, engine):
+        flags = (GAME_OVER if engine.game_over else 0) | (WON if engine.won else 0)
+        header = HEADER.pack(
+            MAGIC,
+            VERSION,
+            DIFFICULTIES.index(engine.difficulty),
+            flags,
+            engine.snake.grid_count,
+            self.seed,
+            engine.moves,
+            engine.score,
+        )
+        turns = self.turns
+        if sys.byteorder == "big":
+            turns = array("I", turns)
+            turns.byteswap()
+        return header + turns.tobytes()
+
+    def save(self, path, engine):
+        with open(path, "wb") as f:
+            f.write(self.to_bytes(engine))
+
+
+class Replay:
+    """A recording opened for playback.
+
+    Attach it as `engine.input_log` of the engine returned by `engine()` to
+    feed the recorded turns back in, or call `run()` to play the whole game
+    headless at full speed.
+    """
+
+    def __init__(self, data):
+        (
+            magic,
+            version,
+            difficulty,
+            flags,
+            self.grid_count,
+            self.seed,
+            self.moves,
+            self.score,
+        ) = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("not a snake recording")
+        self.difficulty = DIFFICULTIES[difficulty]
+        self.game_over = bool(flags & GAME_OVER)
+        self.won = bool(flags & WON)
+        self.turns = memoryview(data)[HEADER.size :].cast("I")
+        if sys.byteorder == "big":
+            self.turns = array("I", self.turns)
+            self.turns.byteswap()
+        self.index = 0
+
+    @classmethod
+    def open(cls, path):
+        with open(path, "rb") as f:
+            return cls(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+    def engine(self):
+        """A fresh engine in the recorded starting state, fed by this log."""
+        self.index = 0
+        engine = Engine(self.difficulty, random.Random(self.seed), self.grid_count)
+        engine.input_log = self
+        return engine
+
+    def on_move(self, engine):
+        turns = self.turns
+        while self.index < len(turns) and turns[self.index] >> 2 == engine.moves:
+            engine.snake.next_direction = DIRECTIONS[turns[self.index] & 3]
+            self.index += 1
+
+    def run(self):
+        engine = self.engine()
+        while engine.moves < self.moves and not engine.game_over:
+            engine.step()
+        return engine
+
+    def verify(self):
+        """Re-simulate and check the outcome still matches the recording."""
+        engine = self.run()
+        return (engine.moves, engine.score, engine.game_over, engine.won) == (
+            self.moves,
+            self.score,
+            self.game_over,
+            self.won,
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Verify recorded games")
+    parser.add_argument("command", choices=["verify"])
+    parser.add_argument("paths", nargs="+")
+    args = parser.parse_args(argv)
+
+    failed = 0
+    for path in args.paths:
+        ok = Replay.open(path).verify()
+        failed += not ok
+        print(f"{'ok  ' if ok else 'FAIL'} {path}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,502 @@
+"""Authoritative game server: many sessions in one asyncio process.
+
+Each connection plays its own `Engine`, moved by the server at the game's
+own speed; clients only send turns and draw what they are told. Requests
+are fixed 4-byte `REQUEST`s. Every server message is a uint32 length
+followed by the message:
+
+- FULL: the kind byte and a `snapshot.to_bytes()` of the game, sent on
+  join and after a reset. RESET only restarts a game that is over, so a
+  client cannot flood the server with rebuilt games and snapshots.
+- DELTA: one per move. A `DELTA_HEADER` with the new head and the
+  vacated tail (-1 when the snake grew), then only the parts of the food,
+  power-up, score and effects that changed, flagged in `changes`. A plain
+  move costs 20 bytes on the wire whatever the snake's length.
+
+All sessions are advanced by one timer task, `tick_rate` times a second.
+Nothing awaits a client inside a tick: updates are buffered on each
+transport, and a client that falls `max_buffer` bytes behind is dropped so
+it cannot delay the others.
+
+`Mirror` keeps a client-side engine in step with the messages, for the
+pygame front end (`python main.py --connect HOST:PORT`) and for
+`Client`, the asyncio client used by the load test.
+
+Usage:
+    python server.py --port 8765                 # Serve on localhost
+    python server.py --unix /tmp/snake.sock
+    python server.py --bench --clients 300       # Load test in one process
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import socket
+import struct
+import sys
+import time
+from collections import deque
+
+from engine import DIFFICULTIES, DIRECTIONS, GRID_COUNT, POWER_UPS, Engine
+from profiler import percentile
+from snapshot import _cell, _pos, restore, to_bytes
+
+# kind, argument (difficulty or direction), grid_count
+REQUEST = struct.Struct("<BBH")
+JOIN, TURN, RESET = range(3)
+
+LENGTH = struct.Struct("<I")
+FULL, DELTA = range(2)
+# kind, changes, direction, moves, head, tail
+DELTA_HEADER = struct.Struct("<BBBxIii")
+# `changes` bits, in the order their fields follow the header
+FOOD, POWER_UP, SCORE, EFFECTS, GAME_OVER, WON = 1, 2, 4, 8, 16, 32
+FOOD_FIELDS = struct.Struct("<i")  # Cell, -1 for none
+POWER_UP_FIELDS = struct.Struct("<iB")  # Cell, 1 + index in POWER_UPS
+SCORE_FIELDS = struct.Struct("<I")
+EFFECTS_FIELDS = struct.Struct("<BBf")  # Active power-up, snake flags, speed
+CONFUSED, DOUBLE_GROWTH = 1, 2
+
+MAX_GRID = 1000  # Largest board a client may ask for (~9 MB of occupancy)
+
+
+def framed(message):
+    return LENGTH.pack(len(message)) + message
+
+
+class View:
+    """What a client has been told about the parts of a game that do not
+    change on every move, to send only what differs."""
+
+    __slots__ = ("food", "power_up", "score", "effects")
+
+    def __init__(self, engine):
+        self.food, self.power_up, self.score, self.effects = self.read(engine)
+
+    @staticmethod
+    def read(engine):
+        grid_count = engine.snake.grid_count
+        names = [None, *POWER_UPS]
+        snake = engine.snake
+        power_up = (
+            _cell(engine.power_up_pos, grid_count) if engine.power_up else -1,
+            names.index(engine.power_up),
+        )
+        effects = (
+            names.index(engine.active_power_up),
+            (CONFUSED if snake.confused else 0)
+            | (DOUBLE_GROWTH if snake.double_growth else 0),
+            snake.speed_mult,
+        )
+        return _cell(engine.food_pos, grid_count), power_up, engine.score, effects
+
+
+def full_message(engine):
+    return framed(bytes([FULL]) + to_bytes(engine))
+
+
+def delta_message(engine, view):
+    """The DELTA for the move `engine` just made; updates `view`."""
+    food, power_up, score, effects = View.read(engine)
+    changes = (GAME_OVER if engine.game_over else 0) | (WON if engine.won else 0)
+    fields = []
+    if food != view.food:
+        changes |= FOOD
+        fields.append(FOOD_FIELDS.pack(food))
+        view.food = food
+    if power_up != view.power_up:
+        changes |= POWER_UP
+        fields.append(POWER_UP_FIELDS.pack(*power_up))
+        view.power_up = power_up
+    if score != view.score:
+        changes |= SCORE
+        fields.append(SCORE_FIELDS.pack(score))
+        view.score = score
+    if effects != view.effects:
+        changes |= EFFECTS
+        fields.append(EFFECTS_FIELDS.pack(*effects))
+        view.effects = effects
+    snake = engine.snake
+    header = DELTA_HEADER.pack(
+        DELTA,
+        changes,
+        DIRECTIONS.index(snake.direction),
+        engine.moves,
+        snake.body[0],
+        engine.vacated,
+    )
+    return framed(b"".join([header, *fields]))
+
+
+class Session:
+    """One client's game on the server."""
+
+    def __init__(self, writer, difficulty, grid_count, seed=None):
+        self.writer = writer
+        self.engine = Engine(difficulty, random.Random(seed), grid_count)
+        self.view = View(self.engine)
+        self.out = [full_message(self.engine)]
+
+    def reset(self):
+        self.engine.reset()
+        self.view = View(self.engine)
+        self.out.append(full_message(self.engine))
+
+    def advance(self, elapsed):
+        """Make the moves due in `elapsed` ms, as `Game.update` does."""
+        if not self.engine.game_over:
+            self.engine.advance(elapsed, self.send_move)
+
+    def send_move(self, engine):
+        self.out.append(delta_message(engine, self.view))
+
+    def flush(self):
+        if self.out:
+            data = b"".join(self.out)
+            self.out.clear()
+            self.writer.write(data)
+
+
+class Server:
+    """Hosts sessions for every client that connects to `serve()`."""
+
+    def __init__(self, tick_rate=60, max_buffer=1 << 16, clock=time.monotonic):
+        self.tick_rate = tick_rate
+        self.max_buffer = max_buffer  # Unsent bytes before a client is dropped
+        self.clock = clock
+        self.sessions = set()
+        self.ticks = 0
+        self.moves = 0
+        self.dropped = 0  # Clients dropped for falling behind
+        self.tick_times = deque(maxlen=10_000)  # Seconds spent per tick
+
+    async def handle(self, reader, writer):
+        session = None
+        try:
+            kind, difficulty, grid_count = REQUEST.unpack(
+                await reader.readexactly(REQUEST.size)
+            )
+            if (
+                kind != JOIN
+                or difficulty >= len(DIFFICULTIES)
+                or not 0 < grid_count <= MAX_GRID
+            ):
+                return
+            session = Session(writer, DIFFICULTIES[difficulty], grid_count)
+            session.flush()
+            self.sessions.add(session)
+            while True:
+                kind, argument, _ = REQUEST.unpack(
+                    await reader.readexactly(REQUEST.size)
+                )
+                if kind == TURN and argument < len(DIRECTIONS):
+                    session.engine.queue_turn(DIRECTIONS[argument])
+                elif kind == RESET and session.engine.game_over:
+                    session.reset()
+                    session.flush()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self.sessions.discard(session)
+            writer.close()
+
+    def tick(self, elapsed):
+        """Advance every session by `elapsed` ms and send the updates."""
+        for session in list(self.sessions):
+            moves = session.engine.moves
+            session.advance(elapsed)
+            self.moves += session.engine.moves - moves
+            session.flush()
+            transport = session.writer.transport
+            if transport.get_write_buffer_size() > self.max_buffer:
+                self.sessions.discard(session)
+                self.dropped += 1
+                transport.abort()
+        self.ticks += 1
+
+    async def run(self):
+        interval = 1 / self.tick_rate
+        last = due = self.clock()
+        while True:
+            due += interval
+            await asyncio.sleep(max(0.0, due - self.clock()))
+            now = self.clock()
+            self.tick((now - last) * 1000)
+            last = now
+            self.tick_times.append(self.clock() - now)
+            if due < now - interval:
+                due = now  # Fell behind: don't try to catch up in a burst
+
+    async def serve(self, host="127.0.0.1", port=8765, path=None):
+        if path is not None:
+            server = await asyncio.start_unix_server(self.handle, path)
+        else:
+            server = await asyncio.start_server(self.handle, host, port)
+        async with server:
+            await asyncio.gather(server.serve_forever(), self.run())
+
+    def summary(self):
+        times = [t * 1000 for t in self.tick_times]
+        return {
+            "sessions": len(self.sessions),
+            "ticks": self.ticks,
+            "moves": self.moves,
+            "dropped": self.dropped,
+            "tick_p50_ms": percentile(times, 0.5),
+            "tick_p99_ms": percentile(times, 0.99),
+            "tick_max_ms": max(times, default=0.0),
+        }
+
+
+class Mirror:
+    """Client-side copy of a session: applies server messages to `engine`
+    (a plain `Engine` or a `Game`)."""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.buffer = bytearray()
+        self.fulls = 0  # FULL messages applied so far
+
+    def feed(self, data):
+        """Apply every complete message in `data` and what was left over
+        from before; return how many were applied."""
+        buffer = self.buffer
+        buffer += data
+        start = 0
+        count = 0
+        while len(buffer) - start >= LENGTH.size:
+            (size,) = LENGTH.unpack_from(buffer, start)
+            end = start + LENGTH.size + size
+            if end > len(buffer):
+                break
+            self.apply(memoryview(buffer)[start + LENGTH.size : end])
+            start = end
+            count += 1
+        del buffer[:start]
+        return count
+
+    def apply(self, message):
+        if message[0] == FULL:
+            restore(self.engine, message[1:])
+            self.fulls += 1
+        elif message[0] == DELTA:
+            self.apply_delta(message)
+
+    def apply_delta(self, message):
+        engine = self.engine
+        snake = engine.snake
+        grid_count = snake.grid_count
+        _, changes, direction, engine.moves, head, tail = DELTA_HEADER.unpack_from(
+            message
+        )
+        old_head = snake.body[0]
+        snake.direction = snake.next_direction = DIRECTIONS[direction]
+        snake.grow = tail < 0
+        engine.vacated = snake.move_to(head)
+        if engine.changed_cells is not None:
+            engine.changed_cells.append(old_head)
+            engine.changed_cells.append(head)
+            if tail >= 0:
+                engine.changed_cells.append(tail)
+
+        offset = DELTA_HEADER.size
+        names = [None, *POWER_UPS]
+        if changes & FOOD:
+            (food,) = FOOD_FIELDS.unpack_from(message, offset)
+            offset += FOOD_FIELDS.size
+            engine.food_pos = _pos(food, grid_count)
+        if changes & POWER_UP:
+            cell, kind = POWER_UP_FIELDS.unpack_from(message, offset)
+            offset += POWER_UP_FIELDS.size
+            engine.power_up = names[kind]
+            engine.power_up_pos = _pos(cell, grid_count)
+        if changes & SCORE:
+            (engine.score,) = SCORE_FIELDS.unpack_from(message, offset)
+            offset += SCORE_FIELDS.size
+            engine.level = engine.score // 5 + 1
+        if changes & EFFECTS:
+            active, flags, snake.speed_mult = EFFECTS_FIELDS.unpack_from(
+                message, offset
+            )
+            engine.active_power_up = names[active]
+            snake.confused = bool(flags & CONFUSED)
+            snake.double_growth = bool(flags & DOUBLE_GROWTH)
+        engine.game_over = bool(changes & GAME_OVER)
+        engine.won = bool(changes & WON)
+
+
+class Connection:
+    """Blocking-socket link to a server for the pygame front end, which
+    polls it once per frame."""
+
+    def __init__(self, address):
+        # "HOST:PORT" for TCP, anything else is a Unix socket path
+        host, _, port = address.rpartition(":")
+        if port.isdigit():
+            self.socket = socket.create_connection((host or "127.0.0.1", int(port)))
+            self.socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        else:
+            self.socket = socket.socket(socket.AF_UNIX)
+            self.socket.connect(address)
+        self.mirror = None
+        self.joined = False
+
+    def start(self, engine):
+        """Join, or restart the game if already joined, and wait for its
+        state to be loaded into `engine`."""
+        if self.joined:
+            request = REQUEST.pack(RESET, 0, 0)
+        else:
+            difficulty = DIFFICULTIES.index(engine.difficulty)
+            request = REQUEST.pack(JOIN, difficulty, engine.grid_count)
+            self.joined = True
+        self.mirror = Mirror(engine)
+        self.socket.setblocking(True)
+        self.socket.sendall(request)
+        while not self.mirror.fulls:
+            data = self.socket.recv(1 << 16)
+            if not data:
+                raise ConnectionError("server closed the connection")
+            self.mirror.feed(data)
+        self.socket.setblocking(False)
+
+    def turn(self, direction):
+        self.socket.sendall(REQUEST.pack(TURN, DIRECTIONS.index(direction), 0))
+
+    def poll(self):
+        """Apply everything the server has sent since the last call."""
+        while True:
+            try:
+                data = self.socket.recv(1 << 16)
+            except BlockingIOError:
+                return
+            if not data:
+                raise ConnectionError("server closed the connection")
+            self.mirror.feed(data)
+
+    def close(self):
+        self.socket.close()
+
+
+class Client:
+    """asyncio client keeping a mirrored `Engine`; used by the load test."""
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.engine = Engine()
+        self.mirror = Mirror(self.engine)
+        self.messages = 0
+        self.received = 0  # Bytes
+
+    @classmethod
+    async def connect(
+        cls, difficulty, grid_count=GRID_COUNT, host="127.0.0.1", port=8765, path=None
+    ):
+        if path is not None:
+            reader, writer = await asyncio.open_unix_connection(path)
+        else:
+            reader, writer = await asyncio.open_connection(host, port)
+        client = cls(reader, writer)
+        writer.write(REQUEST.pack(JOIN, DIFFICULTIES.index(difficulty), grid_count))
+        while not client.mirror.fulls:
+            await client.receive()
+        return client
+
+    async def receive(self):
+        data = await self.reader.read(1 << 16)
+        if not data:
+            raise ConnectionError("server closed the connection")
+        self.received += len(data)
+        self.messages += self.mirror.feed(data)
+
+    def turn(self, direction):
+        self.writer.write(REQUEST.pack(TURN, DIRECTIONS.index(direction), 0))
+
+    def reset(self):
+        self.writer.write(REQUEST.pack(RESET, 0, 0))
+
+    def close(self):
+        self.writer.close()
+
+
+async def bot(client, rng, seconds):
+    """Play for `seconds`: turn now and then, restart after a game over."""
+    deadline = time.monotonic() + seconds
+    try:
+        while True:
+            await asyncio.wait_for(client.receive(), deadline - time.monotonic())
+            if client.engine.game_over:
+                client.reset()
+            elif rng.random() < 0.2:
+                client.turn(rng.choice(DIRECTIONS))
+    except asyncio.TimeoutError:
+        pass
+    client.close()
+
+
+async def load_test(clients, seconds, difficulty, grid_count, path=None):
+    server = Server()
+    if path is not None:
+        listener = await asyncio.start_unix_server(server.handle, path)
+        port = None
+    else:
+        listener = await asyncio.start_server(server.handle, "127.0.0.1", 0)
+        port = listener.sockets[0].getsockname()[1]
+    ticker = asyncio.ensure_future(server.run())
+    connected = await asyncio.gather(
+        *(
+            Client.connect(difficulty, grid_count, port=port, path=path)
+            for _ in range(clients)
+        )
+    )
+    rng = random.Random(0)
+    await asyncio.gather(*(bot(client, rng, seconds) for client in connected))
+    ticker.cancel()
+    listener.close()
+    summary = server.summary()
+    messages = sum(client.messages for client in connected)
+    received = sum(client.received for client in connected)
+    summary.update(
+        clients=clients,
+        moves_per_second=server.moves / seconds,
+        bytes_per_message=received / messages if messages else 0.0,
+    )
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the snake game server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", metavar="PATH", help="serve on a Unix socket")
+    parser.add_argument("--tick-rate", type=int, default=60)
+    parser.add_argument("--bench", action="store_true", help="run a load test")
+    parser.add_argument("--clients", type=int, default=200)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument(
+        "--difficulty",
+        default="Expert",
+        choices=DIFFICULTIES,
+        help="difficulty of the load-test games",
+    )
+    parser.add_argument("--board", type=int, default=GRID_COUNT, metavar="N")
+    args = parser.parse_args(argv)
+
+    if args.bench:
+        summary = asyncio.run(
+            load_test(args.clients, args.seconds, args.difficulty, args.board, args.unix)
+        )
+        json.dump(summary, sys.stdout, indent=2)
+        print()
+        return
+    server = Server(args.tick_rate)
+    try:
+        asyncio.run(server.serve(args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
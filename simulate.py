@@ -0,0 +1,253 @@
+"""Run many headless games across all CPU cores and report statistics.
+
+Usage:
+    python simulate.py --games 100000 --difficulty Expert --policy greedy
+
+Every game gets its own `random.Random` seeded from `--seed` and the game
+index, so results do not depend on the number of workers.
+"""
+
+import argparse
+import importlib
+import json
+import os
+import random
+import sys
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from autopilot import Autopilot
+from engine import DIFFICULTIES, DIRECTIONS, Engine
+
+
+def straight_policy(engine, rng):
+    return None
+
+
+def random_policy(engine, rng):
+    return rng.choice(DIRECTIONS)
+
+
+def greedy_policy(engine, rng):
+    """Step towards the power-up or the food, avoiding the body."""
+    snake = engine.snake
+    grid_count = snake.grid_count
+    head = snake.head
+    target = engine.power_up_pos or engine.food_pos
+    best = None
+    for direction in DIRECTIONS:
+        if direction == (-snake.direction[0], -snake.direction[1]):
+            continue
+        pos = (
+            (head[0] + direction[0]) % grid_count,
+            (head[1] + direction[1]) % grid_count,
+        )
+        dx = abs(pos[0] - target[0])
+        dy = abs(pos[1] - target[1])
+        distance = min(dx, grid_count - dx) + min(dy, grid_count - dy)
+        key = (snake.occupies(pos), distance, rng.random())
+        if best is None or key < best[0]:
+            best = (key, direction)
+    direction = best[1]
+    if snake.confused:
+        # Engine.turn inverts confused input, so ask for the opposite
+        direction = (-direction[0], -direction[1])
+    return direction
+
+
+POLICIES = {
+    "straight": straight_policy,
+    "random": random_policy,
+    "greedy": greedy_policy,
+    "autopilot": Autopilot().policy,  # One planner per worker process
+}
+
+
+def load_policy(name):
+    """Return a built-in policy or import one given as "module:function".
+
+    A policy is called as `policy(engine, rng)` before every move and
+    returns a `Direction` or None to keep going.
+    """
+    if name in POLICIES:
+        return POLICIES[name]
+    module, _, attr = name.partition(":")
+    return getattr(importlib.import_module(module), attr)
+
+
+class Stats:
+    """Aggregated results of a set of games; merged across workers."""
+
+    def __init__(self):
+        self.games = 0
+        self.scores = Counter()
+        self.lengths = Counter()  # Game length in moves, bucketed
+        self.causes = Counter()
+        self.spawned = Counter()
+        self.picked = Counter()
+        self.total_moves = 0
+        self.total_time = 0.0  # Simulated seconds
+
+    def merge(self, other):
+        self.games += other.games
+        self.scores.update(other.scores)
+        self.lengths.update(other.lengths)
+        self.causes.update(other.causes)
+        self.spawned.update(other.spawned)
+        self.picked.update(other.picked)
+        self.total_moves += other.total_moves
+        self.total_time += other.total_time
+
+    def on_spawn(self, engine):
+        """`Engine.power_up_log` hook."""
+        self.spawned[engine.power_up] += 1
+
+    def on_pickup(self, engine, name):
+        self.picked[name] += 1
+
+    def add(self, engine, cause, time):
+        self.games += 1
+        self.scores[engine.score] += 1
+        self.lengths[engine.moves // 100 * 100] += 1
+        self.causes[cause] += 1
+        self.total_moves += engine.moves
+        self.total_time += time
+
+    def percentile(self, counter, fraction):
+        seen = 0
+        for value in sorted(counter):
+            seen += counter[value]
+            if seen >= fraction * self.games:
+                return value
+        return 0
+
+    def summary(self):
+        games = max(self.games, 1)
+        return {
+            "games": self.games,
+            "score": {
+                "mean": sum(s * n for s, n in self.scores.items()) / games,
+                "p50": self.percentile(self.scores, 0.5),
+                "p99": self.percentile(self.scores, 0.99),
+                "max": max(self.scores, default=0),
+                "histogram": dict(sorted(self.scores.items())),
+            },
+            "length": {
+                "mean_moves": self.total_moves / games,
+                "mean_seconds": self.total_time / games,
+                "p50_moves": self.percentile(self.lengths, 0.5),
+                "p99_moves": self.percentile(self.lengths, 0.99),
+            },
+            "causes": {cause: n / games for cause, n in self.causes.items()},
+            "power_ups": {
+                name: {
+                    "spawned": self.spawned[name],
+                    "picked": self.picked[name],
+                    "pickup_rate": self.picked[name] / self.spawned[name],
+                }
+                for name in sorted(self.spawned)
+            },
+        }
+
+
+def play(engine, policy, rng, max_moves, stats):
+    time = 0.0
+    engine.power_up_log = stats
+    while not engine.game_over and engine.moves < max_moves:
+        time += 1 / engine.get_current_speed()
+        engine.step(policy(engine, rng))
+    if engine.won:
+        cause = "win"
+    elif engine.game_over:
+        cause = "collision"
+    else:
+        cause = "move limit"
+    stats.add(engine, cause, time)
+
+
+def run_chunk(first, count, seed, difficulty, policy_name, max_moves):
+    policy = load_policy(policy_name)
+    stats = Stats()
+    for index in range(first, first + count):
+        rng = random.Random(f"{seed}:{index}")
+        play(Engine(difficulty, rng), policy, rng, max_moves, stats)
+    return stats
+
+
+def simulate(
+    games,
+    difficulty="Recommended",
+    policy="greedy",
+    seed=0,
+    workers=None,
+    max_moves=100_000,
+    chunk_size=None,
+    progress=None,
+):
+    """Play `games` games on a process pool and return the merged Stats.
+
+    `progress`, if given, is called with the running Stats as chunks
+    complete.
+    """
+    workers = workers or os.cpu_count()
+    chunk_size = chunk_size or max(1, min(1000, games // (workers * 4) or 1))
+    total = Stats()
+    with ProcessPoolExecutor(workers) as pool:
+        futures = [
+            pool.submit(
+                run_chunk,
+                first,
+                min(chunk_size, games - first),
+                seed,
+                difficulty,
+                policy,
+                max_moves,
+            )
+            for first in range(0, games, chunk_size)
+        ]
+        for future in as_completed(futures):
+            total.merge(future.result())
+            if progress:
+                progress(total)
+    return total
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--games", type=int, default=10_000)
+    parser.add_argument(
+        "--difficulty",
+        default="Recommended",
+        choices=DIFFICULTIES,
+    )
+    parser.add_argument(
+        "--policy",
+        default="greedy",
+        help=f"one of {', '.join(POLICIES)} or module:function",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--max-moves", type=int, default=100_000)
+    parser.add_argument("--chunk-size", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    def progress(stats):
+        print(f"\r{stats.games}/{args.games} games", end="", file=sys.stderr)
+
+    stats = simulate(
+        args.games,
+        args.difficulty,
+        args.policy,
+        args.seed,
+        args.workers,
+        args.max_moves,
+        args.chunk_size,
+        progress,
+    )
+    print(file=sys.stderr)
+    json.dump(stats.summary(), sys.stdout, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    main()
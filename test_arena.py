@@ -0,0 +1,138 @@
+import random
+
+import engine
+from arena import Arena
+from engine import (
+    MOVES,
+    POWER_UPS,
+    Direction,
+    PowerUp,
+    PowerUpEffect,
+    register_power_up,
+)
+
+
+def make_arena(*bodies, food=((9, 9),), **kwargs):
+    """An arena with one snake per body, each heading right."""
+    arena = Arena(len(bodies), "Expert", random.Random(0), 10, **kwargs)
+    for cell in list(arena.food):
+        arena.remove_food(cell)
+    for index, body in enumerate(bodies):
+        snake = arena.snakes[index]
+        snake.positions = body
+        snake.direction = snake.next_direction = Direction.RIGHT
+    for x, y in food:
+        cell = y * 10 + x
+        arena.food_slots[cell] = len(arena.food)
+        arena.food.append(cell)
+    return arena
+
+
+def test_snakes_share_one_occupancy_index():
+    arena = Arena(50, "Expert", random.Random(1), 20)
+    assert all(snake.counts is arena.counts for snake in arena.snakes)
+    assert sum(arena.counts) == 50
+    assert len(arena.free) == 400 - 50
+    for _ in range(20):
+        arena.step(arena.bot_actions())
+    segments = sum(len(s.body) for s, alive in zip(arena.snakes, arena.alive) if alive)
+    assert sum(arena.counts) == segments
+    assert len(arena.free) == 400 - len(set().union(*(s.body for s in arena.snakes)))
+
+
+def test_head_into_body_kills_only_the_mover():
+    arena = make_arena([(2, 5), (1, 5)], [(3, 4), (3, 5), (3, 6)])
+    arena.turn_snake(1, Direction.UP)  # Moves out of the way
+    arena.step()
+    # Snake 0's head reached (3, 5), now snake 1's second segment
+    assert arena.alive == [False, True]
+    assert arena.deaths == 1
+    assert arena.counts[5 * 10 + 2] == 0 and arena.counts[5 * 10 + 3] == 1
+    assert not arena.game_over
+
+
+def test_head_on_collision_kills_both():
+    arena = make_arena([(2, 5)], [(4, 5)])
+    arena.snakes[1].direction = arena.snakes[1].next_direction = Direction.LEFT
+    assert arena.step()
+    assert arena.alive == [False, False]
+    assert sum(arena.counts) == 0 and len(arena.free) == 100
+
+
+def test_eating_grows_and_respawns_food():
+    arena = make_arena([(2, 5)], [(2, 7)], food=[(3, 5)])
+    arena.step()
+    assert arena.scores == [1, 0] and arena.score == 1
+    assert len(arena.food) == 1 and arena.food[0] != 5 * 10 + 3
+    arena.step()
+    assert len(arena.snakes[0].body) == 2
+
+
+def test_power_up_is_picked_up_by_any_snake():
+    arena = make_arena([(2, 5)], [(2, 7)])
+    arena.spawn_power_up()
+    arena.power_up = PowerUpEffect.DOUBLE_GROWTH
+    arena.power_up_pos = (3, 7)
+    arena.step()
+    assert arena.power_up is None and arena.power_up_pos is None
+    assert arena.active == [None, PowerUpEffect.DOUBLE_GROWTH]
+    assert arena.snakes[1].double_growth
+
+
+def test_power_ups_last_as_registered_for_each_snake():
+    def slow(snake):
+        snake.speed_mult = 0.5
+
+    register_power_up(PowerUp("Slow", slow, duration=3, unit=MOVES))
+    try:
+        arena = make_arena([(2, 5)], [(2, 7)], food=[(5, 5)])
+        arena.spawn_power_up()
+        arena.power_up = "Slow"
+        arena.power_up_pos = (3, 7)
+        arena.step()
+        arena.power_up = PowerUpEffect.CONFUSION  # Lasts until snake 0 eats
+        arena.power_up_pos = (4, 5)
+        arena.step()
+        assert arena.active == [PowerUpEffect.CONFUSION, "Slow"]
+        arena.step()  # Snake 0 eats; its effect ends on the next tick
+        assert arena.scores == [1, 0] and arena.snakes[1].speed_mult == 0.5
+        arena.step()  # Three moves after the pickup
+        assert arena.active == [None, None] and arena.snake_effects == [[], []]
+        assert not arena.snakes[0].confused and arena.snakes[1].speed_mult == 1.0
+    finally:
+        del POWER_UPS["Slow"]
+
+
+def test_respawn():
+    arena = make_arena([(2, 5)], [(4, 5)], respawn=True)
+    arena.snakes[1].direction = arena.snakes[1].next_direction = Direction.LEFT
+    assert not arena.step()
+    assert arena.alive == [True, True]
+    assert sum(arena.counts) == 2
+
+
+def test_player_snake_uses_the_engine_interface():
+    arena = make_arena([(2, 5)], [(2, 7)])
+    assert arena.queue_turn(Direction.UP)
+    arena.tick(False)
+    assert arena.moves == 0 and arena.ticks == 1
+    arena.advance(1000 / arena.get_current_speed())
+    assert arena.snakes[0].head == (2, 4) and arena.snakes[1].head == (3, 7)
+
+    fork = arena.fork()
+    fork.step()
+    assert fork.snakes[0].head == (2, 3) and arena.snakes[0].head == (2, 4)
+    assert fork.counts is fork.snakes[1].counts and fork.counts != arena.counts
+    arena.step()
+    assert list(arena.snakes[0].body) == list(fork.snakes[0].body)
+    assert arena.food == fork.food
+
+
+def test_reset_only_builds_the_arena_snakes(monkeypatch):
+    def no_private_snake(*args, **kwargs):
+        raise AssertionError("Engine.reset built a snake the arena throws away")
+
+    monkeypatch.setattr(engine, "Snake", no_private_snake)
+    arena = Arena(3, grid_count=20, rng=random.Random(0))
+    arena.reset()
+    assert len(arena.snakes) == 3 and arena.timeline is not None
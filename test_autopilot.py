@@ -0,0 +1,56 @@
+import random
+
+from autopilot import Autopilot, play
+from engine import Direction, Engine
+from simulate import simulate
+
+
+def test_autopilot_fills_a_small_board():
+    autopilot = Autopilot()
+    engine = play(autopilot, Engine("Expert", random.Random(0), 10), 5000)
+    assert engine.won
+    summary = autopilot.summary()
+    assert summary["moves"] == engine.moves
+    assert summary["replans"] < engine.moves / 4  # Paths are reused
+    assert summary["plan_p99_us"] > 0
+
+
+def test_autopilot_wins_every_game():
+    for grid_count in (5, 8, 10, 13):
+        for seed in range(5):
+            engine = Engine("Recommended", random.Random(seed), grid_count)
+            play(Autopilot(), engine, 200_000)
+            assert engine.won, (grid_count, seed)
+
+
+def test_autopilot_is_deterministic():
+    results = []
+    for _ in range(2):
+        engine = play(Autopilot(), Engine("Expert", random.Random(5), 12), 3000)
+        results.append((engine.score, engine.moves, list(engine.snake.positions)))
+    assert results[0] == results[1]
+
+
+def test_hamiltonian_cycle_visits_every_cell():
+    autopilot = Autopilot()
+    for grid_count in (5, 6):
+        autopilot.grid_count = grid_count
+        cell, seen = 0, set()
+        for position in range(grid_count * grid_count):
+            assert autopilot.cycle_index(cell) == position
+            seen.add(cell)
+            cell = autopilot.step(cell, autopilot.cycle_direction(cell))
+        assert cell == 0 and len(seen) == grid_count * grid_count
+
+
+def test_autopilot_never_reverses():
+    engine = Engine("Expert", random.Random(1), 10)
+    engine.snake.positions = [(5, 5), (6, 5)]
+    engine.snake.direction = engine.snake.next_direction = Direction.LEFT
+    engine.food_pos = (7, 5)  # Right behind the head
+    assert Autopilot().choose(engine) != Direction.RIGHT
+
+
+def test_autopilot_policy_in_simulate():
+    summary = simulate(8, "Expert", "autopilot", seed=1, workers=2, max_moves=500)
+    assert summary.summary()["score"]["mean"] > 5
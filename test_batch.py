@@ -0,0 +1,108 @@
+import random
+
+import numpy as np
+
+from batch import POWER_UPS, BatchEngine
+from engine import DIRECTIONS, Engine
+
+
+class Spawns:
+    """The batch's random placements, handed to an `Engine` as its own.
+
+    The two draw from different RNGs, so the engine gets the cell (and
+    power-up kind) the batch chose, but only when it decides to spawn one
+    itself: a spawn only one of them makes is left over or missing.
+    """
+
+    def __init__(self, batch, game=0):
+        self.grid_count = batch.grid_count
+        self.cells = []
+        self.kinds = []
+        random_positions = batch.random_positions
+        spawn_power_up = batch.spawn_power_up
+
+        def positions(rows):
+            result = random_positions(rows)
+            self.cells.extend(int(cell) for cell in result[rows == game])
+            return result
+
+        def power_up(rows):
+            spawn_power_up(rows)
+            if (rows == game).any():
+                self.kinds.append(POWER_UPS[batch.power_up[game]])
+
+        batch.random_positions = positions
+        batch.spawn_power_up = power_up
+
+    def position(self):
+        assert self.cells, "the engine placed an item the batch did not"
+        cell = self.cells.pop(0)
+        return None if cell < 0 else (cell % self.grid_count, cell // self.grid_count)
+
+    def choice(self, options):
+        assert self.kinds, "the engine spawned a power-up the batch did not"
+        kind = self.kinds.pop(0)
+        assert kind in options
+        return kind
+
+
+def item_cells(engine):
+    grid_count = engine.grid_count
+    power_up = engine.power_up_pos if engine.power_up else None
+    return [
+        -1 if pos is None else pos[1] * grid_count + pos[0]
+        for pos in (engine.food_pos, power_up)
+    ]
+
+
+def chase(engine):
+    # Head for the power-up or food, sometimes wandering off
+    head = engine.snake.head
+    target = engine.power_up_pos or engine.food_pos
+    if target[0] != head[0]:
+        return 3 if target[0] > head[0] else 2
+    return 1 if target[1] > head[1] else 0
+
+
+def test_batch_matches_engine_rules():
+    rng = random.Random(3)
+    for difficulty in ["Beginner", "Expert"]:
+        batch = BatchEngine(4, difficulty, grid_count=12, seed=1)
+        engine = Engine(difficulty, random.Random(0), grid_count=12)
+        assert list(engine.snake.positions) == batch.positions(0)
+        engine.food_pos = (int(batch.food[0]) % 12, int(batch.food[0]) // 12)
+        spawns = Spawns(batch)
+        engine.rng = spawns
+        engine.get_random_position = spawns.position
+        picked = set()
+        for _ in range(5000):
+            action = chase(engine) if rng.random() < 0.8 else rng.randrange(-1, 4)
+            actions = np.full(4, -1)
+            actions[0] = action
+            done = batch.step(actions)
+            engine.step(DIRECTIONS[action] if action >= 0 else None)
+            if done[0]:
+                assert engine.game_over
+                assert batch.final_score[0] == engine.score
+                break
+            assert not spawns.cells and not spawns.kinds  # Spawned by both
+            assert item_cells(engine) == [batch.food[0], batch.power_up_pos[0]]
+            assert list(engine.snake.positions) == batch.positions(0)
+            assert engine.score == batch.score[0]
+            assert engine.snake.confused == batch.confused[0]
+            assert engine.snake.speed_mult == batch.speed_mult[0]
+            picked.add(engine.active_power_up)
+        assert engine.game_over
+        assert len(picked) > 1  # Power-ups were spawned and picked up
+
+
+def test_batch_resets_finished_games():
+    batch = BatchEngine(64, "Expert", grid_count=10, seed=0)
+    rng = np.random.default_rng(0)
+    finished = 0
+    for _ in range(500):
+        done = batch.step(rng.integers(-1, 4, batch.n))
+        finished += done.sum()
+        assert (batch.occupancy.sum(axis=1) == batch.length).all()
+    assert finished > 0
+    assert (batch.moves < 500).any()
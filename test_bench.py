@@ -0,0 +1,57 @@
+import gc
+
+from bench import bench_game, compare, make_engine, make_snake, measure
+
+
+def test_compare_flags_only_regressions_beyond_tolerance():
+    baseline = {
+        "snake_update": {"value": 1000.0, "unit": "moves/s"},
+        "check_collision": {"value": 100.0, "unit": "ns"},
+        "game_draw": {"value": 2.0, "unit": "ms"},
+    }
+    results = {
+        "snake_update": {"value": 700.0, "unit": "moves/s"},  # 30% slower
+        "check_collision": {"value": 110.0, "unit": "ns"},  # Within tolerance
+        "game_draw": {"value": 1.0, "unit": "ms"},  # Faster
+        "new_metric": {"value": 5.0, "unit": "ms"},
+    }
+    assert compare(results, baseline, 0.25) == [("snake_update", 1000.0, 700.0)]
+
+
+def test_measure_times_with_the_collector_paused():
+    states = []
+    assert measure(lambda: states.append(gc.isenabled()), 0.001) > 0
+    assert states[0] and not states[-1]  # Warm-up collects, timed runs do not
+    assert gc.isenabled()
+
+
+def test_bench_snake_covers_requested_fraction():
+    snake = make_snake(20, 0.5)
+    assert len(snake.positions) == 200
+    assert not snake.check_collision()
+    engine = make_engine(20, 0.9)
+    assert not engine.snake.occupies(engine.food_pos)
+
+
+def test_bench_snake_never_piles_up():
+    engine = make_engine(20, 0.5)
+    for _ in range(20_000):
+        engine.tick(True)
+    # It fills the board and goes on round the path; at most the segment
+    # grown after the win shares a cell
+    assert engine.won and max(engine.snake.counts) <= 2
+
+
+def test_bench_game_runs_each_requested_size():
+    results = {}
+    bench_game(results, [4, 6], [0.5], 0)  # Tiny boards, one call per metric
+    assert sorted(results) == sorted(
+        f"{metric}[grid={grid},length={grid * grid // 2}]"
+        for grid in (4, 6)
+        for metric in (
+            "game_update",
+            "game_draw_full",
+            "game_draw_dirty",
+            "game_draw_grid",
+        )
+    )
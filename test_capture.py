@@ -0,0 +1,58 @@
+import io
+import random
+
+import pygame
+
+from capture import Capture, encode_png
+from main import Game
+from render import WINDOW_SIZE
+
+
+def make_game(seed=0):
+    game = Game(headless=True, grid_count=20, autopilot=True)
+    game.difficulty = "Expert"
+    game.rng = random.Random(seed)
+    game.reset()
+    return game
+
+
+def test_encode_png_round_trips(tmp_path):
+    surface = pygame.Surface((30, 20))
+    surface.fill((10, 20, 30))
+    surface.set_at((29, 19), (200, 100, 50))
+    path = tmp_path / "frame.png"
+    path.write_bytes(encode_png(surface))
+    loaded = pygame.image.load(str(path))
+    assert loaded.get_size() == (30, 20)
+    assert loaded.get_at((0, 0))[:3] == (10, 20, 30)
+    assert loaded.get_at((29, 19))[:3] == (200, 100, 50)
+
+
+def test_png_capture_skips_unchanged_frames(tmp_path):
+    game = make_game()
+    summary = Capture(game, str(tmp_path), workers=2).run(max_frames=120)
+    assert summary["frames"] == 120
+    # Expert moves about every 5 frames; only those frames are encoded
+    assert 20 <= summary["encoded"] <= 30
+    pngs = sorted(tmp_path.glob("*.png"))
+    assert len(pngs) == summary["encoded"]
+
+    lines = (tmp_path / "frames.ffconcat").read_text().splitlines()
+    durations = [float(line.split()[1]) for line in lines if line.startswith("dur")]
+    assert abs(sum(durations) - 120 / 60) < 1e-3
+    last = pygame.image.load(str(pngs[-1]))
+    assert pygame.image.tostring(last, "RGB") == pygame.image.tostring(
+        game.screen, "RGB"
+    )
+
+
+def test_raw_capture_writes_every_frame():
+    game = make_game()
+    out = io.BytesIO()
+    summary = Capture(game, out, "raw", queue_size=3).run(max_frames=30)
+    data = out.getvalue()
+    frame = WINDOW_SIZE * WINDOW_SIZE * 3
+    assert len(data) == 30 * frame
+    assert summary["encoded"] < 30
+    assert data[-frame:] == pygame.image.tostring(game.screen, "RGB")
+    assert data[:frame] != data[-frame:]
@@ -0,0 +1,291 @@
+import random
+import subprocess
+import sys
+
+from engine import (
+    GRID_COUNT,
+    MOVES,
+    POWER_UPS,
+    Direction,
+    Engine,
+    PowerUp,
+    PowerUpEffect,
+    Snake,
+    register_power_up,
+)
+
+
+def test_engine_does_not_import_pygame():
+    code = "import engine, sys; engine.Engine('Expert').step(); print('pygame' in sys.modules)"
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+    assert out.stdout.strip() == "False"
+
+
+def test_step_moves_one_cell():
+    engine = Engine("Recommended")
+    head = engine.snake.positions[0]
+    engine.step()
+    assert engine.snake.positions[0] == (head[0] + 1, head[1])
+
+
+def test_step_applies_action():
+    engine = Engine("Recommended")
+    head = engine.snake.positions[0]
+    engine.step(Direction.UP)
+    assert engine.snake.positions[0] == (head[0], head[1] - 1)
+
+
+def test_step_ignores_reverse_action():
+    engine = Engine("Recommended")
+    engine.step(Direction.LEFT)
+    assert engine.snake.direction == Direction.RIGHT
+
+
+def test_step_confused_action_is_inverted():
+    engine = Engine("Expert")
+    engine.snake.confused = True
+    engine.step(Direction.UP)
+    assert engine.snake.direction == Direction.DOWN
+
+
+def test_step_eats_food_and_picks_power_up():
+    engine = Engine("Recommended")
+    head = engine.snake.positions[0]
+    engine.food_pos = (head[0] + 1, head[1])
+    engine.power_up = PowerUpEffect.DOUBLE_SPEED
+    engine.power_up_pos = (head[0] + 2, head[1])
+    engine.step()
+    assert engine.score == 1
+    engine.step()
+    assert engine.snake.speed_mult == 2.0
+    assert len(engine.snake.positions) == 2
+
+
+def test_tick_without_move_keeps_position():
+    engine = Engine("Beginner")
+    head = engine.snake.positions[0]
+    engine.tick(False)
+    assert engine.snake.positions[0] == head
+    assert engine.moves == 0
+
+
+def test_advance_moves_at_the_game_speed():
+    engine = Engine("Beginner")  # 5 moves a second
+    moved = []
+    assert engine.advance(100, moved.append) == 0
+    assert engine.ticks == 1 and engine.moves == 0  # Ticked without moving
+    assert engine.advance(500, moved.append) == 3
+    assert engine.ticks == 4 and moved == [engine] * 3
+    assert engine.accumulator == 0
+    engine.advance(200 * 25)
+    assert engine.moves == 23 and engine.dropped_moves == 5
+
+
+def test_step_reports_game_over():
+    engine = Engine("Beginner")
+    engine.snake.positions = [(5, 5), (6, 5), (6, 6), (5, 6), (4, 6), (4, 5)]
+    engine.snake.direction = engine.snake.next_direction = Direction.DOWN
+    assert engine.step() is True
+    assert engine.game_over
+
+
+def test_occupancy_follows_body():
+    engine = Engine("Recommended")
+    snake = engine.snake
+    snake.positions = [(5, 5), (4, 5), (3, 5)]
+    snake.update()
+    assert snake.occupies((6, 5))
+    assert not snake.occupies((3, 5))
+    assert sum(snake.counts) == len(snake.positions) == 3
+    snake.grow = True
+    snake.update()
+    assert sum(snake.counts) == 4
+    assert not snake.check_collision()
+
+
+def test_body_ring_grows_and_wraps():
+    snake = Snake()
+    start = snake.head
+    for _ in range(100):
+        snake.grow = True
+        snake.update()
+    for _ in range(50):
+        snake.update()
+    assert len(snake.positions) == 101
+    assert snake.positions[0] == ((start[0] + 150) % GRID_COUNT, start[1])
+    assert snake.positions[-1] == ((start[0] + 50) % GRID_COUNT, start[1])
+    assert list(snake.positions)[1:3] == snake.positions[1:3]
+
+
+def test_free_cells_track_body():
+    snake = Snake()
+    assert len(snake.free) == GRID_COUNT * GRID_COUNT - 1
+    snake.grow = True
+    snake.update()
+    snake.update()
+    assert len(snake.free) == GRID_COUNT * GRID_COUNT - 2
+    for x, y in snake.positions:
+        assert y * GRID_COUNT + x not in snake.free
+
+
+def test_cells_can_be_set_from_an_iterator():
+    snake = Snake(10)
+    snake.cells = (cell for cell in [55, 54, 53])
+    assert list(snake.body) == [55, 54, 53]
+    assert sum(snake.counts) == 3 and len(snake.free) == 97
+    snake.next_direction = Direction.LEFT  # Back into its own body
+    snake.direction = Direction.UP
+    snake.update()
+    assert snake.check_collision()
+
+
+def test_random_position_avoids_snake_food_and_power_up():
+    engine = Engine("Expert")
+    cells = [(x, y) for y in range(GRID_COUNT) for x in range(GRID_COUNT)]
+    engine.snake.positions = cells[:-3]
+    engine.food_pos = cells[-3]
+    engine.power_up_pos = cells[-2]
+    assert engine.get_random_position() == cells[-1]
+
+
+def test_full_board_is_a_win():
+    engine = Engine("Expert")
+    # Fill every row but the last with a snake heading for the last free cell
+    cells = [(x, y) for y in range(GRID_COUNT) for x in range(GRID_COUNT)]
+    body = cells[:-1][::-1]
+    engine.snake.positions = body
+    engine.snake.direction = engine.snake.next_direction = Direction.RIGHT
+    engine.food_pos = cells[-1]
+    engine.snake.grow = True
+    engine.step()
+    assert engine.food_pos is None
+    assert engine.won and engine.game_over
+
+
+def test_food_replaces_power_up_on_last_free_cell():
+    engine = Engine("Expert")
+    cells = [(x, y) for y in range(GRID_COUNT) for x in range(GRID_COUNT)]
+    engine.snake.positions = cells[:-2][::-1]
+    engine.snake.direction = engine.snake.next_direction = Direction.RIGHT
+    engine.food_pos = cells[-2]
+    engine.power_up = "Confusion"
+    engine.power_up_pos = cells[-1]
+    engine.snake.grow = True
+    engine.step()
+    assert not engine.game_over
+    assert engine.food_pos == cells[-1] and engine.power_up_pos is None
+    engine.step()
+    assert engine.won and engine.game_over
+
+
+def test_spawn_power_up_on_full_board():
+    engine = Engine("Expert")
+    cells = [(x, y) for y in range(GRID_COUNT) for x in range(GRID_COUNT)]
+    engine.snake.positions = cells[:-1]
+    engine.food_pos = cells[-1]
+    engine.spawn_power_up()
+    assert engine.power_up is None and engine.power_up_pos is None
+
+
+def test_queued_turns_apply_one_per_move():
+    engine = Engine("Expert")
+    assert engine.queue_turn(Direction.UP, stamp=1)
+    assert engine.queue_turn(Direction.LEFT, stamp=2)
+    engine.step()
+    assert engine.snake.direction == Direction.UP
+    assert engine.applied_turn_stamp == 1
+    engine.step()
+    assert engine.snake.direction == Direction.LEFT
+    assert engine.applied_turn_stamp == 2
+    assert not engine.turns
+
+
+def test_queue_turn_checks_reversal_against_last_queued():
+    engine = Engine("Expert")
+    assert not engine.queue_turn(Direction.LEFT)  # Reverses the current one
+    assert engine.queue_turn(Direction.UP)
+    assert not engine.queue_turn(Direction.DOWN)  # Reverses the queued one
+    assert not engine.queue_turn(Direction.UP)  # Repeat
+    assert engine.queue_turn(Direction.LEFT)
+    assert engine.queue_turn(Direction.DOWN)
+    assert not engine.queue_turn(Direction.RIGHT)  # Queue is full
+    assert len(engine.turns) == 3
+
+
+def test_confusion_applies_when_turn_is_consumed():
+    engine = Engine("Expert")
+    engine.queue_turn(Direction.UP)
+    engine.snake.confused = True
+    engine.step()
+    assert engine.snake.direction == Direction.DOWN
+
+
+def test_large_board():
+    engine = Engine("Expert", grid_count=4000)
+    assert engine.snake.head == (2000, 2000)
+    assert len(engine.snake.free) == 4000 * 4000 - 1
+    engine.step()
+    assert engine.snake.head == (2001, 2000)
+    x, y = engine.get_random_position()
+    assert not engine.snake.occupies((x, y)) and (x, y) != engine.food_pos
+
+
+def test_power_up_effects_expire_from_the_timeline():
+    engine = Engine("Expert")
+    engine.start_effect(PowerUpEffect.HALF_SPEED)
+    engine.start_effect(PowerUpEffect.CONFUSION)
+    assert engine.snake.speed_mult == 0.5 and engine.snake.confused
+    assert engine.active_power_up == PowerUpEffect.CONFUSION
+    engine.tick(False)
+    assert len(engine.effects) == 2
+    engine.score += 1
+    engine.tick(False)
+    assert engine.effects == [] and engine.active_power_up is None
+    assert engine.snake.speed_mult == 1.0 and not engine.snake.confused
+
+
+def test_registered_power_ups_can_last_moves_and_stack():
+    def shrink(snake):
+        snake.speed_mult *= 0.75
+
+    reverted = []
+    slow = PowerUp("Slow", shrink, duration=3, unit=MOVES, stacks=True)
+    slow.revert = reverted.append
+    register_power_up(slow)
+    try:
+        engine = Engine("Beginner")
+        engine.start_effect("Slow")
+        engine.step()
+        engine.start_effect("Slow")  # Stacks on the first copy
+        assert engine.snake.speed_mult == 0.75 * 0.75
+        engine.step()
+        engine.step()
+        # The first copy ran out after three moves; the second is left
+        assert engine.effects == [("Slow", MOVES, 4)]
+        assert engine.snake.speed_mult == 0.75 and reverted == [engine]
+        engine.step()
+        assert engine.effects == [] and engine.snake.speed_mult == 1.0
+        spawned = set()
+        for _ in range(50):
+            engine.spawn_power_up()
+            spawned.add(engine.power_up)
+        assert "Slow" in spawned
+    finally:
+        del POWER_UPS["Slow"]
+
+
+def test_power_up_spawns_on_multiples_of_five():
+    engine = Engine("Expert", random.Random(0))
+    engine.score = 4
+    engine.tick(False)
+    assert engine.power_up is None
+    engine.score = 5
+    engine.tick(False)
+    assert engine.power_up is not None
+    engine.power_up = engine.power_up_pos = None
+    engine.score = 11  # Jumped over 10
+    engine.tick(False)
+    assert engine.power_up is None
+    engine.score = 15
+    engine.tick(False)
+    assert engine.power_up is not None
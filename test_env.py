@@ -0,0 +1,91 @@
+import random
+
+import numpy as np
+import pytest
+
+from autopilot import Autopilot
+from engine import DIRECTIONS, Direction
+from env import SnakeEnv
+from grid import cell_grid
+
+
+def play(env, seed, moves):
+    """Yield each observation of an autopilot game with random mistakes."""
+    rng = random.Random(seed)
+    autopilot = Autopilot()
+    observation = env.reset(seed)
+    yield observation
+    for _ in range(moves):
+        if rng.random() < 0.1:
+            action = rng.randrange(env.action_count)
+        else:
+            action = DIRECTIONS.index(autopilot.policy(env.engine))
+        observation, reward, done, info = env.step(action)
+        yield observation
+        if done:
+            observation = env.reset()
+            yield observation
+
+
+def test_board_matches_cell_grid():
+    env = SnakeEnv("Beginner", grid_count=10)
+    for observation in play(env, 0, 400):
+        assert observation.shape == env.observation_shape
+        assert np.shares_memory(observation, env.planes)
+        assert (observation == cell_grid(env.engine)).all()
+
+
+def test_stacked_frames_are_the_last_boards():
+    env = SnakeEnv("Recommended", grid_count=10, frames=3)
+    boards = []
+    for observation in play(env, 1, 300):
+        board = cell_grid(env.engine)
+        if env.engine.moves == 0:
+            boards = [board] * 3  # A new game starts with copies of its board
+        boards = boards[-2:] + [board]
+        assert observation.shape == (3, 10, 10)
+        assert np.shares_memory(observation, env.planes)
+        assert (observation == np.stack(boards)).all()
+
+
+def test_crop_follows_the_head_across_edges():
+    env = SnakeEnv("Expert", grid_count=10, frames=2, crop=5)
+    for observation in play(env, 2, 300):
+        engine = env.engine
+        x, y = engine.snake.head
+        assert observation.shape == (2, 5, 5)
+        assert np.shares_memory(observation, env.planes)
+        assert (observation[-1] == cell_grid(engine, x - 2, y - 2, 5)).all()
+        assert (env.board == cell_grid(engine)).all()
+
+
+def test_rewards_and_done():
+    env = SnakeEnv("Expert", grid_count=10, max_moves=50)
+    env.reset(0)
+    engine = env.engine
+    engine.food_pos = (6, 5)  # Right in front of the head
+    _, reward, done, first = env.step(None)
+    assert reward == 1 and not done and first["score"] == 1
+    for _ in range(49):
+        _, reward, done, info = env.step(None)
+    assert done and reward == 0 and info["moves"] == 50
+    assert first["moves"] == 1  # Each step returns its own info
+
+    env.reset(0)
+    engine.snake.positions = [(5, 5), (5, 6), (4, 6), (4, 5), (4, 4)]
+    _, reward, done, info = env.step(DIRECTIONS.index(Direction.DOWN))
+    assert done and reward == -1 and not info["won"]
+
+
+def test_step_after_done_raises():
+    env = SnakeEnv("Expert", grid_count=10, frames=2, max_moves=3)
+    env.reset(0)
+    for _ in range(3):
+        observation, _, done, _ = env.step(None)
+    assert done
+    last = observation.copy()
+    with pytest.raises(RuntimeError):
+        env.step(None)
+    assert env.engine.moves == 3 and (env.observation() == last).all()
+    env.reset(0)
+    env.step(None)  # Playable again after reset
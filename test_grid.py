@@ -0,0 +1,27 @@
+from engine import Engine, PowerUpEffect
+from grid import BODY, EMPTY, FOOD, HEAD, POWER_UP, cell_grid, occupancy
+
+
+def test_occupancy_is_a_live_view():
+    engine = Engine("Expert", grid_count=10)
+    view = occupancy(engine.snake)
+    assert view[5, 5] == 1
+    engine.step()
+    assert view[5, 5] == 0 and view[5, 6] == 1
+
+
+def test_cell_grid_states():
+    engine = Engine("Expert", grid_count=10)
+    engine.snake.positions = [(5, 5), (4, 5), (3, 5)]
+    engine.food_pos = (9, 9)
+    engine.power_up = PowerUpEffect.CONFUSION
+    engine.power_up_pos = (0, 0)
+    grid = cell_grid(engine)
+    assert grid.shape == (10, 10)
+    assert grid[5, 5] == HEAD and grid[5, 4] == grid[5, 3] == BODY
+    assert grid[9, 9] == FOOD and grid[0, 0] == POWER_UP
+    assert (grid == EMPTY).sum() == 95
+
+    # A 4x4 window starting at (8, 8) wraps around to the power-up
+    window = cell_grid(engine, 8, 8, 4)
+    assert window[1, 1] == FOOD and window[2, 2] == POWER_UP
@@ -0,0 +1,67 @@
+import json
+
+from profiler import DRAW, EVENTS, FLIP, INPUT, PHASES, TICK, UPDATE, FrameProfiler
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def run_frames(profiler, clock, count, draw_time=0.004, dropped=0):
+    for _ in range(count):
+        profiler.begin_frame()
+        clock.now += 0.001
+        profiler.mark(EVENTS)
+        clock.now += 0.0005
+        profiler.mark(INPUT)
+        clock.now += 0.002
+        profiler.mark(UPDATE)
+        clock.now += draw_time
+        profiler.mark(DRAW)
+        profiler.mark(FLIP)
+        clock.now += 0.010
+        profiler.mark(TICK)
+        profiler.end_frame(dropped)
+
+
+def test_ring_buffer_keeps_last_frames():
+    clock = FakeClock()
+    profiler = FrameProfiler(capacity=10, clock=clock)
+    run_frames(profiler, clock, 20, draw_time=0.004)
+    run_frames(profiler, clock, 5, draw_time=0.014, dropped=1)
+    summary = profiler.summary()
+    assert summary["frames"] == 10
+    assert summary["dropped_moves"] == 5
+    assert round(summary["draw_p50"], 3) == 14.0  # Half the kept frames are slow
+    assert round(summary["frame_p50"], 3) == 27.5
+    assert round(summary["input_p99"], 3) == 0.5
+    assert profiler.summary(last=5)["draw_p50"] == summary["draw_p99"]
+
+
+def test_trace_export(tmp_path):
+    clock = FakeClock()
+    profiler = FrameProfiler(capacity=4, clock=clock)
+    run_frames(profiler, clock, 2, dropped=2)
+    path = tmp_path / "trace.json"
+    profiler.export_trace(path)
+    events = json.loads(path.read_text())["traceEvents"]
+    frames = [e for e in events if e["name"] == "frame"]
+    assert len(frames) == 2
+    assert {e["name"] for e in events} >= set(PHASES) - {"flip"}
+    draw = [e for e in events if e["name"] == "draw"][0]
+    assert round(draw["ts"] - frames[0]["ts"]) == 3500
+    assert [e["args"]["moves"] for e in events if e["ph"] == "C"] == [2, 2]
+
+
+def test_input_latency_percentiles():
+    profiler = FrameProfiler(capacity=4, clock=FakeClock())
+    assert profiler.summary()["latency_p99"] == 0.0
+    for ms in (10, 20, 30, 40, 90):
+        profiler.add_latency(ms)
+    summary = profiler.summary()
+    assert summary["latency_p50"] == 40
+    assert summary["latency_p99"] == 90
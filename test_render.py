@@ -0,0 +1,281 @@
+import subprocess
+import sys
+
+import pygame
+
+from main import Direction, Game, PowerUpEffect
+from render import BLUE, WHITE, Camera, FullRenderer, GridRenderer, TextCache
+from replay import Replay
+
+
+def full_frame(game):
+    surface = pygame.Surface(game.screen.get_size())
+    renderer = FullRenderer()
+    renderer.draw_board(surface, game)
+    renderer.draw_hud(surface, game)
+    renderer.draw_overlay(surface, game)
+    return pygame.image.tobytes(surface, "RGB")
+
+
+def test_dirty_renderer_matches_full_repaint():
+    game = Game(headless=True)
+    game.difficulty = "Expert"
+    game.snake.positions = [(5, 5), (4, 5), (3, 5)]
+    game.food_pos = (8, 5)
+    assert game.renderer.draw(game) is None  # First frame is a full repaint
+
+    game.power_up = PowerUpEffect.CONFUSION
+    game.power_up_pos = (9, 6)
+    for action in [None, None, None, Direction.DOWN, Direction.RIGHT, None]:
+        game.step(action)
+        rects = game.renderer.draw(game)
+        assert rects is not None
+        assert pygame.image.tobytes(game.screen, "RGB") == full_frame(game)
+
+
+def test_dirty_renderer_touches_only_changed_cells():
+    game = Game(headless=True)
+    game.difficulty = "Beginner"
+    game.snake.positions = [(x, y) for y in range(20, 25) for x in range(40)]
+    game.snake.direction = game.snake.next_direction = Direction.UP
+    game.food_pos = (30, 30)
+    game.renderer.draw(game)
+
+    game.step()
+    rects = game.renderer.draw(game)
+    assert len(rects) == 3  # New head, old head and vacated tail
+
+
+def test_text_cache_reuses_and_evicts_surfaces():
+    pygame.font.init()
+    font = pygame.font.Font(None, 36)
+    cache = TextCache(maxsize=2)
+    first = cache.render(font, "Score: 1", WHITE)
+    assert cache.render(font, "Score: 1", WHITE) is first
+    cache.render(font, "Score: 2", WHITE)
+    cache.render(font, "Score: 1", WHITE)  # Refresh, so "Score: 2" is oldest
+    cache.render(font, "Score: 3", WHITE)
+    assert list(cache.surfaces) == [
+        (font, "Score: 1", WHITE),
+        (font, "Score: 3", WHITE),
+    ]
+
+
+def test_stats_overlay_is_pushed_with_dirty_rects():
+    game = Game(headless=True)
+    game.difficulty = "Recommended"
+    game.renderer.draw(game)
+    game.toggle_stats()
+    assert game.render() is None  # Toggling repaints everything once
+    for frame in range(30):  # The overlay text refreshes every 30 frames
+        game.profiler.begin_frame()
+        game.profiler.end_frame(1 if frame < 3 else 0)
+    game.step()
+    rects = game.render()
+    assert rects[-1].right == game.screen.get_width() - 10
+    assert "dropped moves 3" in game.stats_lines
+
+
+def test_menu_blocks_until_a_difficulty_is_clicked():
+    game = Game(headless=True)
+    buttons = dict(game.menu_buttons())
+    pygame.event.clear()
+    pygame.event.post(pygame.event.Event(pygame.MOUSEMOTION, pos=(0, 0)))
+    pygame.event.post(
+        pygame.event.Event(
+            pygame.MOUSEBUTTONDOWN, pos=buttons["Expert"].center, button=1
+        )
+    )
+    assert game.run_menu()
+    assert game.difficulty == "Expert"
+
+
+def test_idle_pause_resumes_move_timer():
+    game = Game(headless=True)
+    game.difficulty = "Recommended"
+    pygame.event.clear()
+    game.handle_event(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_ESCAPE))
+    assert game.paused
+    last_update_time = game.last_update_time
+    game.paused_at -= 500  # Pretend the game sat paused for half a second
+    pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_ESCAPE))
+    assert game.run_idle()
+    assert not game.paused
+    assert game.last_update_time >= last_update_time + 500
+
+    pygame.event.post(pygame.event.Event(pygame.QUIT))
+    game.game_over = True
+    assert not game.run_idle()
+
+
+def run_frames(game, monkeypatch, frames, frame_ms):
+    now = [game.last_update_time]
+    monkeypatch.setattr(pygame.time, "get_ticks", lambda: round(now[0]))
+    for _ in range(frames):
+        now[0] += frame_ms
+        game.update()
+
+
+def test_fixed_timestep_does_not_drop_moves(monkeypatch):
+    game = Game(headless=True)
+    game.difficulty = "Expert"
+    game.level = 16
+    game.snake.speed_mult = 2.0
+    game.food_pos = (0, 0)
+    assert game.get_current_speed() == 40  # A move every 25 ms
+
+    # 60 frames of 1/60 s is one second: exactly 40 moves, none dropped
+    run_frames(game, monkeypatch, 60, 1000 / 60)
+    assert game.moves == 40
+    assert game.dropped_moves == 0
+
+
+def test_fixed_timestep_caps_steps_after_a_stall(monkeypatch):
+    game = Game(headless=True)
+    game.difficulty = "Beginner"  # A move every 200 ms
+    game.food_pos = (0, 0)
+    run_frames(game, monkeypatch, 1, 10_000)
+    assert game.moves == 20
+    assert game.dropped_moves == 30
+
+
+def test_interpolated_head_slides_between_cells(monkeypatch):
+    game = Game(interpolate=True, headless=True)
+    game.difficulty = "Beginner"
+    game.snake.positions = [(10, 10), (9, 10)]
+    game.food_pos = (0, 0)
+    run_frames(game, monkeypatch, 1, 300)  # One move and half of the next
+    assert game.snake.head == (11, 10)
+    assert game.alpha == 0.5
+
+    surface = pygame.Surface(game.screen.get_size())
+    FullRenderer().draw_board(surface, game)
+    assert surface.get_at((10 * 20 + 15, 10 * 20 + 5))[:3] == (0, 150, 0)
+    assert surface.get_at((11 * 20 + 15, 10 * 20 + 5))[:3] == (0, 0, 0)
+
+
+def test_camera_follows_head_on_a_large_board():
+    camera = Camera(1000)
+    camera.center((500, 500))
+    assert camera.to_screen((500, 500)) == (20, 20)
+    assert camera.to_screen((10, 10)) is None
+    for x in range(501, 520):
+        camera.follow((x, 500))
+    assert camera.to_screen((519, 500)) == (camera.size - camera.margin - 1, 20)
+    camera.follow((0, 0))  # Far out of view: recentre
+    assert camera.to_screen((0, 0)) == (20, 20)
+    assert camera.to_board((20, 20)) == 0
+
+
+def test_dirty_renderer_scrolls_with_the_camera():
+    game = Game(headless=True, grid_count=1000)
+    game.difficulty = "Recommended"
+    head = game.snake.head
+    game.snake.positions = [(head[0] - i, head[1]) for i in range(30)]
+    game.food_pos = (head[0] + 15, head[1] + 1)
+    game.power_up = PowerUpEffect.CONFUSION
+    game.power_up_pos = (head[0] + 18, head[1] - 1)
+    game.render()
+    for action in [None] * 12 + [Direction.UP] + [None] * 15:
+        game.step(action)
+        game.render()
+        assert pygame.image.tobytes(game.screen, "RGB") == full_frame(game)
+    assert game.camera.to_screen(game.snake.head) is not None
+
+
+def test_long_snake_is_drawn_from_the_view():
+    game = Game(headless=True, grid_count=100)
+    game.difficulty = "Expert"
+    game.snake.positions = [(x, y) for y in range(50) for x in range(100)][::-1]
+    game.camera.center(game.snake.head)
+    head, body = game.camera.visible_snake(game.snake)
+    assert head == (20, 20)
+    assert len(body) == 21 * 40 - 1  # Rows 0-49 of the board, minus the head
+
+
+def test_grid_renderer_matches_full_repaint():
+    game = Game(GridRenderer(), headless=True, grid_count=100)
+    game.difficulty = "Expert"
+    head = game.snake.head
+    game.snake.positions = [(head[0] - i, head[1]) for i in range(30)]
+    game.food_pos = (head[0] + 3, head[1])
+    game.power_up = PowerUpEffect.DOUBLE_GROWTH
+    game.power_up_pos = (head[0] + 5, head[1] + 2)
+    for action in [None] * 4 + [Direction.DOWN, Direction.LEFT] + [None] * 12:
+        game.step(action)
+        assert game.render() is None
+        assert pygame.image.tobytes(game.screen, "RGB") == full_frame(game)
+
+
+def test_tile_atlas_skin_and_baked_glyph():
+    skin = {"head": (1, 2, 3), "body": (4, 5, 6), "food": (7, 8, 9), "power_up": BLUE}
+    game = Game(FullRenderer(skin), headless=True)
+    game.difficulty = "Expert"
+    game.snake.positions = [(5, 5), (4, 5)]
+    game.food_pos = (8, 5)
+    game.power_up = PowerUpEffect.CONFUSION
+    game.power_up_pos = (9, 6)
+    surface = pygame.Surface(game.screen.get_size())
+    game.renderer.draw_board(surface, game)
+    assert surface.get_at((5 * 20, 5 * 20))[:3] == (1, 2, 3)
+    assert surface.get_at((4 * 20, 5 * 20))[:3] == (4, 5, 6)
+    assert surface.get_at((8 * 20, 5 * 20))[:3] == (7, 8, 9)
+    assert surface.get_at((8 * 20 + 19, 5 * 20))[:3] == (0, 0, 0)  # Cell gap
+    tile = surface.subsurface((9 * 20, 6 * 20, 19, 19))
+    colors = {tuple(tile.get_at((x, y))[:3]) for x in range(19) for y in range(19)}
+    assert BLUE in colors and WHITE in colors
+
+
+def test_main_does_not_load_the_network_client():
+    code = "import main, sys; print('asyncio' in sys.modules)"
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+    assert out.stdout.strip().splitlines()[-1] == "False"
+
+
+def test_headless_autopilot_runs_to_the_end():
+    out = subprocess.run(
+        [
+            sys.executable,
+            "main.py",
+            "--headless",
+            "--autopilot",
+            "--board",
+            "8",
+            "--seed",
+            "0",
+            "--max-moves",
+            "5000",
+        ],
+        capture_output=True,
+        text=True,
+        timeout=60,
+    )
+    assert out.returncode == 0
+    assert out.stdout.strip().splitlines()[-1].startswith("score ")
+
+
+def test_seeded_recordings_are_reproducible(tmp_path):
+    recordings = []
+    for run in ("first", "second"):
+        out_dir = tmp_path / run
+        subprocess.run(
+            [
+                sys.executable,
+                "main.py",
+                "--headless",
+                "--autopilot",
+                "--board",
+                "6",
+                "--seed",
+                "7",
+                "--record",
+                str(out_dir),
+            ],
+            capture_output=True,
+            timeout=60,
+            check=True,
+        )
+        (path,) = out_dir.iterdir()
+        recordings.append(path.read_bytes())
+    assert recordings[0] == recordings[1]
+    assert Replay(recordings[0]).seed == 7
@@ -0,0 +1,36 @@
+import random
+
+from engine import Engine
+from replay import HEADER, Recorder, Replay
+from simulate import greedy_policy
+
+
+def record_game(seed, max_moves=3000):
+    engine = Engine("Expert", random.Random(seed))
+    engine.input_log = recorder = Recorder(seed)
+    policy_rng = random.Random(seed + 1)
+    while not engine.game_over and engine.moves < max_moves:
+        engine.step(greedy_policy(engine, policy_rng))
+    return engine, recorder
+
+
+def test_replay_reproduces_recorded_game(tmp_path):
+    engine, recorder = record_game(5)
+    path = tmp_path / "game.snkr"
+    recorder.save(path, engine)
+    assert path.stat().st_size == HEADER.size + 4 * len(recorder.turns)
+
+    replay = Replay.open(path)
+    assert replay.verify()
+    replayed = replay.run()
+    assert list(replayed.snake.positions) == list(engine.snake.positions)
+    assert replayed.score == engine.score > 0
+
+
+def test_verify_detects_changed_outcome():
+    engine, recorder = record_game(9, max_moves=500)
+    data = bytearray(recorder.to_bytes(engine))
+    replay = Replay(data)
+    assert replay.verify()
+    replay.score += 1
+    assert not replay.verify()
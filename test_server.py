@@ -0,0 +1,143 @@
+import asyncio
+import random
+import socket
+
+import pytest
+
+from autopilot import Autopilot
+from engine import Direction, Engine
+from server import (
+    MAX_GRID,
+    Client,
+    Mirror,
+    Server,
+    View,
+    delta_message,
+    full_message,
+)
+
+
+def state(engine):
+    snake = engine.snake
+    return (
+        list(snake.body),
+        snake.direction,
+        snake.confused,
+        snake.speed_mult,
+        engine.food_pos,
+        engine.power_up,
+        engine.power_up_pos if engine.power_up else None,
+        engine.active_power_up,
+        engine.score,
+        engine.level,
+        engine.moves,
+        engine.game_over,
+    )
+
+
+def test_deltas_keep_a_mirror_in_step():
+    engine = Engine("Expert", random.Random(4), grid_count=12)
+    engine.autopilot = Autopilot()
+    mirrored = Engine()
+    mirrored.changed_cells = []
+    mirror = Mirror(mirrored)
+    assert mirror.feed(full_message(engine)) == 1
+    view = View(engine)
+    sizes = []
+    effects = set()
+    while not engine.game_over and engine.moves < 3000:
+        engine.step()
+        message = delta_message(engine, view)
+        sizes.append(len(message))
+        # Split messages across reads
+        mirror.feed(message[:3])
+        mirror.feed(message[3:])
+        assert state(mirrored) == state(engine)
+        assert mirrored.snake.counts == engine.snake.counts
+        effects.add(engine.active_power_up)
+    assert len(effects) > 2  # Power-ups came and went
+    assert min(sizes) == 20 and sorted(sizes)[len(sizes) // 2] == 20
+    assert mirrored.changed_cells[-2] == engine.snake.body[0]
+
+
+async def drain(client, session):
+    while client.engine.moves < session.engine.moves or client.mirror.fulls < 1:
+        await client.receive()
+
+
+def test_clients_play_on_the_server():
+    async def run():
+        server = Server()
+        listener = await asyncio.start_server(server.handle, "127.0.0.1", 0)
+        port = listener.sockets[0].getsockname()[1]
+        client = await Client.connect("Expert", 20, port=port)
+        (session,) = server.sessions
+        assert state(client.engine) == state(session.engine)
+
+        client.turn(Direction.UP)
+        await asyncio.sleep(0.05)
+        for _ in range(10):
+            server.tick(80)  # One Expert move each
+        await drain(client, session)
+        assert session.engine.moves == 10
+        assert state(client.engine) == state(session.engine)
+        assert client.engine.snake.direction == Direction.UP
+
+        client.reset()  # Ignored: the game is still on
+        await asyncio.sleep(0.05)
+        assert session.engine.moves == 10
+
+        session.engine.game_over = True
+        client.reset()
+        await asyncio.sleep(0.05)
+        while client.mirror.fulls < 2:
+            await client.receive()
+        assert client.engine.moves == 0
+        assert state(client.engine) == state(session.engine)
+
+        client.close()
+        await asyncio.sleep(0.05)
+        assert not server.sessions
+        listener.close()
+
+    asyncio.run(run())
+
+
+def test_clients_that_fall_behind_are_dropped():
+    async def run():
+        server = Server(max_buffer=1000)
+        listener = await asyncio.start_server(server.handle, "127.0.0.1", 0)
+        port = listener.sockets[0].getsockname()[1]
+        client = await Client.connect("Beginner", MAX_GRID, port=port)
+        (session,) = server.sessions
+        # Make the socket buffers tiny so unread updates pile up on the server
+        transport = session.writer.transport
+        transport.set_write_buffer_limits(high=0)
+        transport.get_extra_info("socket").setsockopt(
+            socket.SOL_SOCKET, socket.SO_SNDBUF, 1024
+        )
+        client.writer.get_extra_info("socket").setsockopt(
+            socket.SOL_SOCKET, socket.SO_RCVBUF, 1024
+        )
+        for _ in range(2000):
+            server.tick(1000)
+            if not server.sessions:
+                break
+        assert server.dropped == 1 and not server.sessions
+        client.close()
+        listener.close()
+
+    asyncio.run(run())
+
+
+def test_oversized_boards_are_refused():
+    async def run():
+        server = Server()
+        listener = await asyncio.start_server(server.handle, "127.0.0.1", 0)
+        port = listener.sockets[0].getsockname()[1]
+        with pytest.raises(ConnectionError):
+            await Client.connect("Expert", MAX_GRID + 1, port=port)
+        assert not server.sessions
+        listener.close()
+
+    asyncio.run(run())
@@ -0,0 +1,38 @@
+import random
+
+from engine import Engine
+from simulate import Stats, greedy_policy, play, simulate
+
+
+def test_seeded_engines_play_identical_games():
+    results = []
+    for _ in range(2):
+        rng = random.Random(7)
+        engine = Engine("Expert", rng)
+        stats = Stats()
+        play(engine, greedy_policy, rng, 5000, stats)
+        results.append((engine.score, engine.moves, list(engine.snake.positions)))
+    assert results[0] == results[1]
+
+
+def test_results_do_not_depend_on_worker_count():
+    one = simulate(40, "Expert", "greedy", seed=3, workers=1, max_moves=2000)
+    two = simulate(
+        40, "Expert", "greedy", seed=3, workers=2, chunk_size=7, max_moves=2000
+    )
+    assert one.summary() == two.summary()
+    summary = one.summary()
+    assert summary["games"] == 40
+    assert sum(summary["score"]["histogram"].values()) == 40
+    assert summary["power_ups"]
+
+
+def test_power_up_taken_on_the_move_it_spawns_is_counted():
+    engine = Engine("Expert", random.Random(0))
+    x, y = engine.snake.head
+    engine.score = 5  # A power-up is due on the next tick
+    engine.get_random_position = lambda: (x + 1, y)  # Right ahead of the head
+    stats = Stats()
+    play(engine, lambda engine, rng: None, None, 1, stats)
+    assert engine.power_up is None and engine.active_power_up is not None
+    assert sum(stats.spawned.values()) == sum(stats.picked.values()) == 1
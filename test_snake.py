@@ -166,30 +166,18 @@ def test_spawn_power_up():
     ]
 
 
+def press(game, key):
+    game.handle_event(pygame.event.Event(pygame.KEYDOWN, key=key))
+
+
 def test_handle_input():
     game = Game()
     game.difficulty = "Recommended"
     game.snake.direction = Direction.RIGHT
 
-    # Create a proper mock for pygame.key.get_pressed
-    original_get_pressed = pygame.key.get_pressed
-
-    # Mock that returns True only for UP key
-    def mock_get_pressed():
-        keys = [
-            False
-        ] * 1073742000  # Create a list with enough elements for all key constants
-        keys[pygame.K_UP] = True
-        return keys
-
-    pygame.key.get_pressed = mock_get_pressed
-
-    try:
-        game.handle_input()
-        assert game.snake.next_direction == Direction.UP
-    finally:
-        # Restore the original function
-        pygame.key.get_pressed = original_get_pressed
+    press(game, pygame.K_UP)
+    game.consume_turn()
+    assert game.snake.next_direction == Direction.UP
 
 
 def test_confused_input():
@@ -198,35 +186,38 @@ def test_confused_input():
     game.snake.direction = Direction.RIGHT
     game.snake.confused = True
 
-    # Create a proper mock for pygame.key.get_pressed
-    original_get_pressed = pygame.key.get_pressed
+    press(game, pygame.K_UP)
+    game.consume_turn()
+    assert game.snake.next_direction == Direction.DOWN
 
-    # Mock that returns True only for UP key
-    def mock_get_pressed():
-        keys = [
-            False
-        ] * 1073742000  # Create a list with enough elements for all key constants
-        keys[pygame.K_UP] = True
-        return keys
 
-    pygame.key.get_pressed = mock_get_pressed
+def test_quick_turns_between_moves_are_kept():
+    game = Game()
+    game.difficulty = "Expert"
+    head = game.snake.head
 
-    try:
-        game.handle_input()
-        assert game.snake.next_direction == Direction.DOWN
-    finally:
-        # Restore the original function
-        pygame.key.get_pressed = original_get_pressed
+    # Up then left before the next move: a U-turn over two moves
+    press(game, pygame.K_UP)
+    press(game, pygame.K_a)
+    game.tick(True)
+    game.tick(True)
+    assert game.snake.head == (head[0] - 1, head[1] - 1)
+    assert game.applied_turn_stamp is not None
 
 
 def test_power_up_duration():
     game = Game()
     game.difficulty = "Recommended"
-    game.active_power_up = PowerUpEffect.HALF_SPEED
-    game.snake.speed_mult = 0.5
-    game.score = 5
-    game.last_score = 4  # Simulate score increase
+    game.score = 4
+    game.snake.positions = [(5, 5)]
+    game.power_up_pos = (5, 5)
+    game.power_up = PowerUpEffect.HALF_SPEED
+    game.update()
+    assert game.active_power_up == PowerUpEffect.HALF_SPEED
+    game.update()
+    assert game.snake.speed_mult == 0.5
 
+    game.score = 5  # Simulate score increase
     game.update()
 
     assert game.active_power_up is None
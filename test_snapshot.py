@@ -0,0 +1,93 @@
+import random
+
+import pytest
+
+from engine import Direction, Engine, PowerUpEffect
+from snapshot import EVENT, HEADER, from_bytes, restore, to_bytes
+
+
+def play(engine, moves, seed=0):
+    rng = random.Random(seed)
+    directions = [Direction.UP, Direction.DOWN, Direction.LEFT, Direction.RIGHT]
+    for _ in range(moves):
+        if engine.step(rng.choice(directions)):
+            break
+    return engine
+
+
+def state(engine):
+    snake = engine.snake
+    return (
+        list(snake.body),
+        snake.direction,
+        snake.next_direction,
+        snake.grow,
+        snake.double_growth,
+        snake.confused,
+        snake.speed_mult,
+        engine.difficulty,
+        engine.food_pos,
+        engine.power_up,
+        engine.power_up_pos,
+        engine.active_power_up,
+        engine.effects,
+        engine.timeline.events(),
+        engine.score,
+        engine.level,
+        engine.moves,
+        engine.ticks,
+        engine.game_over,
+        engine.vacated,
+    )
+
+
+def test_round_trip():
+    engine = Engine("Expert", random.Random(3), grid_count=12)
+    engine.snake.positions = [(5, 5), (4, 5), (3, 5), (3, 4)]
+    engine.snake.grow = True
+    engine.score = 7
+    engine.start_effect(PowerUpEffect.HALF_SPEED)
+    engine.start_effect(PowerUpEffect.CONFUSION)
+    engine.power_up = PowerUpEffect.DOUBLE_GROWTH
+    engine.power_up_pos = (0, 11)
+    data = to_bytes(engine)
+    assert len(data) == HEADER.size + 4 * 4 + 3 * EVENT.size
+
+    loaded = from_bytes(data)
+    assert state(loaded) == state(engine)
+    assert loaded.snake.counts == engine.snake.counts
+    assert len(loaded.snake.free) == 144 - 4
+
+
+def test_restore_rolls_back_in_place():
+    engine = play(Engine("Expert", random.Random(1), grid_count=10), 30)
+    saved = to_bytes(engine)
+    before = state(engine)
+    play(engine, 20, seed=1)
+    assert state(engine) != before
+    assert restore(engine, saved) is engine
+    assert state(engine) == before
+    assert not engine.snake.check_collision()
+
+
+def test_bad_snapshots_are_rejected():
+    engine = Engine("Expert", random.Random(0))
+    data = to_bytes(engine)
+    with pytest.raises(ValueError):
+        from_bytes(b"XXXX" + data[4:])
+    with pytest.raises(ValueError):
+        from_bytes(data[:-1])
+
+
+def test_fork_plays_on_identically_and_independently():
+    engine = play(Engine("Expert", random.Random(5), grid_count=10), 25)
+    before = state(engine)
+    fork = engine.fork()
+    assert state(fork) == before
+    play(fork, 3, seed=2)
+    assert state(engine) == before  # Moving the fork leaves the original alone
+
+    fork = engine.fork()
+    play(engine, 200, seed=9)
+    play(fork, 200, seed=9)
+    assert state(fork) == state(engine)